@@ -0,0 +1,43 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSONL soru dosyasını toplu olarak yanıtlar")
+    parser.add_argument("input", help="Soru dosyası (.jsonl, satır başına {\"question\": ..., \"id\"?: ..., \"search_type\"?: ...})")
+    parser.add_argument("output", help="Yanıtların eklendiği JSONL dosyası; tekrar çalıştırıldığında kalan sorulardan devam edilir")
+    parser.add_argument("--search-type", default="Normal", choices=["Normal", "Reasoning", "Vector Search"])
+    parser.add_argument("--llm-provider", default="OpenAI", choices=["OpenAI", "Groq"])
+    parser.add_argument("--model-name", default="gpt-4.1-nano-2025-04-14")
+    parser.add_argument("--temperature", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=8, help="Aynı anda yanıtlanan en fazla soru sayısı")
+    parser.add_argument("--max-retries", type=int, default=3, help="Başarısız soru başına yeniden deneme sayısı")
+    parser.add_argument("--retry-delay", type=float, default=2.0, help="İlk yeniden denemeden önceki bekleme (sn)")
+    parser.add_argument("--skip-failed", action="store_true", help="Önceki çalıştırmada başarısız olan soruları tekrar sorma")
+    args = parser.parse_args()
+
+    from chatbot.core.batch import BatchAnswerer, read_questions
+
+    answerer = BatchAnswerer(
+        llm_provider=args.llm_provider,
+        model_name=args.model_name,
+        temperature=args.temperature,
+        search_type=args.search_type,
+        concurrency=args.concurrency,
+        max_retries=args.max_retries,
+        retry_delay=args.retry_delay,
+    )
+    progress = answerer.run(read_questions(args.input), args.output, retry_failed=not args.skip_failed)
+
+    print(f"✅ {progress['done']} soru yanıtlandı ({progress['failed']} başarısız), "
+          f"{progress['skipped']} soru önceki çalıştırmadan atlandı → {args.output}")
+    if progress["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
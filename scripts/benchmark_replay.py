@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+SEARCH_TYPES = ["Normal", "Reasoning", "Vector Search"]
+STAGE_ORDER = ["request", "condense", "cypher_generation", "cypher_guard", "graph_query", "retrieval", "enrichment", "answer"]
+CACHE_SETTINGS = ["SEMANTIC_CACHE_ENABLED", "CYPHER_CACHE_ENABLED", "QUERY_CACHE_ENABLED"]
+
+
+def configure_environment(args, work_dir):
+    """
+    Ayarlar import edilmeden önce benchmark ortamını hazırlar: yerel vektör indeksi,
+    geçici şema/indeks dizinleri ve (istenmedikçe) kapalı önbellekler.
+    """
+    os.environ["VECTOR_BACKEND"] = "local"
+    os.environ["LOCAL_INDEX_DIR"] = os.path.join(work_dir, "index")
+    os.environ["SCHEMA_CACHE_DIR"] = os.path.join(work_dir, "schema")
+    os.environ["TRACE_ENABLED"] = "true"
+    os.environ["TRACE_EXPORT_PATH"] = args.trace_export or ""
+    os.environ.setdefault("OPENAI_API_KEY" if args.llm_provider == "OpenAI" else "GROQ_API_KEY", "replay")
+    if not args.with_caches:
+        for name in CACHE_SETTINGS:
+            os.environ[name] = "false"
+
+
+def load_questions(path):
+    """
+    Soru dosyasını okur. JSONL satırları {"question": ..., "search_type": ...} biçiminde,
+    düz metin dosyalarında her satır bir sorudur (tüm arama tiplerinde kullanılır).
+    """
+    questions = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                row = json.loads(line)
+                search_types = [row["search_type"]] if row.get("search_type") else SEARCH_TYPES
+                for search_type in search_types:
+                    questions.setdefault(search_type, []).append(row["question"])
+            else:
+                for search_type in SEARCH_TYPES:
+                    questions.setdefault(search_type, []).append(line)
+    return questions
+
+
+def print_report(report):
+    for search_type, stages in report.items():
+        failures = stages.get("request", {}).get("failures", 0)
+        print(f"\n📊 {search_type} (başarısız: {failures})")
+        print(f"  {'aşama':<20}{'adet':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        names = [name for name in STAGE_ORDER if name in stages] + sorted(set(stages) - set(STAGE_ORDER))
+        for name in names:
+            summary = stages[name]
+            if not summary.get("count"):
+                continue
+            print(f"  {name:<20}{summary['count']:>6}{summary['p50_ms']:>10.1f}{summary['p95_ms']:>10.1f}{summary['p99_ms']:>10.1f}")
+
+
+def compare_to_baseline(report, baseline, tolerance):
+    """
+    Her arama tipi ve aşama için p95 süresini baseline ile karşılaştırır.
+
+    Returns:
+        list: Tolerans üzerinde yavaşlayan (arama tipi, aşama, baseline p95, yeni p95) kayıtları
+    """
+    regressions = []
+    for search_type, stages in report.items():
+        for name, summary in stages.items():
+            previous = baseline.get(search_type, {}).get(name, {}).get("p95_ms")
+            current = summary.get("p95_ms")
+            if previous and current and current > previous * (1 + tolerance):
+                regressions.append((search_type, name, previous, current))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Canlı servisler olmadan arama tiplerinin gecikme benchmark'ı")
+    parser.add_argument("--search-types", nargs="+", default=SEARCH_TYPES, choices=SEARCH_TYPES)
+    parser.add_argument("--questions", help="Soru dosyası (.jsonl veya satır başına bir soru); varsayılan örnek sorular")
+    parser.add_argument("--repeats", type=int, default=3, help="Soru setinin tekrar sayısı")
+    parser.add_argument("--warmup", type=int, default=1, help="Ölçüme dahil edilmeyen ısınma sorusu sayısı")
+    parser.add_argument("--api", default="sync", choices=["sync", "async", "stream"])
+    parser.add_argument("--llm-provider", default="OpenAI", choices=["OpenAI", "Groq"])
+    parser.add_argument("--model-name", default="gpt-4.1-nano-2025-04-14")
+    parser.add_argument("--first-token-delay", type=float, default=0.2, help="LLM ilk token gecikmesi (sn)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="LLM token başına gecikme (sn)")
+    parser.add_argument("--answer-tokens", type=int, default=60, help="Yanıt uzunluğu (token)")
+    parser.add_argument("--query-delay", type=float, default=0.005, help="Graph sorgusu başına gecikme (sn)")
+    parser.add_argument("--embedding-delay", type=float, default=0.01, help="Sorgu embedding gecikmesi (sn)")
+    parser.add_argument("--rows", type=int, default=10, help="Graph sorgusu başına dönen satır sayısı")
+    parser.add_argument("--chunks", type=int, default=2000, help="Vektör indeksindeki chunk sayısı")
+    parser.add_argument("--with-caches", action="store_true", help="Yanıt, Cypher ve sorgu önbelleklerini açık bırak")
+    parser.add_argument("--trace-export", help="Span'lerin JSON lines olarak yazılacağı dosya")
+    parser.add_argument("--output", help="Raporun JSON olarak yazılacağı dosya")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki rapor (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 için izin verilen göreli yavaşlama")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="replay_") as work_dir:
+        configure_environment(args, work_dir)
+
+        from chatbot.utils.replay import ReplayData, install_replay_resources, replay
+
+        temperature = 0.1
+        install_replay_resources(
+            args.llm_provider, args.model_name, temperature,
+            data=ReplayData(chunks=args.chunks, rows=args.rows),
+            query_delay=args.query_delay,
+            first_token_delay=args.first_token_delay,
+            token_delay=args.token_delay,
+            answer_tokens=args.answer_tokens,
+            embedding_delay=args.embedding_delay,
+        )
+        report = replay(
+            args.search_types, args.llm_provider, args.model_name, temperature,
+            questions=load_questions(args.questions) if args.questions else None,
+            repeats=args.repeats,
+            warmup=args.warmup,
+            api=args.api,
+        )
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Rapor kaydedildi: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ p95 yavaşlaması (tolerans %{args.tolerance * 100:.0f}):")
+            for search_type, name, previous, current in regressions:
+                print(f"  {search_type} / {name}: {previous:.1f} ms → {current:.1f} ms")
+            sys.exit(1)
+        print("\n✅ Baseline ile karşılaştırmada yavaşlama yok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def export(model_name, output_dir, opset):
+    """
+    HuggingFace modelini dinamik batch ve sekans boyutlu ONNX'e aktarır, tokenizer.json'u ve
+    model adını içeren metadata.json'u yanına yazar.
+    Yalnızca aktarım sırasında torch ve transformers gerekir.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from chatbot.utils.onnx_embeddings import onnx_model_path, write_model_metadata
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    sample = tokenizer(["örnek cümle"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            str(onnx_model_path(output_dir)),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    write_model_metadata(output_dir, model_name)
+    print(f"✅ ONNX modeli yazıldı: {onnx_model_path(output_dir)}")
+
+
+def quantize(output_dir):
+    """
+    Ağırlıkları dinamik int8 quantization ile sıkıştırılmış model_quantized.onnx dosyasını üretir.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from chatbot.utils.onnx_embeddings import onnx_model_path
+
+    quantize_dynamic(
+        str(onnx_model_path(output_dir)),
+        str(onnx_model_path(output_dir, quantized=True)),
+        weight_type=QuantType.QInt8,
+    )
+    print(f"✅ int8 model yazıldı: {onnx_model_path(output_dir, quantized=True)}")
+
+
+def sample_texts(limit):
+    """
+    Parite kontrolü için örnek sorular ve varsa işlenmiş makalelerden chunk metinleri.
+    """
+    from src.config.settings import PROCESSED_PAPERS_JSON
+    from src.config.sample_questions import SAMPLE_QUESTIONS
+
+    texts = [question for questions in SAMPLE_QUESTIONS.values() for question in questions]
+    if PROCESSED_PAPERS_JSON.exists():
+        with open(PROCESSED_PAPERS_JSON, encoding="utf-8") as f:
+            chunks = json.load(f)["nodes"].get("chunks", [])
+        texts += [chunk["text"] for chunk in chunks[:max(limit - len(texts), 0)]]
+    return texts[:limit]
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def parity(model_name, output_dir, variants, texts):
+    """
+    ONNX çıktılarını torch (HuggingFaceEmbeddings) çıktılarıyla karşılaştırır;
+    yükleme süresi ve saniyedeki metin sayısını da ölçer.
+    """
+    from chatbot.utils.embeddings import create_embeddings
+    from chatbot.utils.onnx_embeddings import OnnxEmbeddings
+
+    reference_model, reference_load = _timed(create_embeddings, model_name, "torch")
+    reference, reference_time = _timed(reference_model.embed_documents, texts)
+    reference = np.asarray(reference, dtype=np.float32)
+    # Normalize katmanı olmayan modellerde de satır çarpımı kosinüs benzerliği olsun
+    reference /= np.clip(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12, None)
+    rows = [{"backend": "torch", "min_cosine": 1.0, "max_abs_diff": 0.0,
+             "load_s": reference_load, "texts_per_s": len(texts) / reference_time}]
+
+    for quantized in variants:
+        model, load_time = _timed(lambda: OnnxEmbeddings(output_dir, quantized, model_name=model_name))
+        vectors, embed_time = _timed(model.embed_documents, texts)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        rows.append({
+            "backend": "onnx-int8" if quantized else "onnx",
+            "min_cosine": float((vectors * reference).sum(axis=1).min()),
+            "max_abs_diff": float(np.abs(vectors - reference).max()),
+            "load_s": load_time,
+            "texts_per_s": len(texts) / embed_time,
+        })
+    return rows
+
+
+def main():
+    from src.config.settings import EMBEDDING_MODEL_NAME, EMBEDDING_ONNX_DIR
+
+    parser = argparse.ArgumentParser(description="MiniLM embedding modelini ONNX'e aktarır ve torch ile paritesini kontrol eder")
+    parser.add_argument("--model-name", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--output-dir", default=str(EMBEDDING_ONNX_DIR))
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--quantize", action="store_true", help="int8 quantize edilmiş modeli de üret")
+    parser.add_argument("--check-only", action="store_true", help="Aktarım yapmadan mevcut modellerin paritesini kontrol et")
+    parser.add_argument("--skip-parity", action="store_true", help="Torch ile parite kontrolünü atla")
+    parser.add_argument("--samples", type=int, default=200, help="Parite kontrolünde kullanılacak metin sayısı")
+    parser.add_argument("--min-cosine", type=float, default=0.9999, help="float ONNX için torch'a en düşük kosinüs benzerliği")
+    parser.add_argument("--min-cosine-int8", type=float, default=0.99, help="int8 ONNX için torch'a en düşük kosinüs benzerliği")
+    args = parser.parse_args()
+
+    from chatbot.utils.onnx_embeddings import onnx_model_path
+
+    output_dir = Path(args.output_dir)
+    if not args.check_only:
+        export(args.model_name, output_dir, args.opset)
+        if args.quantize:
+            quantize(output_dir)
+    if args.skip_parity:
+        return
+
+    variants = [quantized for quantized in (False, True) if onnx_model_path(output_dir, quantized).exists()]
+    rows = parity(args.model_name, output_dir, variants, sample_texts(args.samples))
+
+    print(f"\n{'backend':<10} {'min kosinüs':>12} {'maks fark':>10} {'yükleme (sn)':>13} {'metin/sn':>9}")
+    failed = False
+    for row in rows:
+        threshold = args.min_cosine_int8 if row["backend"] == "onnx-int8" else args.min_cosine
+        ok = row["min_cosine"] >= threshold
+        failed = failed or not ok
+        print(f"{row['backend']:<10} {row['min_cosine']:>12.6f} {row['max_abs_diff']:>10.2e} "
+              f"{row['load_s']:>13.2f} {row['texts_per_s']:>9.1f} {'✅' if ok else '❌'}")
+    if failed:
+        print("❌ ONNX çıktıları torch çıktılarıyla eşleşmiyor")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,16 @@
 import json
+import uuid
+from datetime import datetime
 from typing import Dict, List, Any
 import os
 import sys
 from pathlib import Path
+import numpy as np
 from langchain_neo4j import Neo4jGraph
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.config.settings import PROCESSED_PAPERS_JSON
+from src.config.settings import PROCESSED_PAPERS_JSON, VECTOR_QUANTIZATION
 
 class Neo4jLoader:
     def __init__(self, uri: str, user: str, password: str):
@@ -32,11 +35,32 @@ class Neo4jLoader:
         
         print("🔗 İlişkiler yükleniyor...")
         self._load_relationships(data['relationships'])
+
+        print("🔤 Küçük harfli isim alanları güncelleniyor...")
+        self._backfill_name_lower()
+
+        print("📚 Makale embedding'leri oluşturuluyor...")
+        count = self._build_paper_embeddings()
+        print(f"📚 {count} makale için embedding yazıldı")
+
+        version = self._write_data_version()
+        print(f"🏷️ Veri sürümü güncellendi: {version}")
         
         print("✨ Yükleme tamamlandı!")
 
     def _create_constraints(self):
         """Gerekli constraint'leri oluştur"""
+        # Neo4j 5.23+ vektör indekslerini varsayılan olarak quantize eder; seçenek yalnızca istendiğinde
+        # açıkça eklenir, böylece seçeneği tanımayan eski sunucularda da chunk_embedding indeksi oluşturulabilir.
+        # Chunk düğümleri float embedding'leri saklamaya devam eder (yeniden puanlama bunları okur), bu yüzden
+        # Neo4j tarafında bellek kazancı sağlanmaz; sıkıştırılmış matris yalnızca yerel indekste tutulur.
+        # Mevcut bir indeksin ayarı IF NOT EXISTS nedeniyle değişmez, indeksin silinip yeniden oluşturulması gerekir.
+        chunk_index_config = "`vector.dimensions`: 384, `vector.similarity_function`: 'cosine'"
+        if VECTOR_QUANTIZATION != "none":
+            if VECTOR_QUANTIZATION == "binary":
+                print("⚠️ Neo4j vektör indeksi binary quantization desteklemiyor, int8 (skaler) quantization kullanılacak")
+            print("ℹ️ Neo4j'de Chunk embedding'leri float olarak kalır; quantization bellek kazancı yalnızca VECTOR_BACKEND=local ile sağlanır")
+            chunk_index_config += ", `vector.quantization.enabled`: true"
         constraints = [
             "CREATE CONSTRAINT paper_id IF NOT EXISTS FOR (p:Paper) REQUIRE p.id IS UNIQUE",
             "CREATE CONSTRAINT code_id IF NOT EXISTS FOR (c:Code) REQUIRE c.id IS UNIQUE",
@@ -45,7 +69,15 @@ class Neo4jLoader:
             "CREATE CONSTRAINT method_id IF NOT EXISTS FOR (m:Method) REQUIRE m.id IS UNIQUE",
             "CREATE CONSTRAINT author_id IF NOT EXISTS FOR (a:Author) REQUIRE a.id IS UNIQUE",
             "CREATE CONSTRAINT chunk_id IF NOT EXISTS FOR (c:Chunk) REQUIRE c.id IS UNIQUE",
-            "CREATE VECTOR INDEX chunk_embedding IF NOT EXISTS FOR (c:Chunk) ON (c.embedding) OPTIONS {indexConfig: {`vector.dimensions`: 384, `vector.similarity_function`: 'cosine'}}"
+            "CREATE TEXT INDEX paper_name_lower IF NOT EXISTS FOR (p:Paper) ON (p.name_lower)",
+            "CREATE TEXT INDEX code_name_lower IF NOT EXISTS FOR (c:Code) ON (c.name_lower)",
+            "CREATE TEXT INDEX dataset_name_lower IF NOT EXISTS FOR (d:Dataset) ON (d.name_lower)",
+            "CREATE TEXT INDEX task_name_lower IF NOT EXISTS FOR (t:Task) ON (t.name_lower)",
+            "CREATE TEXT INDEX method_name_lower IF NOT EXISTS FOR (m:Method) ON (m.name_lower)",
+            "CREATE TEXT INDEX author_name_lower IF NOT EXISTS FOR (a:Author) ON (a.name_lower)",
+            "CREATE FULLTEXT INDEX entity_names IF NOT EXISTS FOR (n:Paper|Author|Method|Dataset|Task) ON EACH [n.name]",
+            "CREATE VECTOR INDEX chunk_embedding IF NOT EXISTS FOR (c:Chunk) ON (c.embedding) OPTIONS {indexConfig: {" + chunk_index_config + "}}",
+            "CREATE VECTOR INDEX paper_embedding IF NOT EXISTS FOR (p:Paper) ON (p.embedding) OPTIONS {indexConfig: {`vector.dimensions`: 384, `vector.similarity_function`: 'cosine'}}"
         ]
         
         for constraint in constraints:
@@ -62,6 +94,7 @@ class Neo4jLoader:
             query = """
             MERGE (p:Paper {id: $id})
             SET p.name = $name,
+                p.name_lower = toLower($name),
                 p.arxiv_link = $arxiv_link,
                 p.abstract = $abstract,
                 p.arxiv_id = $arxiv_id,
@@ -75,6 +108,7 @@ class Neo4jLoader:
             query = """
             MERGE (c:Code {id: $id})
             SET c.name = $name,
+                c.name_lower = toLower($name),
                 c.link = $link,
                 c.star = $star
             """
@@ -85,6 +119,7 @@ class Neo4jLoader:
             query = """
             MERGE (d:Dataset {id: $id})
             SET d.name = $name,
+                d.name_lower = toLower($name),
                 d.link = $link
             """
             self.graph.query(query, params=dataset)
@@ -94,6 +129,7 @@ class Neo4jLoader:
             query = """
             MERGE (t:Task {id: $id})
             SET t.name = $name,
+                t.name_lower = toLower($name),
                 t.link = $link
             """
             self.graph.query(query, params=task)
@@ -103,6 +139,7 @@ class Neo4jLoader:
             query = """
             MERGE (m:Method {id: $id})
             SET m.name = $name,
+                m.name_lower = toLower($name),
                 m.link = $link
             """
             self.graph.query(query, params=method)
@@ -112,6 +149,7 @@ class Neo4jLoader:
             query = """
             MERGE (a:Author {id: $id})
             SET a.name = $name,
+                a.name_lower = toLower($name),
                 a.link = $link
             """
             self.graph.query(query, params=author)
@@ -143,6 +181,51 @@ class Neo4jLoader:
             
             self.graph.query(query, params={'from': rel['from'], 'to': rel['to']})
 
+    def _backfill_name_lower(self):
+        """Önceki yüklemelerden kalan node'lara indekslenen name_lower alanını ekle"""
+        for label in ["Paper", "Code", "Dataset", "Task", "Method", "Author"]:
+            query = f"""
+            MATCH (n:{label})
+            WHERE n.name IS NOT NULL AND n.name_lower IS NULL
+            SET n.name_lower = toLower(n.name)
+            """
+            self.graph.query(query)
+
+    def _build_paper_embeddings(self, batch_size: int = 500) -> int:
+        """Her makale için chunk embedding'lerinin normalize ortalamasını p.embedding olarak yaz"""
+        query = """
+        MATCH (p:Paper)-[:HAS_CHUNK]->(c:Chunk)
+        WHERE c.embedding IS NOT NULL
+        RETURN p.id AS id, collect(c.embedding) AS embeddings
+        """
+        rows = []
+        for row in self.graph.query(query):
+            vectors = np.asarray(row['embeddings'], dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            pooled = vectors.mean(axis=0)
+            pooled /= max(float(np.linalg.norm(pooled)), 1e-12)
+            rows.append({'id': row['id'], 'embedding': pooled.tolist()})
+
+        update = """
+        UNWIND $rows AS row
+        MATCH (p:Paper {id: row.id})
+        SET p.embedding = row.embedding
+        """
+        for i in range(0, len(rows), batch_size):
+            self.graph.query(update, params={'rows': rows[i:i + batch_size]})
+        return len(rows)
+
+    def _write_data_version(self) -> str:
+        """Yüklemenin sonunda graph'a yeni bir veri sürümü damgası yaz"""
+        version = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        query = """
+        MERGE (v:DataVersion {id: 'current'})
+        SET v.version = $version,
+            v.loaded_at = datetime()
+        """
+        self.graph.query(query, params={'version': version})
+        return version
+
 def main():
     # Neo4j bağlantı bilgileri
     uri = os.getenv("NEO4J_URI")
@@ -3,13 +3,13 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
 
 # Gerekli modüllerin importu 
-from src.config.settings import PAPERS_JSON, PDF_DIR, PROCESSED_DATA_DIR
+from src.config.settings import PAPERS_JSON, PDF_DIR, PROCESSED_DATA_DIR, EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND
 from src.ingestion.chunker import LocalChunker
 from src.ingestion.pdf_downloader import PDFDownloader
-from langchain_community.embeddings import HuggingFaceEmbeddings
-import torch
+from chatbot.utils.embeddings import create_embeddings
 
 def process_pdfs():
     # PDF dizini
@@ -25,17 +25,10 @@ def process_pdfs():
     with open(PAPERS_JSON, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-    print(f"🖥️ Kullanılan cihaz: {device}")
-
     # Embeddings modelini yükle
-    print(f"🔄 Embedding modeli yükleniyor...")
-    model_name = "sentence-transformers/all-MiniLM-L6-v2"
-    embeddings = HuggingFaceEmbeddings(
-        model_name=model_name,
-        model_kwargs={'device': device}
-    )
-    print(f"✅ Embedding modeli yüklendi: {model_name}")
+    print(f"🔄 Embedding modeli yükleniyor ({EMBEDDING_BACKEND})...")
+    embeddings = create_embeddings(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND)
+    print(f"✅ Embedding modeli yüklendi: {EMBEDDING_MODEL_NAME}")
 
     # PDF downloader ve chunker
     pdf_downloader = PDFDownloader(PDF_DIR)
@@ -83,12 +76,11 @@ def process_pdfs():
             chunks = chunker.split_text(text, page_count)
             print(f"✅ Metin {len(chunks)} parçaya bölündü")
             
-            # Her chunk için embedding oluştur
+            # Chunk embedding'leri tek çağrıda, backend'in batch boyutuyla oluşturulur
             print(f"🧠 Embedding'ler oluşturuluyor...")
             chunk_data_list = []
-            for i, chunk in enumerate(chunks):
-                chunk_text = chunk
-                embedding = embeddings.embed_documents([chunk_text])[0]
+            chunk_embeddings = embeddings.embed_documents(chunks)
+            for i, (chunk_text, embedding) in enumerate(zip(chunks, chunk_embeddings)):
                 chunk_id = f"chunk_{paper_id}_{i}"
                 chunk_data = {'id': chunk_id, 'text': chunk_text, 'embedding': embedding, 'order': i}
                 chunk_data_list.append(chunk_data)
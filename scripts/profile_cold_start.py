@@ -0,0 +1,73 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+IMPORT_TARGET = "chatbot.core.chatbot"
+
+
+def import_times(module_name, top):
+    """
+    Modülü temiz bir Python sürecinde `-X importtime` ile import eder ve
+    kümülatif süresi en yüksek modülleri döner.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True, text=True, env=env
+    )
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, timings = line.split(":", 1)
+        _, cumulative_us, name = timings.split("|")
+        rows.append((name.strip(), int(cumulative_us)))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chatbot soğuk başlangıç profili")
+    parser.add_argument("--top", type=int, default=15, help="Gösterilecek modül sayısı")
+    parser.add_argument("--question", help="Verilirse chatbot oluşturulup ilk istek ölçülür")
+    parser.add_argument("--search-type", default="Normal", choices=["Normal", "Reasoning", "Vector Search"])
+    parser.add_argument("--llm-provider", default="OpenAI", choices=["OpenAI", "Groq"])
+    parser.add_argument("--model-name", default="gpt-4.1-nano-2025-04-14")
+    args = parser.parse_args()
+
+    print(f"⏱️ {IMPORT_TARGET} import süreleri (kümülatif):")
+    for name, cumulative_us in import_times(IMPORT_TARGET, args.top):
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    if not args.question:
+        return
+
+    started = time.perf_counter()
+    from chatbot.core.chatbot import AIMLChatbot
+    from chatbot.utils.profiling import cold_start
+    cold_start.record_import(IMPORT_TARGET, time.perf_counter() - started)
+
+    chatbot = AIMLChatbot(
+        llm_provider=args.llm_provider,
+        model_name=args.model_name,
+        search_type=args.search_type
+    )
+    chatbot.get_response(args.question)
+
+    report = cold_start.report()
+    print("\n📦 Gecikmeli import'lar:")
+    for name, seconds in report["imports"].items():
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    print("\n🚀 İlk çalışma süreleri:")
+    for name, seconds in report["stages"].items():
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
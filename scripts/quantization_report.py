@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def _normalize(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def load_chunk_embeddings(path):
+    """
+    process_pdfs çıktısındaki chunk embedding'lerini okur.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    vectors = [chunk["embedding"] for chunk in data["nodes"].get("chunks", []) if chunk.get("embedding")]
+    return _normalize(vectors)
+
+
+def synthetic_embeddings(chunks, papers, dimension, seed=0):
+    """
+    Makale merkezleri etrafında kümelenmiş sentetik chunk embedding'leri üretir.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((papers, dimension)).astype(np.float32)
+    noise = rng.standard_normal((chunks, dimension)).astype(np.float32)
+    return _normalize(centers[np.arange(chunks) % papers] + 0.5 * noise)
+
+
+def sample_queries(matrix, count, noise, seed=0):
+    """
+    Rastgele chunk'ların gürültü eklenmiş kopyalarını sorgu olarak kullanır.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(matrix), size=min(count, len(matrix)), replace=False)
+    return _normalize(matrix[rows] + noise * rng.standard_normal((len(rows), matrix.shape[1])).astype(np.float32))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize chunk embedding'leri için recall ve bellek karşılaştırması")
+    parser.add_argument("--input", help="process_pdfs çıktısı (varsayılan: PROCESSED_PAPERS_JSON)")
+    parser.add_argument("--synthetic", type=int, help="Verilirse bu sayıda sentetik chunk kullanılır")
+    parser.add_argument("--papers", type=int, default=500, help="Sentetik veride makale sayısı")
+    parser.add_argument("--queries", type=int, default=200, help="Örneklenecek sorgu sayısı")
+    parser.add_argument("--noise", type=float, default=0.3, help="Örneklenen sorgulara eklenen gürültü")
+    parser.add_argument("--embed-questions", action="store_true", help="Örnek sorular embedding modeliyle sorgu olarak eklenir")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--oversample", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    from src.config.settings import PROCESSED_PAPERS_JSON
+    from chatbot.utils.quantization import recall_report
+
+    if args.synthetic:
+        matrix = synthetic_embeddings(args.synthetic, args.papers, 384)
+    else:
+        matrix = load_chunk_embeddings(args.input or PROCESSED_PAPERS_JSON)
+    if not len(matrix):
+        print("❌ Chunk embedding'i bulunamadı")
+        sys.exit(1)
+
+    queries = sample_queries(matrix, args.queries, args.noise)
+    if args.embed_questions:
+        from src.config.sample_questions import SAMPLE_QUESTIONS
+        from chatbot.utils.embeddings import get_embeddings_model
+        texts = [question for questions in SAMPLE_QUESTIONS.values() for question in questions]
+        questions = _normalize(get_embeddings_model().embed_documents(texts))
+        queries = np.vstack([queries, questions])
+
+    rows = recall_report(matrix, queries, k=args.k, oversample_factors=args.oversample)
+
+    print(f"\n{len(matrix)} chunk, {matrix.shape[1]} boyut, {len(queries)} sorgu, recall@{args.k}")
+    print(f"  {'mod':<8} {'oversample':>10} {'recall':>8} {'bayt/chunk':>11} {'sıkıştırma':>11}")
+    for row in rows:
+        print(f"  {row['mode']:<8} {row['oversample']:>10} {row['recall']:>8.3f} "
+              f"{row['bytes_per_chunk']:>11.0f} {row['compression']:>10.0f}x")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"chunks": len(matrix), "dimension": matrix.shape[1], "queries": len(queries),
+                       "k": args.k, "results": rows}, f, ensure_ascii=False, indent=2)
+        print(f"\n📄 Sonuçlar yazıldı: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import streamlit as st
 from chatbot.utils.session import initialize_chatbot_session, chatbot_needs_reset
+from src.config.sample_questions import SAMPLE_QUESTIONS
 
 st.set_page_config(
     page_title="AI/ML Research Assistant",
@@ -61,28 +62,7 @@ with st.sidebar:
     st.markdown("---")
     st.header("💡 Örnek Sorular")
     st.subheader("🔍 Bu arama tipi için örnek sorular:")
-    all_questions = {
-        "Normal": [
-            "AutoAgent makalesinin yazarları kimlerdir?",
-            "DocETL makalesiyle ilişkili kod depoları hangileridir?",
-            "Jiabin Tang'ın yazdığı tüm makaleleri listeler misin?",
-            "MoonCast makalesinde hangi veri setleri kullanılmış?",
-            "WebDancer makalesinin özetini verir misin?",
-            "SoloSpeech makalesinin yayın tarihi nedir?",
-            "Reservoir-enhanced Segment Anything Model makalesinin arXiv ve Papers With Code linkleri nedir?",
-        ],
-        "Reasoning": [
-            "LLM ajanlarının zorluklarıyla ilgili makale bölümlerini bulur musun?",
-            "ChartGalaxy makalesinde hangi yöntemler (methods) kullanılmış?",
-            "ADOPT yöntemini kullanan makaleler hangileri?",
-            "Large Language Model görevini ele alan makaleler hangileri?",
-        ],
-        "Vector Search": [
-            "Podcast üretimiyle ilgili en alakalı makale paragraflarını getir.",
-            "AutoAgent hakkında semantik olarak en yakın içeriği bul.",
-            "Genel konuşma sistemleriyle ilgili benzer çalışmaları getir.",
-        ]
-    }
+    all_questions = SAMPLE_QUESTIONS
     
     if search_type == "Normal":
         sample_questions = (
@@ -117,14 +97,17 @@ if chatbot_needs_reset(llm_provider, model_name, temperature, search_type):
     else:
         st.info(f"LLM ayarları değiştirildi. Sağlayıcı: {llm_provider}, Model: {model_name}, Temperature: {temperature}")
 
-for msg in st.session_state.messages:
-    role = msg["role"]
-    content = msg["content"]
-    st.markdown(f"""
+def render_message(role, content):
+    return f"""
     <div class='chat-message {'user-message' if role=='user' else 'bot-message'}'>
         <strong>{'👤 Siz:' if role=='user' else '🤖 Asistan:'}</strong><br>{content}
     </div>
-    """, unsafe_allow_html=True)
+    """
+
+for msg in st.session_state.messages:
+    role = msg["role"]
+    content = msg["content"]
+    st.markdown(render_message(role, content), unsafe_allow_html=True)
     if role == "assistant" and "cypher_query" in msg:
         with st.expander("🔍 Oluşturulan Cypher Query"):
             st.code(msg["cypher_query"], language="cypher")
@@ -138,8 +121,20 @@ if "sample_question" in st.session_state:
 
 if user_input:
     st.session_state.messages.append({"role": "user", "content": user_input})
-    with st.spinner("🤔 Yanıtlanıyor..."):
-        response = st.session_state.chatbot.get_response(user_input)
+    st.markdown(render_message("user", user_input), unsafe_allow_html=True)
+
+    # Yanıt token'ları geldikçe ekrana yazılır
+    placeholder = st.empty()
+    placeholder.markdown(render_message("assistant", "🤔 Yanıtlanıyor..."), unsafe_allow_html=True)
+    streamed_answer = ""
+    response = None
+    for event in st.session_state.chatbot.stream_response(user_input):
+        if event["type"] == "token":
+            streamed_answer += event["content"]
+            placeholder.markdown(render_message("assistant", streamed_answer + "▌"), unsafe_allow_html=True)
+        else:
+            response = event["response"]
+
     msg = {"role": "assistant", "content": response['answer']}
     if response['cypher_query']:
         msg["cypher_query"] = response['cypher_query']
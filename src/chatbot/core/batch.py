@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from src.config.logger import logger
+from chatbot.core.chatbot import AIMLChatbot
+from chatbot.utils.llm_scheduler import llm_priority
+
+
+def question_id(row):
+    """
+    Girdi satırının kimliğini döner. "id" alanı yoksa soru ve arama tipinden türetilir,
+    böylece girdi dosyası yeniden sıralansa da devam etme doğru çalışır.
+    """
+    if row.get("id") is not None:
+        return str(row["id"])
+    key = f"{row.get('search_type') or ''}\n{row['question']}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def read_questions(path):
+    """
+    JSONL soru dosyasını okur. Her satır en az {"question": ...} içerir;
+    isteğe bağlı "id" ve "search_type" alanları desteklenir.
+    """
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if not row.get("question"):
+                logger.warning(f"{path}:{line_number} soru içermiyor, atlanıyor")
+                continue
+            rows.append(row)
+    return rows
+
+
+def read_records(path):
+    """
+    Çıktı dosyasındaki kayıtları soru kimliğine göre döner. Aynı kimlik için birden fazla kayıt
+    varsa (başarısız sorunun yeniden denenmesi gibi) son kayıt geçerlidir; kayıtlar kimliğin
+    dosyada ilk göründüğü sırayı korur. Yarım yazılmış satırlar yok sayılır.
+    """
+    records = {}
+    path = Path(path)
+    if not path.exists():
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["id"]] = record
+    return records
+
+
+def completed_ids(path, include_failed=False):
+    """
+    Önceki çalıştırmanın çıktı dosyasından tamamlanmış soru kimliklerini okur.
+    Her kimlik için son kayıt esas alınır (bkz. read_records).
+    """
+    return {record_id for record_id, record in read_records(path).items() if record.get("success") or include_failed}
+
+
+def compact_output(path):
+    """
+    Çıktı dosyasını her soru kimliği için yalnızca son kaydı içerecek şekilde yeniden yazar.
+    Dosya önce geçici bir dosyaya yazılır ve atomik olarak değiştirilir.
+    """
+    path = Path(path)
+    records = read_records(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        for record in records.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(temp_path, path)
+    return len(records)
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, 2)
+        return f.read(1) == b"\n"
+
+
+class BatchAnswerer:
+    """
+    Soruları sınırlı eşzamanlılıkla async olarak yanıtlar ve her sonucu tamamlandığı anda
+    JSONL çıktıya ekler. Her işçi kendi chatbot oturumunu kullanır, sorular birbirinden
+    bağımsız olarak (boş sohbet belleğiyle) sorulur. Başarısız yanıtlar üstel bekleme ile
+    yeniden denenir; çıktı dosyasında başarılı kaydı olan sorular yeniden çalıştırılmaz.
+    Çalıştırma tamamlandığında çıktı, her soru için son kaydı tutacak şekilde sıkıştırılır.
+    """
+
+    def __init__(self, llm_provider="OpenAI", model_name="gpt-4.1-nano-2025-04-14", temperature=0.1,
+                 search_type="Normal", concurrency=8, max_retries=3, retry_delay=2.0):
+        """
+        Args:
+            llm_provider: LLM sağlayıcısı
+            model_name: Model adı
+            temperature: Model temperature değeri
+            search_type: Satırda belirtilmediğinde kullanılacak arama tipi
+            concurrency: Aynı anda yanıtlanan en fazla soru sayısı
+            max_retries: Başarısız bir soru için en fazla yeniden deneme sayısı
+            retry_delay: İlk yeniden denemeden önceki bekleme (sn), her denemede iki katına çıkar
+        """
+        self.llm_provider = llm_provider
+        self.model_name = model_name
+        self.temperature = temperature
+        self.search_type = search_type
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    def _create_chatbot(self, search_type):
+        return AIMLChatbot(
+            llm_provider=self.llm_provider,
+            model_name=self.model_name,
+            temperature=self.temperature,
+            search_type=search_type
+        )
+
+    async def _answer(self, chatbots, row):
+        search_type = row.get("search_type") or self.search_type
+        if search_type not in chatbots:
+            chatbots[search_type] = await asyncio.to_thread(self._create_chatbot, search_type)
+        chatbot = chatbots[search_type]
+
+        started_at = time.time()
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            chatbot.memory.clear()
+            response = await chatbot.aget_response(row["question"])
+            if response.get("success") or attempt == self.max_retries:
+                break
+            delay = self.retry_delay * 2 ** attempt
+            logger.warning(f"Soru yanıtlanamadı, {delay:.1f} sn sonra tekrar denenecek: {response.get('answer')}")
+            await asyncio.sleep(delay)
+
+        return {
+            "id": question_id(row),
+            "question": row["question"],
+            "search_type": search_type,
+            "model": self.model_name,
+            "answer": response.get("answer"),
+            "cypher_query": response.get("cypher_query"),
+            "success": bool(response.get("success")),
+            "cached": bool(response.get("cached")),
+            "attempts": attempt + 1,
+            "started_at": started_at,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+    async def _worker(self, queue, output, progress):
+        chatbots = {}
+        # Toplu sorular LLM kotasında kullanıcı isteklerinin arkasında sıraya girer
+        with llm_priority("batch"):
+            while True:
+                row = await queue.get()
+                try:
+                    record = await self._answer(chatbots, row)
+                except Exception as e:
+                    logger.error(f"Batch sorusu hatası: {e}")
+                    record = {"id": question_id(row), "question": row["question"], "success": False, "error": str(e)}
+
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+                progress["done"] += 1
+                progress["failed"] += 0 if record["success"] else 1
+                logger.info(f"Batch: {progress['done']}/{progress['total']} tamamlandı ({progress['failed']} başarısız)")
+                queue.task_done()
+
+    async def arun(self, rows, output_path, retry_failed=True):
+        """
+        Çıktı dosyasında tamamlanmamış soruları yanıtlar.
+
+        Args:
+            rows: read_questions ile okunan soru satırları
+            output_path: Sonuçların eklendiği JSONL dosyası
+            retry_failed: Önceki çalıştırmada başarısız olan sorular tekrar sorulsun mu
+
+        Returns:
+            dict: total, skipped, done ve failed sayıları
+        """
+        done = completed_ids(output_path, include_failed=not retry_failed)
+        pending, seen = [], set(done)
+        for row in rows:
+            row_id = question_id(row)
+            if row_id not in seen:
+                seen.add(row_id)
+                pending.append(row)
+
+        progress = {"total": len(pending), "skipped": len(rows) - len(pending), "done": 0, "failed": 0}
+        if progress["skipped"]:
+            logger.info(f"Batch: {progress['skipped']} soru önceki çalıştırmada tamamlanmış, atlanıyor")
+        if not pending:
+            return progress
+
+        queue = asyncio.Queue()
+        for row in pending:
+            queue.put_nowait(row)
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "a", encoding="utf-8") as output:
+            # Önceki çalıştırma bir satırın ortasında kesildiyse yeni kayıtlar alt satırdan başlar
+            if not _ends_with_newline(output_path):
+                output.write("\n")
+            workers = [
+                asyncio.create_task(self._worker(queue, output, progress))
+                for _ in range(min(self.concurrency, len(pending)))
+            ]
+            try:
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+        # Yeniden denenen soruların eski başarısız kayıtları atılır
+        compact_output(output_path)
+        return progress
+
+    def run(self, rows, output_path, retry_failed=True):
+        return asyncio.run(self.arun(rows, output_path, retry_failed=retry_failed))
@@ -1,17 +1,29 @@
+import asyncio
 import os
-import torch
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
-from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
-from langchain.memory import ConversationBufferMemory
-from langchain_neo4j import GraphCypherQAChain, Neo4jGraph
+from langchain_core.runnables import RunnableLambda
 
 from src.config.prompts import cypher_prompt, qa_prompt, vector_response_prompt, condense_prompt
 from src.config.logger import logger, ChainLoggerCallbacks
+from src.config.settings import INTENT_ROUTER_ENABLED, MEMORY_MODE, CYPHER_GUARD_ENABLED
 from chatbot.core.reasoning_chain import ReasoningCypherChain
 from chatbot.core.vector_chain import VectorSearchChain
-from chatbot.utils.cleaning import clean_query, clean_response
+from chatbot.core.intent_router import IntentRouter
+from chatbot.core.cypher_guard import CypherGuard, build_query_corrector
+from chatbot.utils.chain_steps import chain_result
+from chatbot.utils.cleaning import clean_query, clean_response, filter_think_stream
+from chatbot.utils.cache import get_answer_cache, get_cypher_cache, get_query_cache, cached_query, cached_aquery
+from chatbot.utils.context_builder import ContextBuilder
+from chatbot.utils.memory import SummarizingMemory
+from chatbot.utils.embeddings import get_embeddings_model, embedding_cache_stats
+from chatbot.utils.schema_snapshot import ensure_schema
+from chatbot.utils.resources import (
+    get_resource, get_versioned_resource, get_graph, get_async_graph, get_plan_explainer, get_llm
+)
+from chatbot.utils.profiling import cold_start, lazy_import
+from chatbot.utils.tracing import tracer
+from chatbot.utils.singleflight import request_coalescer
+from chatbot.utils.llm_scheduler import llm_scheduler
 
 from dotenv import load_dotenv
 
@@ -21,13 +33,18 @@ load_dotenv()
 class AIMLChatbot:
     def __init__(self, llm_provider="OpenAI", model_name="gpt-4.1-nano-2025-04-14", temperature=0.1, search_type="Normal"):
         self.graph = None
+        self.async_graph = None
         self.chain = None
+        self.intent_router = None
         self.schema = None
         self.llm = None
         self.llm_provider = llm_provider
         self.model_name = model_name
         self.temperature = temperature
         self.search_type = search_type
+        self.answer_cache = get_answer_cache()
+        self.cypher_cache = get_cypher_cache()
+        self.query_cache = get_query_cache()
 
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.groq_api_key = os.getenv('GROQ_API_KEY')
@@ -40,136 +57,528 @@ class AIMLChatbot:
         self.initialize_connections()
 
     def initialize_connections(self):
-        try:
-            self.graph = Neo4jGraph(
-                url=os.getenv('NEO4J_URI'),
-                username=os.getenv('NEO4J_USERNAME'),
-                password=os.getenv('NEO4J_PASSWORD'),
-                database=os.getenv('NEO4J_DATABASE', 'neo4j')
-            )
+        """
+        Paylaşılan kaynakları (Neo4j bağlantıları, LLM istemcisi, zincirler) süreç genelindeki
+        kayıttan alır. Oturuma özel olan yalnızca konuşma belleğidir. Şema, veri sürümü
+        değişmedikçe snapshot'tan okunur; zincirler şemanın veri sürümüne göre ayrılır.
+        """
+        with cold_start.stage(f"initialize:{self.search_type}"):
+            try:
+                self.graph = get_graph()
+                self.async_graph = get_async_graph()
+                schema_version = ensure_schema(self.graph)
+                self.schema = self.graph.schema
+                self.llm = get_llm(self.llm_provider, self.model_name, self.temperature)
 
-            self.graph.refresh_schema()
-            self.schema = self.graph.schema
+                self.memory = self._create_memory()
 
-            if self.llm_provider == "Groq" and self.groq_api_key:
-                self.llm = ChatGroq(
-                    api_key=self.groq_api_key,
-                    model=self.model_name,
-                    temperature=self.temperature,
-                    max_tokens=4000
-                )
-            elif self.llm_provider == "OpenAI" and self.openai_api_key:
-                self.llm = ChatOpenAI(
-                    api_key=self.openai_api_key,
-                    model=self.model_name,
-                    temperature=self.temperature,
-                    max_tokens=3000
+                config_key = (self.llm_provider, self.model_name, self.temperature)
+                self.chain, self.intent_router = get_versioned_resource(
+                    ("chain", self.search_type) + config_key,
+                    schema_version,
+                    self._build_chain
                 )
-            else:
-                raise ValueError("Geçerli API anahtarı bulunamadı.")
+                self.question_rewriter_chain = get_resource(("condense",) + config_key, lambda: condense_prompt | self.llm)
+
+            except Exception as e:
+                logger.error(f"Initialization error: {str(e)}")
 
-            self.memory = ConversationBufferMemory(
+    def _create_memory(self):
+        """
+        Oturuma özel sohbet belleğini oluşturur. "summary" modunda son turlar olduğu gibi,
+        daha eskileri arka planda güncellenen özet olarak tutulur ve geçmiş token ile sınırlanır.
+        """
+        if MEMORY_MODE == "buffer":
+            ConversationBufferMemory = lazy_import("langchain.memory").ConversationBufferMemory
+            return ConversationBufferMemory(
                 return_messages=True,
                 memory_key="chat_history",
                 output_key="answer",
                 input_key="question"
             )
+        return SummarizingMemory(llm=self.llm, model_name=self.model_name)
 
-            if self.search_type == "Reasoning":
-                self.chain = ReasoningCypherChain(
-                    llm=self.llm,
-                    graph=self.graph,
-                    cypher_prompt=cypher_prompt,
-                    qa_prompt=qa_prompt,
-                    verbose=True,
-                    callbacks=ChainLoggerCallbacks()
-                )
-            elif self.search_type == "Vector Search":
-                device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    def _build_chain(self):
+        """
+        Arama tipine göre zinciri ve şablon yönlendiricisini oluşturur.
+        Zincirler oturum durumu tutmadığı için aynı yapılandırmadaki oturumlar arasında paylaşılır.
+        """
+        cypher_guard = None
+        if CYPHER_GUARD_ENABLED:
+            cypher_guard = CypherGuard(graph=self.graph, llm=self.llm, async_graph=self.async_graph,
+                                       plan_explainer=get_plan_explainer())
 
-                embeddings_model = HuggingFaceEmbeddings(
-                    model_name="sentence-transformers/all-MiniLM-L6-v2",
-                    model_kwargs={'device': device}
-                )
+        if self.search_type == "Reasoning":
+            chain = ReasoningCypherChain(
+                llm=self.llm,
+                graph=self.graph,
+                cypher_prompt=cypher_prompt,
+                qa_prompt=qa_prompt,
+                verbose=True,
+                callbacks=ChainLoggerCallbacks(),
+                cypher_cache=self.cypher_cache,
+                model_name=self.model_name,
+                async_graph=self.async_graph,
+                cypher_guard=cypher_guard
+            )
+        elif self.search_type == "Vector Search":
+            embeddings_model = get_embeddings_model()
+
+            chain = VectorSearchChain(
+                llm=self.llm,
+                graph=self.graph,
+                response_prompt=vector_response_prompt,
+                embeddings_model=embeddings_model,
+                verbose=True,
+                callbacks=ChainLoggerCallbacks(),
+                async_graph=self.async_graph
+            )
+        else:
+            GraphCypherQAChain = lazy_import("langchain_neo4j").GraphCypherQAChain
+            chain = GraphCypherQAChain.from_llm(
+                llm=self.llm,
+                graph=self.graph,
+                cypher_prompt=cypher_prompt,
+                qa_prompt=qa_prompt,
+                verbose=False,
+                callbacks=[ChainLoggerCallbacks()],
+                allow_dangerous_requests=True,
+                return_intermediate_steps=True,
+                return_direct=False,
+                chat_history=[]
+            )
+            if self.cypher_cache is not None:
+                chain.cypher_generation_chain = self._with_cypher_cache(chain.cypher_generation_chain)
+            chain.qa_chain = self._with_context_builder(chain.qa_chain)
+            chain.cypher_query_corrector = build_query_corrector(self.graph, cypher_guard)
+
+        intent_router = None
+        if INTENT_ROUTER_ENABLED and self.search_type != "Vector Search":
+            intent_router = IntentRouter(
+                llm=self.llm,
+                graph=self.graph,
+                qa_prompt=qa_prompt,
+                async_graph=self.async_graph
+            )
+
+        return chain, intent_router
+
+    def get_response(self, user_question):
+        with cold_start.stage(f"first_request:{self.search_type}"), self._trace() as trace:
+            try:
+                preprocessed_question, chain_input, cached = self._prepare_turn(user_question)
+                if cached is not None:
+                    trace.set(cached=True)
+                    return cached
 
-                self.chain = VectorSearchChain(
-                    llm=self.llm,
-                    graph=self.graph,
-                    response_prompt=vector_response_prompt,
-                    embeddings_model=embeddings_model,
-                    verbose=True,
-                    callbacks=ChainLoggerCallbacks()
+                result, coalesced = request_coalescer.do(
+                    self._coalescing_key(preprocessed_question),
+                    lambda: self._run_pipeline(chain_input)
                 )
-            else:
-                self.chain = GraphCypherQAChain.from_llm(
-                    llm=self.llm,
-                    graph=self.graph,
-                    cypher_prompt=cypher_prompt,
-                    qa_prompt=qa_prompt,
-                    verbose=True,
-                    callbacks=[ChainLoggerCallbacks()],
-                    allow_dangerous_requests=True,
-                    return_intermediate_steps=True,
-                    return_direct=False,
-                    chat_history=self.memory.load_memory_variables({}).get("chat_history", [])
+                if coalesced:
+                    trace.set(coalesced=True)
+
+                return self._finalize_turn(user_question, preprocessed_question, result)
+            except Exception as e:
+                logger.error(f"Query error: {str(e)}")
+                return self._error_response(e)
+
+    async def aget_response(self, user_question):
+        """
+        get_response'un async versiyonu. Soru yeniden yazma, Cypher üretimi, graph sorgusu,
+        retrieval ve yanıt adımları event loop'u bloklamadan çalışır.
+        """
+        with cold_start.stage(f"first_request:{self.search_type}"), self._trace() as trace:
+            try:
+                preprocessed_question, chain_input, cached = await self._aprepare_turn(user_question)
+                if cached is not None:
+                    trace.set(cached=True)
+                    return cached
+
+                result, coalesced = await request_coalescer.ado(
+                    self._coalescing_key(preprocessed_question),
+                    lambda: self._arun_pipeline(chain_input)
                 )
+                if coalesced:
+                    trace.set(coalesced=True)
 
-            self.question_rewriter_chain = condense_prompt | self.llm
+                return await asyncio.to_thread(self._finalize_turn, user_question, preprocessed_question, result)
+            except Exception as e:
+                logger.error(f"Query error: {str(e)}")
+                return self._error_response(e)
 
-        except Exception as e:
-            logger.error(f"Initialization error: {str(e)}")
+    def stream_response(self, user_question):
+        """
+        get_response'un akış (streaming) versiyonu.
+        Yanıt token'larını geldikçe {"type": "token", "content": ...} olarak,
+        en sonda da get_response ile aynı sözlüğü {"type": "response", "response": ...} olarak yield eder.
+        """
+        with cold_start.stage(f"first_request:{self.search_type}"), self._trace(stream=True) as trace:
+            try:
+                preprocessed_question, chain_input, cached = self._prepare_turn(user_question)
+                if cached is not None:
+                    trace.set(cached=True)
+                    yield {"type": "token", "content": cached['answer']}
+                    yield {"type": "response", "response": cached}
+                    return
+
+                result = yield from self._stream_coalesced(preprocessed_question, chain_input, trace)
+
+                yield {"type": "response", "response": self._finalize_turn(user_question, preprocessed_question, result)}
+            except Exception as e:
+                logger.error(f"Query error: {str(e)}")
+                yield {"type": "response", "response": self._error_response(e)}
+
+    def _coalescing_key(self, preprocessed_question):
+        return (preprocessed_question, self.search_type, self.llm_provider, self.model_name, self.temperature)
+
+    def _run_pipeline(self, chain_input):
+        result = None
+        if self.intent_router is not None:
+            result = self.intent_router.invoke(chain_input)
+        if result is None:
+            result = self._invoke_chain(chain_input)
+        return result
+
+    async def _arun_pipeline(self, chain_input):
+        result = None
+        if self.intent_router is not None:
+            result = await self.intent_router.ainvoke(chain_input)
+        if result is None:
+            result = await self._ainvoke_chain(chain_input)
+        return result
+
+    def _stream_pipeline(self, chain_input):
+        result = None
+        if self.intent_router is not None:
+            result = yield from self._token_events(self.intent_router.stream(chain_input))
+        if result is None:
+            result = yield from self._token_events(self._stream_chain(chain_input))
+        return result
+
+    def _stream_coalesced(self, preprocessed_question, chain_input, trace):
+        """
+        Aynı soru başka bir oturumda çalışıyorsa onun sonucunu bekleyip yanıtı tek parça yield eder,
+        çalışmıyorsa zinciri stream eder ve sonucu bekleyen oturumlarla paylaşır.
+        """
+        if not request_coalescer.enabled:
+            return (yield from self._stream_pipeline(chain_input))
+
+        key = self._coalescing_key(preprocessed_question)
+        future, leader = request_coalescer.begin(key)
+        if not leader:
+            trace.set(coalesced=True)
+            result = future.result()
+            yield {"type": "token", "content": result.get("result", "")}
+            return result
 
-    def get_response(self, user_question):
         try:
-            current_history = self.memory.load_memory_variables({})
-            preprocessed_question = self._preprocess_query(user_question, current_history)
-
-            chain_input = {
-                "query": preprocessed_question,
-                "chat_history": current_history.get("chat_history", [])
-            }
-
-            result = self.chain.invoke(chain_input)
-            answer = result.get('result', 'Yanıt verilemedi.')
-            intermediate_steps = result.get('intermediate_steps', [])
-            cypher_query = intermediate_steps[0].get('query', '') if intermediate_steps else ''
-
-            cypher_query = clean_query(cypher_query)
-
-            self.memory.save_context({"question": user_question}, {"answer": answer})
-
-            return {
-                'answer': answer,
-                'cypher_query': cypher_query,
-                'success': True
-            }
-        except Exception as e:
-            logger.error(f"Query error: {str(e)}")
-            return {
-                'answer': f'Hata: {str(e)}',
-                'cypher_query': None,
-                'success': False
-            }
+            result = yield from self._stream_pipeline(chain_input)
+        except BaseException as e:
+            request_coalescer.finish(key, future, error=e)
+            raise
+        request_coalescer.finish(key, future, result)
+        return result
+
+    def _trace(self, **attributes):
+        return tracer.trace("request", search_type=self.search_type, model=self.model_name, **attributes)
+
+    def _prepare_turn(self, user_question):
+        current_history = self.memory.load_memory_variables({})
+        preprocessed_question = self._preprocess_query(user_question, current_history)
+
+        cached = None
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get(preprocessed_question, self._cache_namespace())
+        return self._turn(user_question, preprocessed_question, current_history, cached)
+
+    async def _aprepare_turn(self, user_question):
+        current_history = self.memory.load_memory_variables({})
+        preprocessed_question = await self._apreprocess_query(user_question, current_history)
+
+        cached = None
+        if self.answer_cache is not None:
+            cached = await asyncio.to_thread(self.answer_cache.get, preprocessed_question, self._cache_namespace())
+        return self._turn(user_question, preprocessed_question, current_history, cached)
+
+    def _turn(self, user_question, preprocessed_question, current_history, cached):
+        """
+        Önbellekte yanıt varsa turu belleğe yazıp yanıtı, yoksa zincir girdisini döner.
+
+        Returns:
+            tuple: (standalone soru, zincir girdisi veya None, önbellekteki yanıt veya None)
+        """
+        if cached is not None:
+            self.memory.save_context({"question": user_question}, {"answer": cached['answer']})
+            return preprocessed_question, None, {**cached, 'cached': True}
+
+        chain_input = {
+            "query": preprocessed_question,
+            "chat_history": current_history.get("chat_history", [])
+        }
+        return preprocessed_question, chain_input, None
+
+    def _finalize_turn(self, user_question, preprocessed_question, result):
+        answer = result.get('result', 'Yanıt verilemedi.')
+        intermediate_steps = result.get('intermediate_steps', [])
+        cypher_query = intermediate_steps[0].get('query', '') if intermediate_steps else ''
+
+        cypher_query = clean_query(cypher_query)
+
+        if self.cypher_cache is not None and self.search_type == "Normal" and not result.get('intent'):
+            context = intermediate_steps[1].get('context', []) if len(intermediate_steps) > 1 else []
+            if context:
+                self.cypher_cache.put(preprocessed_question, self.graph.schema, self.model_name, cypher_query)
+
+        self.memory.save_context({"question": user_question}, {"answer": answer})
+
+        response = {
+            'answer': answer,
+            'cypher_query': cypher_query,
+            'success': True
+        }
+        if self.answer_cache is not None and not result.get('error'):
+            self.answer_cache.put(preprocessed_question, self._cache_namespace(), response)
+
+        return response
+
+    def _error_response(self, error):
+        return {
+            'answer': f'Hata: {str(error)}',
+            'cypher_query': None,
+            'success': False
+        }
+
+    def _cache_namespace(self):
+        return (self.search_type, self.model_name)
+
+    @staticmethod
+    def _token_events(token_stream):
+        while True:
+            try:
+                token = next(token_stream)
+            except StopIteration as stop:
+                return stop.value
+            yield {"type": "token", "content": token}
+
+    @property
+    def _uses_custom_chain(self):
+        # Reasoning ve Vector Search zincirleri invoke/ainvoke/stream'i kendileri sağlar;
+        # Normal aramada GraphCypherQAChain adımları burada ayrı ayrı çalıştırılır
+        return self.search_type in ("Reasoning", "Vector Search")
+
+    def _invoke_chain(self, chain_input):
+        if self._uses_custom_chain:
+            return self.chain.invoke(chain_input)
+        return self._invoke_cypher_qa(chain_input)
+
+    async def _ainvoke_chain(self, chain_input):
+        if self._uses_custom_chain:
+            return await self.chain.ainvoke(chain_input)
+        return await self._ainvoke_cypher_qa(chain_input)
+
+    def _cypher_generation_input(self, question):
+        return {"question": question, "schema": self.chain.graph_schema}
+
+    @staticmethod
+    def _extract_cypher(generated_cypher):
+        return lazy_import("langchain_neo4j.chains.graph_qa.cypher").extract_cypher(generated_cypher)
+
+    def _top_context(self, rows):
+        return rows[: self.chain.top_k]
+
+    @staticmethod
+    def _qa_input(question, context):
+        return {"question": question, "context": context}
+
+    def _cypher_qa_query(self, question):
+        """
+        GraphCypherQAChain'in Cypher üretimi, düzeltme ve graph sorgusu adımlarını çalıştırır.
+        Adımlar zincirin _call'ı yerine burada çağrılır, böylece her biri ayrı span olarak ölçülür.
+        """
+        with tracer.span("cypher_generation") as span:
+            generated_cypher = self.chain.cypher_generation_chain.invoke(self._cypher_generation_input(question))
+            span.record_tokens(response=generated_cypher)
+        generated_cypher = self._extract_cypher(generated_cypher)
+        if self.chain.cypher_query_corrector:
+            generated_cypher = self.chain.cypher_query_corrector(generated_cypher)
+
+        context = []
+        if generated_cypher:
+            context = self._top_context(cached_query(self.graph, generated_cypher))
+        return generated_cypher, context
+
+    async def _acypher_qa_query(self, question):
+        """
+        _cypher_qa_query metodunun async versiyonu.
+        """
+        with tracer.span("cypher_generation") as span:
+            generated_cypher = await self.chain.cypher_generation_chain.ainvoke(self._cypher_generation_input(question))
+            span.record_tokens(response=generated_cypher)
+        generated_cypher = self._extract_cypher(generated_cypher)
+        corrector = self.chain.cypher_query_corrector
+        if corrector:
+            acorrect = getattr(corrector, "acorrect", None)
+            generated_cypher = await acorrect(generated_cypher) if acorrect else corrector(generated_cypher)
+
+        context = []
+        if generated_cypher:
+            context = self._top_context(await cached_aquery(self.async_graph, generated_cypher))
+        return generated_cypher, context
+
+    def _invoke_cypher_qa(self, chain_input):
+        """
+        GraphCypherQAChain adımlarını sırayla çalıştırır.
+        """
+        question = chain_input["query"]
+        generated_cypher, context = self._cypher_qa_query(question)
+
+        with tracer.span("answer") as span:
+            answer = self.chain.qa_chain.invoke(self._qa_input(question, context))
+            span.record_tokens(response=answer)
+
+        return chain_result(answer, generated_cypher, context)
+
+    async def _ainvoke_cypher_qa(self, chain_input):
+        """
+        GraphCypherQAChain adımlarını async olarak çalıştırır. Zincirin kendi ainvoke'u
+        senkron _call'ı bir thread'de çalıştırdığı için adımlar burada ayrı ayrı çağrılır.
+        """
+        question = chain_input["query"]
+        generated_cypher, context = await self._acypher_qa_query(question)
+
+        with tracer.span("answer") as span:
+            answer = await self.chain.qa_chain.ainvoke(self._qa_input(question, context))
+            span.record_tokens(response=answer)
+
+        return chain_result(answer, generated_cypher, context)
+
+    def _stream_chain(self, chain_input):
+        if self._uses_custom_chain:
+            return (yield from self.chain.stream(chain_input))
+        return (yield from self._stream_cypher_qa(chain_input))
+
+    def _stream_cypher_qa(self, chain_input):
+        """
+        GraphCypherQAChain adımlarını sırayla çalıştırır, QA adımını stream eder.
+        """
+        question = chain_input["query"]
+        generated_cypher, context = self._cypher_qa_query(question)
+
+        with tracer.span("answer") as span:
+            answer = yield from filter_think_stream(self.chain.qa_chain.stream(self._qa_input(question, context)))
+            span.record_tokens(response=answer)
+
+        return chain_result(clean_response(answer), generated_cypher, context)
+
+    def _with_cypher_cache(self, generation_chain):
+        """
+        GraphCypherQAChain'in Cypher üretim adımını önbellekle sarmalar.
+        Önbellekte doğrulanmış bir sorgu varsa LLM çağrısı yapılmaz.
+        """
+        cypher_cache, graph, model_name = self.cypher_cache, self.graph, self.model_name
+
+        def lookup(inputs):
+            return cypher_cache.get(inputs["question"], graph.schema, model_name)
+
+        def generate(inputs, config=None, **kwargs):
+            cached = lookup(inputs)
+            if cached is not None:
+                return cached
+            return generation_chain.invoke(inputs, config=config)
+
+        async def agenerate(inputs, config=None, **kwargs):
+            cached = lookup(inputs)
+            if cached is not None:
+                return cached
+            return await generation_chain.ainvoke(inputs, config=config)
+
+        return RunnableLambda(generate, afunc=agenerate)
+
+    def _with_context_builder(self, qa_chain):
+        """
+        GraphCypherQAChain'in QA adımına giden sorgu sonuçlarını, token bütçesine göre
+        kısaltılmış kompakt bağlam metnine çevirir.
+        """
+        context_builder = ContextBuilder(model_name=self.model_name)
+
+        def build_context(inputs, config=None, **kwargs):
+            return {**inputs, "context": context_builder.build_rows(inputs["context"])}
+
+        return RunnableLambda(build_context) | qa_chain
+
+    def cache_stats(self):
+        """
+        Yanıt, Cypher, sorgu ve embedding önbelleklerinin isabet/ıskalama istatistiklerini döner.
+        """
+        return {
+            "answer": self.answer_cache.stats() if self.answer_cache is not None else {},
+            "cypher": self.cypher_cache.stats() if self.cypher_cache is not None else {},
+            "query": self.query_cache.stats() if self.query_cache is not None else {},
+            "embedding": embedding_cache_stats(),
+        }
+
+    def coalescing_stats(self):
+        """
+        Eşzamanlı aynı soruların birleştirilme sayılarını döner: çalıştırılan zincir sayısı,
+        başka bir çalıştırmanın sonucunu paylaşan istek sayısı ve o an çalışan iş sayısı.
+        """
+        return request_coalescer.stats()
+
+    def llm_scheduler_stats(self):
+        """
+        LLM zamanlayıcısının sağlayıcı/model başına istek, token, kota beklemesi ve
+        sıra derinliği metriklerini döner.
+        """
+        return llm_scheduler.stats()
+
+    def trace_stats(self):
+        """
+        Son isteklerden aşama (span) başına sayı ve p50/p95/p99 gecikmelerini döner.
+        """
+        return tracer.stats()
+
+    @staticmethod
+    def _has_history(history_data):
+        # Geçmiş ve özet boşken yeniden yazılacak bağlam yoktur; condense LLM çağrısı atlanır
+        return bool(history_data.get("summary") or history_data.get("chat_history"))
 
     def _preprocess_query(self, query, history_data):
-        current_history = history_data.get("chat_history", [])
-        
-        chat_history_str = ""
-        
-        for msg in current_history:
+        if not self._has_history(history_data):
+            return query
+        with tracer.span("condense") as span:
+            result = self.question_rewriter_chain.invoke(self._condense_input(query, history_data))
+            span.record_tokens(response=result)
+        return self._standalone_question(result, query)
+
+    async def _apreprocess_query(self, query, history_data):
+        if not self._has_history(history_data):
+            return query
+        with tracer.span("condense") as span:
+            result = await self.question_rewriter_chain.ainvoke(self._condense_input(query, history_data))
+            span.record_tokens(response=result)
+        return self._standalone_question(result, query)
+
+    def _condense_input(self, query, history_data):
+        return {"chat_history": self._history_to_string(history_data), "question": query}
+
+    def _history_to_string(self, history_data):
+        lines = []
+        if history_data.get("summary"):
+            lines.append(f"Önceki sohbetin özeti: {history_data['summary']}")
+
+        for msg in history_data.get("chat_history", []):
             if isinstance(msg, dict):
                 role = msg.get("role", "user")
                 content = msg.get("content", "")
             else:
-                role = getattr(msg, "role", "user")
+                role = "assistant" if getattr(msg, "type", "") == "ai" else "user"
                 content = getattr(msg, "content", "")
-            chat_history_str += f"{role}: {content}\n"
-        
-        result = self.question_rewriter_chain.invoke({
-            "chat_history": chat_history_str,
-            "question": query
-        })
+            lines.append(f"{role}: {content}")
+
+        return "".join(f"{line}\n" for line in lines)
 
+    def _standalone_question(self, result, query):
         if hasattr(result, 'content'):
             standalone_question = result.content
         elif isinstance(result, dict):
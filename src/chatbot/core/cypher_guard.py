@@ -0,0 +1,266 @@
+import asyncio
+import re
+
+from src.config.settings import (
+    CYPHER_GUARD_MAX_ESTIMATED_ROWS,
+    CYPHER_GUARD_DEFAULT_LIMIT,
+    CYPHER_GUARD_MAX_REPAIRS,
+)
+from src.config.prompts import cypher_repair_prompt
+from src.config.logger import logger, log_payload
+from chatbot.utils.cache import LRUCache
+from chatbot.utils.chain_steps import response_text, user_messages
+from chatbot.utils.cleaning import clean_query
+from chatbot.utils.name_search import rewrite_name_predicates
+from chatbot.utils.profiling import lazy_import
+from chatbot.utils.tracing import tracer
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+WRITE_CLAUSE_PATTERN = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV|IN\s+TRANSACTIONS)\b",
+    re.IGNORECASE
+)
+# Yalnızca ilişki desenlerinde (-[...]-) üst sınırı olmayan genişlemeler: [*], [:R*], [*2..], [*..]
+# Sınırlı genişlemeler ([*2], [*1..3], [*..3]) ve liste ifadeleri ([x IN l | x * 2]) eşleşmez
+UNBOUNDED_EXPANSION_PATTERN = re.compile(r"-\s*\[[^\[\]]*\*\s*(?:\d*\s*\.\.\s*)?\]\s*-")
+LIMIT_PATTERN = re.compile(r"\bLIMIT\s+(\d+|\$\w+)\b", re.IGNORECASE)
+
+
+def _strip_literals(cypher_query):
+    return STRING_LITERAL_PATTERN.sub("''", cypher_query)
+
+
+def _max_estimated_rows(plan):
+    if not plan:
+        return 0
+    rows = plan.get("args", plan.get("arguments", {})).get("EstimatedRows", 0) or 0
+    return max([rows] + [_max_estimated_rows(child) for child in plan.get("children", [])])
+
+
+class CypherGuard:
+    """
+    LLM tarafından üretilen Cypher sorgularını çalıştırılmadan önce denetler.
+    Yazma işlemi içeren, sınırsız değişken uzunluklu genişleme yapan veya EXPLAIN planına
+    göre tahmini satır sayısı eşiği aşan sorgular reddedilir; LIMIT içermeyen sorgulara
+    LIMIT eklenir. Reddedilen sorgu, LLM ile onarılıp tekrar denetlenir.
+    """
+
+    def __init__(self, graph, llm=None, async_graph=None, plan_explainer=None, max_estimated_rows=CYPHER_GUARD_MAX_ESTIMATED_ROWS,
+                 default_limit=CYPHER_GUARD_DEFAULT_LIMIT, max_repairs=CYPHER_GUARD_MAX_REPAIRS, verbose=True):
+        """
+        Args:
+            graph: Neo4jGraph bağlantısı (şema için kullanılır)
+            llm: Reddedilen sorguları onarmak için kullanılacak LLM (None ise onarım yapılmaz)
+            async_graph: AsyncNeo4jGraph bağlantısı (async EXPLAIN için)
+            plan_explainer: Senkron EXPLAIN için PlanExplainer (None ise senkron denetim planı atlar)
+            max_estimated_rows: Plandaki herhangi bir operatör için izin verilen tahmini satır sayısı
+            default_limit: LIMIT içermeyen sorgulara eklenecek değer
+            max_repairs: Reddedilen bir sorgu için yapılacak en fazla onarım denemesi
+            verbose: Kararları logla
+        """
+        self.graph = graph
+        self.llm = llm
+        self.async_graph = async_graph
+        self.plan_explainer = plan_explainer
+        self.max_estimated_rows = max_estimated_rows
+        self.default_limit = default_limit
+        self.max_repairs = max_repairs
+        self.verbose = verbose
+        self._verdicts = LRUCache(max_entries=2000, ttl=3600)
+
+    def with_limit(self, cypher_query):
+        """
+        Sorgunun son RETURN bölümünde LIMIT yoksa varsayılan LIMIT'i ekler.
+        """
+        cypher_query = cypher_query.strip().rstrip(";").strip()
+        stripped = _strip_literals(cypher_query)
+        if re.search(r"\bUNION\b", stripped, re.IGNORECASE):
+            return cypher_query
+        last_return = list(re.finditer(r"\bRETURN\b", stripped, re.IGNORECASE))
+        if not last_return or LIMIT_PATTERN.search(stripped[last_return[-1].start():]):
+            return cypher_query
+        return f"{cypher_query}\nLIMIT {self.default_limit}"
+
+    def _static_check(self, cypher_query):
+        stripped = _strip_literals(cypher_query)
+        write_clause = WRITE_CLAUSE_PATTERN.search(stripped)
+        if write_clause:
+            return f"Yazma işlemi içeren sorgulara izin verilmiyor ({write_clause.group(1).upper()})"
+        if UNBOUNDED_EXPANSION_PATTERN.search(stripped):
+            return "Üst sınırı olmayan değişken uzunluklu ilişki genişlemesi"
+        return None
+
+    def _plan_check(self, summary):
+        if summary is None:
+            return None
+        if summary.query_type not in (None, "r"):
+            return f"Sorgu salt okunur değil (query_type={summary.query_type})"
+        estimated_rows = _max_estimated_rows(summary.plan)
+        if estimated_rows > self.max_estimated_rows:
+            return f"Tahmini satır sayısı çok yüksek ({estimated_rows:.0f} > {self.max_estimated_rows})"
+        return None
+
+    def _explain_error(self, error):
+        """
+        EXPLAIN hatasını karara çevirir. Sözdizimi ve istemci hataları sorgunun kendisinden
+        kaynaklandığı için reddedilir ve karar önbelleğe alınır. Bağlantı kopması gibi
+        geçici hatalarda sorgu plan denetimi olmadan geçirilir ve karar önbelleğe alınmaz.
+
+        Returns:
+            tuple: (reddedilme nedeni veya None, karar önbelleğe alınsın mı)
+        """
+        if isinstance(error, lazy_import("neo4j.exceptions").ClientError):
+            return f"Sorgu planlanamadı: {error}", True
+        logger.warning(f"EXPLAIN çalıştırılamadı, sorgu plan denetimi olmadan geçiriliyor: {error}")
+        return None, False
+
+    def _repair_prompt(self, cypher_query, reason):
+        return cypher_repair_prompt.format(schema=self.graph.schema, query=cypher_query, reason=reason)
+
+    def _parse_repair(self, response):
+        extract_cypher = lazy_import("langchain_neo4j.chains.graph_qa.cypher").extract_cypher
+        cypher_query = clean_query(extract_cypher(response_text(response)))
+        return rewrite_name_predicates(cypher_query, self.graph.schema)
+
+    # Denetim ve onarım adımları I/O yapmaz: EXPLAIN ve onarım için ("explain", sorgu) veya
+    # ("repair", prompt) isteği üretir, sonucu send ile (hatayı throw ile) alır. Senkron ve
+    # async metotlar yalnızca bu istekleri yerine getirir.
+
+    def _check_steps(self, cypher_query):
+        cypher_query = self.with_limit(cypher_query)
+        verdict = self._verdicts.get(cypher_query)
+        if verdict is not None:
+            return cypher_query, verdict or None
+
+        reason, cacheable = self._static_check(cypher_query), True
+        if reason is None:
+            try:
+                summary = yield ("explain", cypher_query)
+            except Exception as e:
+                reason, cacheable = self._explain_error(e)
+            else:
+                reason = self._plan_check(summary)
+        if cacheable:
+            self._verdicts.put(cypher_query, reason or "")
+        return cypher_query, reason
+
+    def _guard_steps(self, cypher_query):
+        with tracer.span("cypher_guard") as span:
+            for attempt in range(self.max_repairs + 1):
+                cypher_query, reason = yield from self._check_steps(cypher_query)
+                if reason is None:
+                    span.set(repairs=attempt)
+                    return cypher_query
+                logger.warning(f"Cypher sorgusu engellendi: {reason}\n{cypher_query}")
+                if self.llm is None or attempt == self.max_repairs:
+                    break
+                response = yield ("repair", self._repair_prompt(cypher_query, reason))
+                cypher_query = self._parse_repair(response)
+                if self.verbose:
+                    log_payload(f"Onarılan Cypher sorgusu: {cypher_query}")
+            span.set(repairs=attempt, blocked=True)
+            return ""
+
+    def _explain(self, cypher_query):
+        # Senkron EXPLAIN için PlanExplainer gerekir; yoksa yalnızca statik denetim yapılır
+        if self.plan_explainer is None:
+            return None
+        return self.plan_explainer.explain(cypher_query)
+
+    async def _aexplain(self, cypher_query):
+        if self.async_graph is None:
+            return await asyncio.to_thread(self._explain, cypher_query)
+        return await self.async_graph.aexplain(cypher_query)
+
+    def _run(self, steps):
+        try:
+            request = next(steps)
+            while True:
+                kind, argument = request
+                try:
+                    if kind == "explain":
+                        result = self._explain(argument)
+                    else:
+                        result = self.llm.invoke(user_messages(argument))
+                except Exception as e:
+                    request = steps.throw(e)
+                else:
+                    request = steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+
+    async def _arun(self, steps):
+        try:
+            request = next(steps)
+            while True:
+                kind, argument = request
+                try:
+                    if kind == "explain":
+                        result = await self._aexplain(argument)
+                    else:
+                        result = await self.llm.ainvoke(user_messages(argument))
+                except Exception as e:
+                    request = steps.throw(e)
+                else:
+                    request = steps.send(result)
+        except StopIteration as stop:
+            return stop.value
+
+    def check(self, cypher_query):
+        """
+        Sorguyu denetler.
+
+        Returns:
+            tuple: (LIMIT eklenmiş sorgu, reddedilme nedeni veya None)
+        """
+        return self._run(self._check_steps(cypher_query))
+
+    async def acheck(self, cypher_query):
+        """
+        check metodunun async versiyonu.
+        """
+        return await self._arun(self._check_steps(cypher_query))
+
+    def guard(self, cypher_query):
+        """
+        Sorguyu denetler, reddedilirse onarmayı dener.
+
+        Returns:
+            str: Çalıştırılabilir sorgu; onarılamazsa boş string
+        """
+        if not cypher_query:
+            return cypher_query
+        return self._run(self._guard_steps(cypher_query))
+
+    async def aguard(self, cypher_query):
+        """
+        guard metodunun async versiyonu.
+        """
+        if not cypher_query:
+            return cypher_query
+        return await self._arun(self._guard_steps(cypher_query))
+
+
+def build_query_corrector(graph, guard=None):
+    """
+    GraphCypherQAChain'in cypher_query_corrector adımı olarak kullanılacak düzelticiyi oluşturur.
+    Üretilen sorgudaki isim aramaları indeksli alana yönlendirilir, ardından (varsa) CypherGuard
+    denetimi uygulanır.
+    """
+    CypherQueryCorrector = lazy_import("langchain_neo4j.chains.graph_qa.cypher_utils").CypherQueryCorrector
+
+    class GuardedQueryCorrector(CypherQueryCorrector):
+        def __init__(self):
+            super().__init__(schemas=[])
+            self.graph = graph
+            self.guard = guard
+
+        def __call__(self, query):
+            query = rewrite_name_predicates(query, self.graph.schema)
+            return self.guard.guard(query) if self.guard is not None else query
+
+        async def acorrect(self, query):
+            query = rewrite_name_predicates(query, self.graph.schema)
+            return await self.guard.aguard(query) if self.guard is not None else query
+
+    return GuardedQueryCorrector()
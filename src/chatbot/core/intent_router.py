@@ -0,0 +1,301 @@
+import asyncio
+import re
+
+from chatbot.utils.chain_steps import chain_result, response_text, stream_text, user_messages
+from chatbot.utils.cleaning import clean_response, filter_think_stream
+from chatbot.utils.cache import cached_query, cached_aquery
+from chatbot.utils.context_builder import ContextBuilder
+from chatbot.utils.name_search import rewrite_name_predicates
+from chatbot.utils.tracing import tracer
+from src.config.logger import logger
+
+PAPER_FIELDS = """p.name AS paper_name,
+       p.publication_date AS publication_date,
+       p.arxiv_link AS arxiv_link,
+       p.pwc_link AS pwc_link"""
+
+# Parametreli ve önceden doğrulanmış Cypher şablonları; isim aramaları TEXT index'li name_lower alanını kullanır
+CYPHER_TEMPLATES = {
+    "paper_authors": """
+MATCH (a:Author)-[:AUTHORED]->(p:Paper)
+WHERE p.name_lower CONTAINS toLower($paper)
+RETURN p.name AS paper_name,
+       COLLECT(DISTINCT {name: a.name, link: a.link}) AS authors
+LIMIT 5
+""",
+    "paper_code": """
+MATCH (p:Paper)-[:HAS_CODE]->(c:Code)
+WHERE p.name_lower CONTAINS toLower($paper)
+RETURN p.name AS paper_name,
+       COLLECT(DISTINCT {name: c.name, link: c.link, star: c.star}) AS code_repositories
+LIMIT 5
+""",
+    "paper_datasets": """
+MATCH (p:Paper)-[:USES_DATASET]->(d:Dataset)
+WHERE p.name_lower CONTAINS toLower($paper)
+RETURN p.name AS paper_name,
+       COLLECT(DISTINCT {name: d.name, link: d.link}) AS datasets
+LIMIT 5
+""",
+    "paper_methods": """
+MATCH (p:Paper)-[:USES_METHOD]->(m:Method)
+WHERE p.name_lower CONTAINS toLower($paper)
+RETURN p.name AS paper_name,
+       COLLECT(DISTINCT {name: m.name, link: m.link}) AS methods
+LIMIT 5
+""",
+    "paper_tasks": """
+MATCH (p:Paper)-[:ADDRESSES_TASK]->(t:Task)
+WHERE p.name_lower CONTAINS toLower($paper)
+RETURN p.name AS paper_name,
+       COLLECT(DISTINCT {name: t.name, link: t.link}) AS tasks
+LIMIT 5
+""",
+    "paper_details": f"""
+MATCH (p:Paper)
+WHERE p.name_lower CONTAINS toLower($paper)
+RETURN {PAPER_FIELDS},
+       p.arxiv_id AS arxiv_id,
+       p.abstract AS abstract
+LIMIT 5
+""",
+    "author_papers": f"""
+MATCH (a:Author)-[:AUTHORED]->(p:Paper)
+WHERE a.name_lower CONTAINS toLower($author)
+RETURN a.name AS author_name,
+       {PAPER_FIELDS}
+ORDER BY p.publication_date DESC LIMIT 20
+""",
+    "method_papers": f"""
+MATCH (p:Paper)-[:USES_METHOD]->(m:Method)
+WHERE m.name_lower CONTAINS toLower($method)
+RETURN m.name AS method_name,
+       m.link AS method_link,
+       {PAPER_FIELDS}
+LIMIT 20
+""",
+    "dataset_papers": f"""
+MATCH (p:Paper)-[:USES_DATASET]->(d:Dataset)
+WHERE d.name_lower CONTAINS toLower($dataset)
+RETURN d.name AS dataset_name,
+       d.link AS dataset_link,
+       {PAPER_FIELDS}
+LIMIT 20
+""",
+    "task_papers": f"""
+MATCH (p:Paper)-[:ADDRESSES_TASK]->(t:Task)
+WHERE t.name_lower CONTAINS toLower($task)
+RETURN t.name AS task_name,
+       t.link AS task_link,
+       {PAPER_FIELDS}
+LIMIT 20
+""",
+}
+
+# Türkçe kalıpların sonunda izin verilen soru ekleri; kalıplar bu ekle bitmeyen (örn. birden fazla
+# bilgi isteyen veya ek koşul içeren) soruları eşlemez ve soru LLM zincirine bırakılır
+QUESTION_SUFFIX = (
+    r"(?:\s+(?:nelerdir|neler|nedir|kimlerdir|kimdir|kimler|hangileri(?:dir)?|hangisidir"
+    r"|listeler\s+misin|listele|gösterir\s+misin|göster|verir\s+misin|ver|söyler\s+misin|var\s+mı))?$"
+)
+PAPER_DETAIL = r"(?:özet\w*|yayın\s+tarih\w*|tarih\w*|link\w*|bağlantı\w*|arxiv|papers\s+with\s+code|bilgi\w*|detay\w*)"
+
+# (intent, regex) çiftleri; sıralama önemlidir, daha özel kalıplar önce gelir
+INTENT_PATTERNS = [
+    ("paper_code", r"^(?P<paper>.+?)\s+makalesi(?:yle|ne|nin)?\s+(?:(?:ilişkili|ilgili|ait)\s+)?(?:kod(?:\s+depo\w*|u|ları)?|github(?:\s+(?:link|repo|depo)\w*)?|repo\w*)" + QUESTION_SUFFIX),
+    ("paper_code", r"^(?:what are the |which are the )?(?:code repositories|code repos|repositories|github (?:repos|repositories|links)) (?:for|of|related to) (?:the )?(?:paper )?(?P<paper>.+?)$"),
+    ("paper_authors", r"^(?P<paper>.+?)\s+makalesinin\s+yazar(?:ı|ları)" + QUESTION_SUFFIX),
+    ("paper_authors", r"^(?P<paper>.+?)\s+makalesini\s+kim(?:ler)?\s+yaz(?:dı|mış|mıştır)$"),
+    ("paper_authors", r"^(?:who (?:are|were) the )?authors? of (?:the )?(?:paper )?(?P<paper>.+?)$"),
+    ("paper_authors", r"^who wrote (?:the )?(?:paper )?(?P<paper>.+?)$"),
+    ("paper_datasets", r"^(?P<paper>.+?)\s+makalesinde(?:ki)?\s+(?:hangi\s+|kullanılan\s+)?(?:veri\s*set\w*|dataset\w*)(?:\s+kullanıl(?:mış|mıştır|dı))?" + QUESTION_SUFFIX),
+    ("paper_datasets", r"^(?:which|what) datasets? (?:are|were|is|was) used in (?:the )?(?:paper )?(?P<paper>.+?)$"),
+    ("paper_methods", r"^(?P<paper>.+?)\s+makalesinde(?:ki)?\s+(?:hangi\s+|kullanılan\s+)?(?:yöntem\w*|metod\w*|method\w*)(?:\s+\(methods\))?(?:\s+kullanıl(?:mış|mıştır|dı))?" + QUESTION_SUFFIX),
+    ("paper_methods", r"^(?:which|what) methods? (?:are|were|is|was) used in (?:the )?(?:paper )?(?P<paper>.+?)$"),
+    ("paper_tasks", r"^(?P<paper>.+?)\s+makalesi(?:nde|nin)?\s+(?:hangi\s+|ele\s+aldığı\s+)?(?:görev\w*|task\w*)(?:\s+ele\s+alın(?:mış|mıştır|dı))?" + QUESTION_SUFFIX),
+    ("paper_tasks", r"^(?:which|what) tasks? (?:does|do|did) (?:the )?(?:paper )?(?P<paper>.+?) address$"),
+    ("paper_details", r"^(?P<paper>.+?)\s+makalesinin\s+" + PAPER_DETAIL + r"(?:\s*(?:,|\s+ve)?\s+" + PAPER_DETAIL + r")*" + QUESTION_SUFFIX),
+    ("paper_details", r"^(?:what is the )?(?:abstract|summary|publication date|links?) of (?:the )?(?:paper )?(?P<paper>.+?)$"),
+    ("author_papers", r"^(?P<author>.+?)['’]\w*\s+(?:yazdığı|yayınladığı)\s+(?:tüm\s+|bütün\s+)?makale\w*" + QUESTION_SUFFIX),
+    ("author_papers", r"^(?P<author>.+?)\s+tarafından\s+yazılan\s+(?:tüm\s+|bütün\s+)?makale\w*" + QUESTION_SUFFIX),
+    ("author_papers", r"^(?:list |show )?(?:all )?(?:the )?papers (?:written |authored )?by (?P<author>.+?)$"),
+    ("method_papers", r"^(?P<method>.+?)\s+(?:yöntemini|yöntemi|metodunu|metodu|methodunu)\s+kullanan\s+makale\w*" + QUESTION_SUFFIX),
+    ("method_papers", r"^(?:which|what) papers use (?:the )?(?P<method>.+?) method$"),
+    ("dataset_papers", r"^(?P<dataset>.+?)\s+veri\s*setini\s+kullanan\s+makale\w*" + QUESTION_SUFFIX),
+    ("dataset_papers", r"^(?:which|what) papers use (?:the )?(?P<dataset>.+?) dataset$"),
+    ("task_papers", r"^(?P<task>.+?)\s+görevini\s+(?:ele alan|hedefleyen|çözen|inceleyen)\s+makale\w*" + QUESTION_SUFFIX),
+    ("task_papers", r"^(?:which|what) papers (?:address|work on|tackle) (?:the )?(?P<task>.+?) task$"),
+]
+
+# Bağlaç (birden fazla varlık), zamir (önceki bağlama gönderme) veya başka bir varlığa gönderme
+# içeren yakalamalar tek bir isim değildir; bu sorular şablonla değil LLM zinciriyle yanıtlanır
+COMPOUND_CAPTURE_PATTERN = re.compile(
+    r"\b(?:ve|veya|ya da|ile|and|or|by|papers?|makale\w*|yazar\w*|authors?)\b|[,;&]",
+    re.IGNORECASE
+)
+PRONOUN_CAPTURE_PATTERN = re.compile(
+    r"^(?:it|its|this|that|these|those|they|them|their|he|she|his|her"
+    r"|o|onu|onun|bu|bunu|bunun|bunlar\w*|şu|şunu|şunun|onlar\w*)\b",
+    re.IGNORECASE
+)
+
+
+def is_ambiguous_capture(value):
+    """
+    Yakalanan değerin tek ve açık bir varlık ismi olmadığını (bağlaç, zamir veya iç içe gönderme) bildirir.
+    """
+    return bool(COMPOUND_CAPTURE_PATTERN.search(value) or PRONOUN_CAPTURE_PATTERN.search(value))
+
+
+def render_cypher(cypher_query, params):
+    """
+    Parametreli sorguyu, kullanıcıya gösterilmek üzere değerleri yerine koyarak döner.
+    """
+    rendered = cypher_query
+    for name, value in params.items():
+        literal = "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+        rendered = re.sub(rf"\${name}\b", lambda _: literal, rendered)
+    return rendered.strip()
+
+
+class IntentRouter:
+    """
+    Sık görülen soru kalıplarını Cypher şablonlarına eşler ve LLM ile Cypher
+    üretmeden doğrudan çalıştırır. Eşleşme olmazsa None döner ve zincire geri düşülür.
+    """
+
+    def __init__(self, llm, graph, qa_prompt, verbose=True, async_graph=None):
+        self.llm = llm
+        self.graph = graph
+        self.async_graph = async_graph
+        self.qa_prompt = qa_prompt
+        self.verbose = verbose
+        self.context_builder = ContextBuilder(model_name=getattr(llm, "model_name", None))
+        self.patterns = [(intent, re.compile(pattern, re.IGNORECASE)) for intent, pattern in INTENT_PATTERNS]
+
+    def match(self, question):
+        """
+        Soruyu bilinen kalıplarla eşleştirir.
+
+        Args:
+            question (str): Standalone soru
+
+        Returns:
+            tuple | None: (intent, parametreler) veya None
+        """
+        text = question.strip().rstrip("?!. ").strip()
+        text = re.sub(r"^(?:soru|question)\s*:\s*", "", text, flags=re.IGNORECASE)
+        for intent, pattern in self.patterns:
+            match = pattern.search(text)
+            if not match:
+                continue
+            params = {}
+            for name, value in match.groupdict().items():
+                value = value.strip().strip("\"'“”‘’").strip()
+                if len(value) < 2:
+                    break
+                if is_ambiguous_capture(value):
+                    if self.verbose:
+                        logger.info(f"Şablon yakalaması belirsiz, LLM zincirine geçiliyor: {name}={value!r}")
+                    return None
+                params[name] = value
+            else:
+                return intent, params
+        return None
+
+    def _resolve(self, question):
+        matched = self.match(question)
+        if matched is None:
+            return None
+
+        intent, params = matched
+        if self.verbose:
+            logger.info(f"Şablon eşleşti: {intent} {params}")
+        return intent, rewrite_name_predicates(CYPHER_TEMPLATES[intent], self.graph.schema), params
+
+    def _template_result(self, intent, cypher_query, params, results):
+        if not results:
+            if self.verbose:
+                logger.info(f"Şablon sonuç döndürmedi, LLM zincirine geçiliyor: {intent}")
+            return None
+        return intent, render_cypher(cypher_query, params), results
+
+    def _template_error(self, error):
+        logger.error(f"Şablon sorgusu hatası: {error}")
+        return None
+
+    def _answer_prompt(self, question, template_result):
+        _, _, results = template_result
+        return self.qa_prompt.format(question=question, context=self.context_builder.build_rows(results))
+
+    @staticmethod
+    def _result(template_result, answer):
+        intent, cypher_query, results = template_result
+        return chain_result(answer, cypher_query, results, intent=intent)
+
+    def _run_template(self, question):
+        resolved = self._resolve(question)
+        if resolved is None:
+            return None
+
+        intent, cypher_query, params = resolved
+        try:
+            results = cached_query(self.graph, cypher_query, params)
+        except Exception as e:
+            return self._template_error(e)
+        return self._template_result(intent, cypher_query, params, results)
+
+    async def _arun_template(self, question):
+        resolved = self._resolve(question)
+        if resolved is None:
+            return None
+
+        intent, cypher_query, params = resolved
+        try:
+            if self.async_graph is None:
+                results = await asyncio.to_thread(cached_query, self.graph, cypher_query, params)
+            else:
+                results = await cached_aquery(self.async_graph, cypher_query, params)
+        except Exception as e:
+            return self._template_error(e)
+        return self._template_result(intent, cypher_query, params, results)
+
+    def invoke(self, inputs):
+        question = inputs.get("query", "")
+        template_result = self._run_template(question)
+        if template_result is None:
+            return None
+
+        prompt_text = self._answer_prompt(question, template_result)
+        with tracer.span("answer") as span:
+            llm_response = self.llm.invoke(user_messages(prompt_text))
+            span.record_tokens(prompt_text, llm_response)
+        return self._result(template_result, clean_response(response_text(llm_response)))
+
+    async def ainvoke(self, inputs):
+        question = inputs.get("query", "")
+        template_result = await self._arun_template(question)
+        if template_result is None:
+            return None
+
+        prompt_text = self._answer_prompt(question, template_result)
+        with tracer.span("answer") as span:
+            llm_response = await self.llm.ainvoke(user_messages(prompt_text))
+            span.record_tokens(prompt_text, llm_response)
+        return self._result(template_result, clean_response(response_text(llm_response)))
+
+    def stream(self, inputs):
+        """
+        Şablon eşleşirse yanıtı token token yield eder, eşleşmezse hiçbir şey
+        yield etmeden None döner.
+        """
+        question = inputs.get("query", "")
+        template_result = self._run_template(question)
+        if template_result is None:
+            return None
+
+        prompt_text = self._answer_prompt(question, template_result)
+        with tracer.span("answer") as span:
+            answer = yield from filter_think_stream(stream_text(self.llm.stream(user_messages(prompt_text))))
+            span.record_tokens(prompt_text, answer)
+        return self._result(template_result, clean_response(answer))
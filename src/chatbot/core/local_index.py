@@ -0,0 +1,362 @@
+import asyncio
+import hashlib
+import importlib.util
+import json
+import threading
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config.settings import LOCAL_INDEX_DIR, LOCAL_INDEX_USE_HNSW, VECTOR_QUANTIZATION, VECTOR_RESCORE_OVERSAMPLE
+from src.config.logger import logger
+from chatbot.core.vector_chain import CHUNK_METADATA_PROJECTION
+from chatbot.utils.cache import LRUCache
+from chatbot.utils.data_version import data_version_tracker
+from chatbot.utils.profiling import lazy_import
+from chatbot.utils.quantization import QuantizedMatrix, rescore
+from chatbot.utils.tracing import tracer
+
+EMBEDDINGS_PAGE_QUERY = """
+MATCH (c:Chunk)
+WHERE c.embedding IS NOT NULL
+WITH c ORDER BY c.id
+SKIP $skip LIMIT $limit
+RETURN c.id AS id, c.embedding AS embedding, head([(p:Paper)-[:HAS_CHUNK]->(c) | p.id]) AS paper_id
+"""
+
+ENRICHMENT_QUERY = f"""
+UNWIND $chunk_ids AS chunk_id
+MATCH (node:Chunk {{id: chunk_id}})
+OPTIONAL MATCH (p:Paper)-[:HAS_CHUNK]->(node)
+RETURN node.id AS id,
+       node.text AS text,
+       {CHUNK_METADATA_PROJECTION} AS metadata
+"""
+
+
+class PaperIndex:
+    """
+    Makale düzeyinde vektör indeksi. Her makalenin vektörü, chunk embedding'lerinin
+    normalize edilmiş ortalamasıdır. İki aşamalı aramada önce en yakın makaleler bulunur,
+    ardından yalnızca bu makalelerin chunk'ları puanlanır; böylece aranan chunk sayısı
+    toplam chunk sayısına değil makale başına chunk sayısına bağlı kalır.
+    Makalesi olmayan chunk'lar kendi başlarına bir grup oluşturur.
+    """
+
+    def __init__(self, paper_ids, matrix, use_hnsw=False):
+        groups = {}
+        for row, paper_id in enumerate(paper_ids):
+            key = paper_id if paper_id is not None else ("chunk", row)
+            groups.setdefault(key, []).append(row)
+        self.paper_ids = [key if not isinstance(key, tuple) else None for key in groups]
+        self.rows = [np.asarray(rows, dtype=np.int64) for rows in groups.values()]
+
+        centroids = np.stack([np.asarray(matrix[rows]).mean(axis=0) for rows in self.rows]).astype(np.float32)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.centroids = centroids / norms
+
+        self.hnsw = None
+        if use_hnsw:
+            self.hnsw = lazy_import("hnswlib").Index(space="ip", dim=self.centroids.shape[1])
+            self.hnsw.init_index(max_elements=len(self.rows), ef_construction=200, M=16)
+            self.hnsw.add_items(self.centroids, np.arange(len(self.rows)))
+            self.hnsw.set_ef(64)
+
+    def nearest(self, query, top_papers):
+        """
+        Sorguya en yakın top_papers makalenin grup indekslerini döner.
+        """
+        top_papers = min(top_papers, len(self.rows))
+        if self.hnsw is not None:
+            labels, _ = self.hnsw.knn_query(query, k=top_papers)
+            return labels[0]
+        scores = self.centroids @ query
+        return np.argpartition(-scores, top_papers - 1)[:top_papers]
+
+    def candidate_rows(self, query, top_papers):
+        """
+        En yakın makalelerin chunk satırlarını, disk erişimi sıralı olsun diye artan sırada döner.
+        """
+        return np.sort(np.concatenate([self.rows[i] for i in self.nearest(query, top_papers)]))
+
+
+class LocalVectorIndex:
+    """
+    Chunk embedding'lerini süreç belleğinde tutan vektör indeksi.
+    Embedding'ler graph'tan okunup veri sürümüne göre adlandırılan memory-mapped
+    float32 dosyasına yazılır; graph'ta sürüm damgası yoksa dosya adı içerikten türetilir.
+    Başarılı her oluşturmadan sonra eski sürümlerin dosyaları silinir.
+    hnswlib kuruluysa HNSW, değilse NumPy ile kesin top-k kullanılır.
+    top_papers verilen aramalar önce PaperIndex ile en yakın makaleleri, sonra bu makalelerin
+    chunk'larını puanlar. quantization "int8" veya "binary" ise adaylar bellekteki sıkıştırılmış
+    matristen bulunur (HNSW kullanılmaz), float matris yalnızca oversample edilmiş adayları
+    yeniden puanlamak için diskten okunur. Yükleyici yeni bir veri sürümü yazdığında indeks
+    yeniden oluşturulur.
+    """
+
+    def __init__(self, graph, index_dir=LOCAL_INDEX_DIR, use_hnsw=LOCAL_INDEX_USE_HNSW, page_size=5000, metadata_cache_size=10000,
+                 quantization=VECTOR_QUANTIZATION, oversample=VECTOR_RESCORE_OVERSAMPLE):
+        """
+        Args:
+            graph: Neo4jGraph bağlantısı
+            index_dir: İndeks dosyalarının saklanacağı dizin
+            use_hnsw: "auto" (hnswlib varsa kullan), "true" veya "false"
+            page_size: Embedding'ler graph'tan okunurken sayfa başına chunk sayısı
+            metadata_cache_size: Bellekte tutulacak chunk metadata kaydı sayısı
+            quantization: Aday aramasında kullanılacak vektör biçimi: "none", "int8" veya "binary"
+            oversample: Float yeniden puanlamaya gönderilen aday sayısının k'ya oranı
+        """
+        self.graph = graph
+        self.index_dir = index_dir
+        # hnswlib yalnızca indeks oluşturulurken import edilir
+        self.use_hnsw = importlib.util.find_spec("hnswlib") is not None and str(use_hnsw).lower() in ("auto", "true")
+        self.quantization = quantization
+        self.oversample = oversample
+        self.page_size = page_size
+        self.version = None
+        self._state = ([], None, None, None, None)
+        self._built = False
+        self._lock = threading.Lock()
+        self._metadata = LRUCache(max_entries=metadata_cache_size)
+
+    def _paths(self, version):
+        name = f"chunks_{version}"
+        return (
+            self.index_dir / f"{name}.f32",
+            self.index_dir / f"{name}.ids.json",
+            self.index_dir / f"{name}.hnsw",
+            self.index_dir / f"{name}.papers.json",
+        )
+
+    def _fetch_embeddings(self):
+        ids, paper_ids, vectors = [], [], []
+        skip = 0
+        while True:
+            rows = self.graph.query(EMBEDDINGS_PAGE_QUERY, {"skip": skip, "limit": self.page_size})
+            for row in rows:
+                ids.append(row["id"])
+                paper_ids.append(row.get("paper_id"))
+                vectors.append(row["embedding"])
+            if len(rows) < self.page_size:
+                break
+            skip += self.page_size
+
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return ids, paper_ids, matrix / norms
+
+    def _content_version(self, ids, paper_ids, matrix):
+        """
+        Sürüm damgası olmayan graph için chunk id'leri ve embedding'lerden türetilen dosya sürümü.
+        """
+        digest = hashlib.sha1(json.dumps([ids, paper_ids]).encode("utf-8"))
+        digest.update(np.ascontiguousarray(matrix).tobytes())
+        return f"content-{digest.hexdigest()[:16]}"
+
+    def _remove_stale_files(self, file_version):
+        keep = set(self._paths(file_version))
+        for path in self.index_dir.glob("chunks_*"):
+            if path not in keep:
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logger.warning(f"Eski indeks dosyası silinemedi: {path}: {str(e)}")
+
+    def _build(self, version):
+        file_version = version
+        reuse = False
+        if version is not None:
+            matrix_path, ids_path, hnsw_path, papers_path = self._paths(version)
+            reuse = matrix_path.exists() and ids_path.exists() and papers_path.exists()
+
+        if reuse:
+            ids = json.loads(ids_path.read_text(encoding="utf-8"))
+            paper_ids = json.loads(papers_path.read_text(encoding="utf-8"))
+            logger.info(f"Yerel vektör indeksi diskten yükleniyor: {matrix_path}")
+        else:
+            ids, paper_ids, matrix = self._fetch_embeddings()
+            if version is None:
+                file_version = self._content_version(ids, paper_ids, matrix)
+                logger.warning(f"Graph'ta veri sürümü damgası yok, indeks dosyaları içerikten adlandırılıyor: {file_version}")
+            matrix_path, ids_path, hnsw_path, papers_path = self._paths(file_version)
+            # İçerikten türetilen sürümün dosyaları zaten varsa aynı veriyi içerir, yeniden yazılmaz
+            reuse = matrix_path.exists() and ids_path.exists() and papers_path.exists()
+            if ids and not reuse:
+                self.index_dir.mkdir(parents=True, exist_ok=True)
+                mm = np.memmap(matrix_path, dtype=np.float32, mode="w+", shape=matrix.shape)
+                mm[:] = matrix
+                mm.flush()
+                del mm
+                ids_path.write_text(json.dumps(ids), encoding="utf-8")
+                papers_path.write_text(json.dumps(paper_ids), encoding="utf-8")
+            logger.info(f"Yerel vektör indeksi oluşturuldu: {len(ids)} chunk")
+
+        if ids:
+            dimension = matrix_path.stat().st_size // 4 // len(ids)
+            matrix = np.memmap(matrix_path, dtype=np.float32, mode="r", shape=(len(ids), dimension))
+        else:
+            dimension, matrix = 0, np.zeros((0, 0), dtype=np.float32)
+
+        quantized = None
+        if self.quantization != "none" and ids:
+            quantized = QuantizedMatrix(matrix, mode=self.quantization)
+            logger.info(f"Chunk vektörleri {self.quantization} olarak sıkıştırıldı: {quantized.nbytes / 2**20:.1f} MB")
+
+        hnsw = None
+        if self.use_hnsw and ids and quantized is None:
+            hnsw = lazy_import("hnswlib").Index(space="ip", dim=dimension)
+            if reuse and hnsw_path.exists():
+                hnsw.load_index(str(hnsw_path), max_elements=len(ids))
+            else:
+                hnsw.init_index(max_elements=len(ids), ef_construction=200, M=16)
+                hnsw.add_items(np.asarray(matrix), np.arange(len(ids)))
+                hnsw.save_index(str(hnsw_path))
+            hnsw.set_ef(64)
+
+        papers = PaperIndex(paper_ids, matrix, use_hnsw=self.use_hnsw) if ids else None
+        if ids:
+            self._remove_stale_files(file_version)
+
+        self._state = (ids, matrix, hnsw, papers, quantized)
+        self.version = version
+        self._built = True
+        self._metadata.clear()
+
+    def _ensure_version(self, version):
+        if self._built and version == self.version:
+            return
+        with self._lock:
+            if not self._built or version != self.version:
+                self._build(version)
+
+    def refresh_if_needed(self):
+        """
+        Graph'taki veri sürümü değiştiyse indeksi yeniden oluşturur.
+        """
+        self._ensure_version(data_version_tracker.current(self.graph))
+
+    def _search(self, vector, k, top_papers=None):
+        ids, matrix, hnsw, papers, quantized = self._state
+        if not ids:
+            return []
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        if top_papers:
+            rows = papers.candidate_rows(query, top_papers)
+            return [(ids[row], score) for row, score in rescore(matrix, rows, query, k)]
+
+        if quantized is not None:
+            rows = quantized.candidates(query, k * self.oversample)
+            return [(ids[row], score) for row, score in rescore(matrix, rows, query, k)]
+
+        k = min(k, len(ids))
+        if hnsw is not None:
+            labels, distances = hnsw.knn_query(query, k=k)
+            return [(ids[label], float(1.0 - distance)) for label, distance in zip(labels[0], distances[0])]
+
+        scores = matrix @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    def search(self, vector, k=10, top_papers=None):
+        """
+        Sorgu vektörüne en yakın k chunk'ı döner.
+
+        Args:
+            vector: Sorgu embedding'i
+            k: Döndürülecek chunk sayısı
+            top_papers: Verilirse arama, sorguya en yakın bu sayıda makalenin chunk'larıyla sınırlanır
+
+        Returns:
+            list: (chunk_id, benzerlik skoru) çiftleri
+        """
+        self.refresh_if_needed()
+        return self._search(vector, k, top_papers)
+
+    async def asearch(self, vector, k=10, async_graph=None, top_papers=None):
+        """
+        search metodunun async versiyonu. İndeks yeniden oluşturulacaksa bu işlem thread'de yapılır.
+        """
+        if async_graph is not None:
+            version = await data_version_tracker.acurrent(async_graph)
+        else:
+            version = await asyncio.to_thread(data_version_tracker.current, self.graph)
+        if not self._built or version != self.version:
+            await asyncio.to_thread(self._ensure_version, version)
+        return self._search(vector, k, top_papers)
+
+    def _cached_entries(self, hits):
+        """
+        Bellekteki chunk kayıtlarının anlık kopyasını ve bellekte olmayan chunk id'lerini döner.
+        Kayıtlar tek seferde okunur; enrichment sorgusu sürerken LRU'dan düşen kayıtlar sonucu etkilemez.
+        """
+        entries = {}
+        for chunk_id, _ in hits:
+            entry = self._metadata.get(chunk_id)
+            if entry is not None:
+                entries[chunk_id] = entry
+        return entries, [chunk_id for chunk_id, _ in hits if chunk_id not in entries]
+
+    def _store_rows(self, rows, entries):
+        for row in rows:
+            metadata = {key: value for key, value in row["metadata"].items() if value is not None}
+            entries[row["id"]] = (row["text"], metadata)
+            self._metadata.put(row["id"], entries[row["id"]])
+
+    def _to_documents(self, hits, entries):
+        documents = []
+        for chunk_id, _ in hits:
+            entry = entries.get(chunk_id)
+            if entry is not None:
+                text, metadata = entry
+                documents.append(Document(page_content=text, metadata=dict(metadata)))
+        return documents
+
+    def documents(self, hits):
+        """
+        Arama sonuçlarını makale bilgileriyle zenginleştirilmiş Document listesine çevirir.
+        Bellekte olmayan chunk'lar tek bir UNWIND sorgusuyla getirilir.
+        """
+        with tracer.span("enrichment") as span:
+            entries, missing = self._cached_entries(hits)
+            if missing:
+                self._store_rows(self.graph.query(ENRICHMENT_QUERY, {"chunk_ids": missing}), entries)
+            span.set(rows=len(hits), fetched=len(missing))
+            return self._to_documents(hits, entries)
+
+    async def adocuments(self, hits, async_graph=None):
+        """
+        documents metodunun async versiyonu.
+        """
+        with tracer.span("enrichment") as span:
+            entries, missing = self._cached_entries(hits)
+            if missing:
+                if async_graph is not None:
+                    rows = await async_graph.aquery(ENRICHMENT_QUERY, {"chunk_ids": missing})
+                else:
+                    rows = await asyncio.to_thread(self.graph.query, ENRICHMENT_QUERY, {"chunk_ids": missing})
+                self._store_rows(rows, entries)
+            span.set(rows=len(hits), fetched=len(missing))
+            return self._to_documents(hits, entries)
+
+
+_local_index = None
+_local_index_lock = threading.Lock()
+
+
+def get_local_index(graph):
+    """
+    Süreç genelinde paylaşılan yerel vektör indeksini döner.
+    """
+    global _local_index
+    with _local_index_lock:
+        if _local_index is None:
+            _local_index = LocalVectorIndex(graph)
+        return _local_index
@@ -1,79 +1,166 @@
-from langchain_core.runnables import RunnablePassthrough
-from chatbot.utils.cleaning import clean_query, clean_response
-from src.config.logger import logger, ChainLoggerCallbacks
+import asyncio
+
+from chatbot.utils.chain_steps import chain_result, response_text, stream_text, user_messages
+from chatbot.utils.cleaning import clean_query, clean_response, filter_think_stream
+from chatbot.utils.cache import cached_query, cached_aquery
+from chatbot.utils.context_builder import ContextBuilder
+from chatbot.utils.name_search import rewrite_name_predicates
+from chatbot.utils.tracing import tracer
+from src.config.logger import logger, log_payload, ChainLoggerCallbacks
 
 class ReasoningCypherChain:
-    def __init__(self, llm, graph, cypher_prompt, qa_prompt, verbose=True, callbacks=None):
+    def __init__(self, llm, graph, cypher_prompt, qa_prompt, verbose=True, callbacks=None, cypher_cache=None, model_name=None, async_graph=None, cypher_guard=None):
         self.llm = llm
         self.graph = graph
+        self.async_graph = async_graph
         self.cypher_prompt = cypher_prompt
         self.qa_prompt = qa_prompt
         self.verbose = verbose
         self.callbacks = callbacks
-        self.create_chains()
-
-    def create_chains(self):
-        self.cypher_chain = (
-            RunnablePassthrough.assign(
-                formatted_prompt=lambda x: self.cypher_prompt.format(
-                    schema=self.graph.schema,
-                    question=x["query"]
-                )
-            )
-            | RunnablePassthrough.assign(
-                cypher_response=lambda x: self.llm.invoke([{"role": "user", "content": x["formatted_prompt"]}]).content
-            )
-            | RunnablePassthrough.assign(
-                cleaned_cypher=lambda x: clean_query(x["cypher_response"])
-            )
-        )
-
-        self.neo4j_chain = RunnablePassthrough.assign(
-            neo4j_results=lambda x: self._safe_query(x["cleaned_cypher"])
-        )
-
-        self.qa_chain = (
-            RunnablePassthrough.assign(
-                qa_prompt=lambda x: self.qa_prompt.format(
-                    question=x["query"],
-                    context=x["neo4j_results"]
-                )
-            )
-            | RunnablePassthrough.assign(
-                qa_response=lambda x: self.llm.invoke([{"role": "user", "content": x["qa_prompt"]}]).content
-            )
-            | RunnablePassthrough.assign(
-                cleaned_response=lambda x: clean_response(x["qa_response"]) 
-            )
-        )
+        self.cypher_cache = cypher_cache
+        self.cypher_guard = cypher_guard
+        self.model_name = model_name or getattr(llm, "model_name", None)
+        self.context_builder = ContextBuilder(model_name=self.model_name)
+
+    # Senkron, async ve stream yollarında ortak, I/O yapmayan adımlar
+
+    def _cypher_prompt(self, query):
+        return self.cypher_prompt.format(schema=self.graph.schema, question=query)
+
+    def _cached_cypher(self, query, span):
+        if self.cypher_cache is None:
+            return None
+        cached = self.cypher_cache.get(query, self.graph.schema, self.model_name)
+        if cached is not None:
+            span.set(cached=True)
+        return cached
+
+    def _log_inputs(self, inputs):
+        if self.verbose:
+            log_payload(f"Girdi: {inputs}")
+
+    def _log_query(self, cypher_query):
+        if self.verbose:
+            log_payload(f"Neo4j sorgusu: {cypher_query}")
+
+    def _query_error(self, error):
+        logger.error(f"Cypher sorgusu hatası: {error}")
+        return []
+
+    def _remember_cypher(self, query, cypher_query, results):
+        if self.cypher_cache is not None and results:
+            self.cypher_cache.put(query, self.graph.schema, self.model_name, cypher_query)
+
+    def _answer_prompt(self, query, results):
+        return self.qa_prompt.format(question=query, context=self.context_builder.build_rows(results))
+
+    @staticmethod
+    def _result(qa_response, cypher_query, results):
+        log_payload(f"QA response: {qa_response}")
+        return chain_result(clean_response(qa_response), cypher_query, results)
+
+    # Senkron adımlar
+
+    def _generate_cypher(self, query):
+        with tracer.span("cypher_generation") as span:
+            cached = self._cached_cypher(query, span)
+            if cached is not None:
+                return cached
+            formatted_prompt = self._cypher_prompt(query)
+            response = self.llm.invoke(user_messages(formatted_prompt))
+            span.record_tokens(formatted_prompt, response)
+            return response_text(response)
+
+    def _prepare_query(self, cypher_query):
+        cypher_query = rewrite_name_predicates(cypher_query, self.graph.schema)
+        if self.cypher_guard is None:
+            return cypher_query
+        return self.cypher_guard.guard(cypher_query)
 
     def _safe_query(self, cypher_query):
+        if not cypher_query:
+            return []
         try:
-            if self.verbose:
-                logger.info(f"Neo4j sorgusu: {cypher_query}")
-            return self.graph.query(cypher_query)
+            self._log_query(cypher_query)
+            return cached_query(self.graph, cypher_query)
         except Exception as e:
-            logger.error(f"Cypher sorgusu hatası: {e}")
+            return self._query_error(e)
+
+    def _run_query_steps(self, inputs):
+        self._log_inputs(inputs)
+        query = inputs["query"]
+        cypher_response = self._generate_cypher(query)
+        log_payload(f"CYPHER response: {cypher_response}")
+
+        cleaned_cypher = self._prepare_query(clean_query(cypher_response))
+        neo4j_results = self._safe_query(cleaned_cypher)
+        self._remember_cypher(query, cleaned_cypher, neo4j_results)
+        return query, cleaned_cypher, neo4j_results
+
+    # Async adımlar
+
+    async def _agenerate_cypher(self, query):
+        with tracer.span("cypher_generation") as span:
+            cached = self._cached_cypher(query, span)
+            if cached is not None:
+                return cached
+            formatted_prompt = self._cypher_prompt(query)
+            response = await self.llm.ainvoke(user_messages(formatted_prompt))
+            span.record_tokens(formatted_prompt, response)
+            return response_text(response)
+
+    async def _aprepare_query(self, cypher_query):
+        cypher_query = rewrite_name_predicates(cypher_query, self.graph.schema)
+        if self.cypher_guard is None:
+            return cypher_query
+        return await self.cypher_guard.aguard(cypher_query)
+
+    async def _asafe_query(self, cypher_query):
+        if not cypher_query:
             return []
+        try:
+            self._log_query(cypher_query)
+            if self.async_graph is None:
+                return await asyncio.to_thread(cached_query, self.graph, cypher_query)
+            return await cached_aquery(self.async_graph, cypher_query)
+        except Exception as e:
+            return self._query_error(e)
 
-    def invoke(self, inputs):
-        if self.verbose:
-            logger.info(f"Girdi: {inputs}")
+    async def _arun_query_steps(self, inputs):
+        self._log_inputs(inputs)
+        query = inputs["query"]
+        cypher_response = await self._agenerate_cypher(query)
+        log_payload(f"CYPHER response: {cypher_response}")
 
-        cypher_result = self.cypher_chain.invoke(inputs)
-        if "cypher_response" in cypher_result:
-            logger.info(f"CYPHER response: {cypher_result['cypher_response']}")
+        cleaned_cypher = await self._aprepare_query(clean_query(cypher_response))
+        neo4j_results = await self._asafe_query(cleaned_cypher)
+        self._remember_cypher(query, cleaned_cypher, neo4j_results)
+        return query, cleaned_cypher, neo4j_results
 
-        neo4j_result = self.neo4j_chain.invoke(cypher_result)
-        final_result = self.qa_chain.invoke(neo4j_result)
+    def invoke(self, inputs):
+        query, cleaned_cypher, neo4j_results = self._run_query_steps(inputs)
+        prompt_text = self._answer_prompt(query, neo4j_results)
+        with tracer.span("answer") as span:
+            response = self.llm.invoke(user_messages(prompt_text))
+            span.record_tokens(prompt_text, response)
+        return self._result(response_text(response), cleaned_cypher, neo4j_results)
 
-        if "qa_response" in final_result:
-            logger.info(f"QA response: {final_result['qa_response']}")
+    async def ainvoke(self, inputs):
+        query, cleaned_cypher, neo4j_results = await self._arun_query_steps(inputs)
+        prompt_text = self._answer_prompt(query, neo4j_results)
+        with tracer.span("answer") as span:
+            response = await self.llm.ainvoke(user_messages(prompt_text))
+            span.record_tokens(prompt_text, response)
+        return self._result(response_text(response), cleaned_cypher, neo4j_results)
 
-        return {
-            "result": final_result["cleaned_response"],
-            "intermediate_steps": [
-                {"query": final_result["cleaned_cypher"]},
-                {"context": final_result["neo4j_results"]}
-            ]
-        }
+    def stream(self, inputs):
+        """
+        Cypher üretimi ve sorgu adımlarından sonra QA yanıtını token token yield eder.
+        Sonuç sözlüğü generator dönüş değeri olarak verilir.
+        """
+        query, cleaned_cypher, neo4j_results = self._run_query_steps(inputs)
+        prompt_text = self._answer_prompt(query, neo4j_results)
+        with tracer.span("answer") as span:
+            qa_response = yield from filter_think_stream(stream_text(self.llm.stream(user_messages(prompt_text))))
+            span.record_tokens(prompt_text, qa_response)
+        return self._result(qa_response, cleaned_cypher, neo4j_results)
@@ -1,153 +1,276 @@
+import asyncio
 import os
-from langchain_neo4j import Neo4jVector
-from langchain_core.vectorstores import VectorStoreRetriever
-from langchain_core.runnables import RunnablePassthrough
-from langchain.schema import Document
+from langchain_core.documents import Document
 from dotenv import load_dotenv
 from src.config.logger import logger, ChainLoggerCallbacks 
+from chatbot.utils.chain_steps import chain_result, response_text, stream_text, user_messages
+from chatbot.utils.cleaning import clean_response, filter_think_stream
+from chatbot.utils.profiling import lazy_import
+from chatbot.utils.context_builder import ContextBuilder
+from chatbot.utils.tracing import tracer
+from src.config.settings import (
+    VECTOR_BACKEND, VECTOR_TWO_STAGE, VECTOR_TOP_PAPERS, VECTOR_TOP_CHUNKS,
+    VECTOR_QUANTIZATION, VECTOR_RESCORE_OVERSAMPLE
+)
 
 load_dotenv()
 
+# Chunk'ın ait olduğu makale bilgileri; Neo4j sorguları ve yerel indeksin zenginleştirme sorgusu aynı yapıyı kullanır
+CHUNK_METADATA_PROJECTION = """
+        {
+            id: node.id,
+            order: node.order,
+            paper_name: p.name,
+            publication_date: p.publication_date,
+            arxiv_link: p.arxiv_link,
+            pwc_link: p.pwc_link,
+            abstract: p.abstract,
+            authors: [(a:Author)-[:AUTHORED]->(p) | a.name],
+            github_links: [(p)-[:HAS_CODE]->(code:Code) | code.link]
+        }"""
+
+
 class VectorSearchChain:
-    def __init__(self, llm, graph, response_prompt, embeddings_model=None, verbose=True, callbacks=None):
+    # Benzerlik araması ve makale bilgileriyle zenginleştirme tek sorguda yapılır
+    RETRIEVAL_QUERY = f"""
+    OPTIONAL MATCH (p:Paper)-[:HAS_CHUNK]->(node)
+    RETURN node.text AS text,
+        {CHUNK_METADATA_PROJECTION} AS metadata,
+        score
+    """
+
+    # İki aşamalı arama: makale indeksinden en yakın $top_papers makale, sonra bu makalelerin chunk'ları
+    TWO_STAGE_QUERY = f"""
+    CALL db.index.vector.queryNodes('paper_embedding', $top_papers, $embedding) YIELD node AS p
+    MATCH (p)-[:HAS_CHUNK]->(node:Chunk)
+    WITH p, node, vector.similarity.cosine(node.embedding, $embedding) AS score
+    ORDER BY score DESC
+    LIMIT $k
+    RETURN node.text AS text,
+        {CHUNK_METADATA_PROJECTION} AS metadata,
+        score
+    """
+
+    # Quantize indeksten oversample edilmiş adaylar float embedding'lerle yeniden puanlanır.
+    # Chunk düğümleri float embedding'leri sakladığı için Neo4j backend'inde bellek kazancı yoktur;
+    # kazanç yalnızca yerel indeksin sıkıştırılmış matrisinde elde edilir.
+    RESCORE_QUERY = f"""
+    CALL db.index.vector.queryNodes('chunk_embedding', $candidates, $embedding) YIELD node
+    WITH node, vector.similarity.cosine(node.embedding, $embedding) AS score
+    ORDER BY score DESC
+    LIMIT $k
+    OPTIONAL MATCH (p:Paper)-[:HAS_CHUNK]->(node)
+    RETURN node.text AS text,
+        {CHUNK_METADATA_PROJECTION} AS metadata,
+        score
+    """
+
+    def __init__(self, llm, graph, response_prompt, embeddings_model=None, verbose=True, callbacks=None, async_graph=None, backend=VECTOR_BACKEND,
+                 two_stage=VECTOR_TWO_STAGE, top_papers=VECTOR_TOP_PAPERS, top_chunks=VECTOR_TOP_CHUNKS,
+                 quantization=VECTOR_QUANTIZATION, oversample=VECTOR_RESCORE_OVERSAMPLE):
         self.llm = llm
         self.graph = graph
+        self.async_graph = async_graph
         self.response_prompt = response_prompt
         self.embeddings = embeddings_model
         self.verbose = verbose
         self.callbacks = callbacks
+        self.backend = backend
+        self.top_papers = top_papers if two_stage else None
+        self.top_chunks = top_chunks
+        self.oversample = oversample if quantization != "none" else None
+        self.context_builder = ContextBuilder(model_name=getattr(llm, "model_name", None))
+        self.vector_store = None
+        self.local_index = None
 
-        self.vector_store = Neo4jVector.from_existing_graph(
-            embedding=self.embeddings,
-            url=os.getenv('NEO4J_URI'),
-            username=os.getenv('NEO4J_USERNAME'),
-            password=os.getenv('NEO4J_PASSWORD'),
-            database=os.getenv('NEO4J_DATABASE', 'neo4j'),
-            index_name="chunk_embedding",
-            node_label="Chunk",
-            text_node_properties=["text"],
-            embedding_node_property="embedding",
-            retrieval_query="""
-            RETURN node.text AS text,
-                {
-                    id: node.id,
-                    order: node.order
-                } AS metadata,
-                score
-            """
-        )
+        if self.backend == "local":
+            # Yerel indeks (NumPy, hnswlib) yalnızca local backend'inde yüklenir
+            self.local_index = lazy_import("chatbot.core.local_index").get_local_index(self.graph)
+        else:
+            if quantization == "binary":
+                logger.warning("Neo4j backend'i binary quantization desteklemiyor; indeksin int8 quantization'ı ve float yeniden puanlama kullanılacak")
+            if quantization != "none":
+                logger.info("Neo4j backend'inde quantization yalnızca float yeniden puanlamayı açar; "
+                            "Chunk embedding'leri float olarak saklandığından bellek kazancı için VECTOR_BACKEND=local kullanın")
+            Neo4jVector = lazy_import("langchain_neo4j").Neo4jVector
+            self.vector_store = Neo4jVector.from_existing_graph(
+                embedding=self.embeddings,
+                graph=self.graph,
+                index_name="chunk_embedding",
+                node_label="Chunk",
+                text_node_properties=["text"],
+                embedding_node_property="embedding",
+                retrieval_query=self.RETRIEVAL_QUERY
+            )
 
         self.retriever = self.create_custom_retriever()
 
     def create_custom_retriever(self):
+        two_stage_query = self.TWO_STAGE_QUERY
+        rescore_query = self.RESCORE_QUERY
+
         class CustomRetriever:
-            def __init__(self, vector_store, graph, verbose=False):
+            def __init__(self, vector_store, graph, verbose=False, local_index=None, embeddings=None, async_graph=None, top_papers=None, oversample=None):
                 self.vector_store = vector_store
                 self.graph = graph
                 self.verbose = verbose
+                self.local_index = local_index
+                self.embeddings = embeddings
+                self.async_graph = async_graph
+                self.top_papers = top_papers
+                self.oversample = oversample
+
+            def _cypher_search(self, vector, k):
+                """
+                İki aşamalı veya yeniden puanlamalı arama gerekiyorsa Cypher sorgusunu ve parametrelerini döner.
+                """
+                if self.top_papers:
+                    return two_stage_query, {"embedding": vector, "top_papers": self.top_papers, "k": k}
+                return rescore_query, {"embedding": vector, "candidates": k * self.oversample, "k": k}
+
+            @staticmethod
+            def _to_documents(rows):
+                return [
+                    Document(
+                        page_content=row["text"],
+                        metadata={key: value for key, value in row["metadata"].items() if value is not None}
+                    )
+                    for row in rows
+                ]
+
+            @property
+            def _uses_cypher_search(self):
+                return bool(self.top_papers or self.oversample)
+
+            def _retrieval_error(self, error):
+                logger.error(f"Retriever hatası: {str(error)}")
+                return []
 
             def get_relevant_documents(self, query, k=10):
-                try:
-                    similar_docs = self.vector_store.similarity_search(query, k=k)
-                    enriched_docs = []
-
-                    for doc in similar_docs:
-                        chunk_id = doc.metadata.get("id")
-                        cypher_query = """
-                        MATCH (p:Paper)-[:HAS_CHUNK]->(c:Chunk)
-                        MATCH (a:Author)-[:AUTHORED]->(p)
-                        MATCH (p)-[:HAS_CODE]->(code:Code)
-                        WHERE c.id = $chunk_id
-                        RETURN p.name AS paper_name, 
-                               p.publication_date AS publication_date,
-                               p.arxiv_link AS arxiv_link,
-                               p.pwc_link AS pwc_link,
-                               p.abstract AS abstract,
-                               COLLECT(DISTINCT code.link) AS github_links,
-                               c.text AS chunk_text,
-                               COLLECT(DISTINCT a.name) AS authors
-                        LIMIT 1
-                        """
-                        try:
-                            neo4j_result = self.graph.query(cypher_query, {"chunk_id": chunk_id})
-                            if neo4j_result:
-                                meta = neo4j_result[0]
-                                doc.metadata.update({
-                                    "paper_name": meta.get("paper_name", ""),
-                                    "authors": meta.get("authors", []),
-                                    "publication_date": meta.get("publication_date", ""),
-                                    "arxiv_link": meta.get("arxiv_link", ""),
-                                    "pwc_link": meta.get("pwc_link", ""),
-                                    "abstract": meta.get("abstract", ""),
-                                    "github_links": meta.get("github_links", [])
-                                })
-                        except Exception as e:
-                            if self.verbose:
-                                logger.warning(f"Döküman zenginleştirme hatası: {str(e)}")
-                        enriched_docs.append(doc)
-
-                    return enriched_docs
-                except Exception as e:
-                    logger.error(f"Retriever hatası: {str(e)}")
-                    return []
-            
-        return CustomRetriever(self.vector_store, self.graph, self.verbose)
+                with tracer.span("retrieval", k=k, top_papers=self.top_papers) as span:
+                    try:
+                        if self.local_index is not None:
+                            hits = self.local_index.search(self.embeddings.embed_query(query), k=k, top_papers=self.top_papers)
+                            documents = self.local_index.documents(hits)
+                        elif self._uses_cypher_search:
+                            rows = self.graph.query(*self._cypher_search(self.embeddings.embed_query(query), k))
+                            documents = self._to_documents(rows)
+                        else:
+                            documents = self.vector_store.similarity_search(query, k=k)
+                    except Exception as e:
+                        documents = self._retrieval_error(e)
+                    span.set(rows=len(documents))
+                    return documents
+
+            async def aget_relevant_documents(self, query, k=10):
+                with tracer.span("retrieval", k=k, top_papers=self.top_papers) as span:
+                    try:
+                        if self.local_index is not None:
+                            vector = await self.embeddings.aembed_query(query)
+                            hits = await self.local_index.asearch(vector, k=k, async_graph=self.async_graph, top_papers=self.top_papers)
+                            documents = await self.local_index.adocuments(hits, async_graph=self.async_graph)
+                        elif self._uses_cypher_search:
+                            cypher, params = self._cypher_search(await self.embeddings.aembed_query(query), k)
+                            if self.async_graph is not None:
+                                rows = await self.async_graph.aquery(cypher, params)
+                            else:
+                                rows = await asyncio.to_thread(self.graph.query, cypher, params)
+                            documents = self._to_documents(rows)
+                        else:
+                            documents = await self.vector_store.asimilarity_search(query, k=k)
+                    except Exception as e:
+                        documents = self._retrieval_error(e)
+                    span.set(rows=len(documents))
+                    return documents
+
+        return CustomRetriever(
+            self.vector_store,
+            self.graph,
+            self.verbose,
+            local_index=self.local_index,
+            embeddings=self.embeddings,
+            async_graph=self.async_graph,
+            top_papers=self.top_papers,
+            oversample=self.oversample
+        )
+
+
+    def _build_prompt(self, query):
+        relevant_docs = self.retriever.get_relevant_documents(query, k=self.top_chunks)
+        return self._format_prompt(query, relevant_docs)
+
+    async def _abuild_prompt(self, query):
+        relevant_docs = await self.retriever.aget_relevant_documents(query, k=self.top_chunks)
+        return self._format_prompt(query, relevant_docs)
 
+    def _format_prompt(self, query, relevant_docs):
+        source_docs = []
+        
+        for doc in relevant_docs:
+            metadata = doc.metadata
+            source_docs.append({
+                "paper_name": metadata.get("paper_name", ""),
+                "authors": metadata.get("authors", ""),
+                "publication_date": metadata.get("publication_date", ""),
+                "arxiv_link": metadata.get("arxiv_link", ""),
+                "pwc_link": metadata.get("pwc_link", ""),
+                "github_link": metadata.get("github_links", ""),
+                "chunk_text": doc.page_content,
+                "chunk_order": metadata.get("chunk_order", "")
+            })
+
+        full_context = self.context_builder.build_documents(relevant_docs)
+        prompt_text = self.response_prompt.format(query=query, context=full_context)
+        return prompt_text, source_docs
+
+    def _error_result(self, query, error):
+        logger.error(f"VectorSearchChain: Hata: {str(error)}")
+        return chain_result(f"Arama sırasında bir hata oluştu: {str(error)}", query, [], error=True)
 
     def invoke(self, inputs):
         query = inputs.get("query", "")
-        try:              
-            relevant_docs = self.retriever.get_relevant_documents(query, k=5)
-            context_parts = []
-            source_docs = []
-            
-            for doc in relevant_docs:
-                metadata = doc.metadata
-                context_parts.append(f"""
-                    Makale: {metadata.get('paper_name', 'Bilinmeyen')}
-                    Yazarlar: {metadata.get('authors', 'Bilinmeyen')}
-                    Tarih: {metadata.get('publication_date', 'Bilinmeyen')}
-                    ArXiv: {metadata.get('arxiv_link', 'Yok')}
-                    PWC: {metadata.get('pwc_link', 'Yok')}
-                    GitHub: {metadata.get('github_links', 'Yok')}
-                    İçerik: {doc.page_content}
-                ---
-                """)
-          
-                source_docs.append({
-                    "paper_name": metadata.get("paper_name", ""),
-                    "authors": metadata.get("authors", ""),
-                    "publication_date": metadata.get("publication_date", ""),
-                    "arxiv_link": metadata.get("arxiv_link", ""),
-                    "pwc_link": metadata.get("pwc_link", ""),
-                    "github_link": metadata.get("github_links", ""),
-                    "chunk_text": doc.page_content,
-                    "chunk_order": metadata.get("chunk_order", "")
-                })
-
-
-            full_context = "\n".join(context_parts)
-            prompt_text = self.response_prompt.format(query=query, context=full_context)
-
-            llm_response = self.llm.invoke([{"role": "user", "content": prompt_text}])
-            
-            answer = getattr(llm_response, 'content', str(llm_response))
-     
-            return {
-                "result": answer,
-                "intermediate_steps": [
-                    {"query": query},
-                    {"context": source_docs}
-                ]
-            }
+        try:
+            prompt_text, source_docs = self._build_prompt(query)
+
+            with tracer.span("answer") as span:
+                llm_response = self.llm.invoke(user_messages(prompt_text))
+                span.record_tokens(prompt_text, llm_response)
+
+            return chain_result(response_text(llm_response), query, source_docs)
 
         except Exception as e:
-            logger.error(f"VectorSearchChain: Hata: {str(e)}")
-            return {
-                "result": f"Arama sırasında bir hata oluştu: {str(e)}",
-                "intermediate_steps": [
-                    {"query": query},
-                    {"context": []}
-                ]
-            }
-            
\ No newline at end of file
+            return self._error_result(query, e)
+
+    async def ainvoke(self, inputs):
+        query = inputs.get("query", "")
+        try:
+            prompt_text, source_docs = await self._abuild_prompt(query)
+
+            with tracer.span("answer") as span:
+                llm_response = await self.llm.ainvoke(user_messages(prompt_text))
+                span.record_tokens(prompt_text, llm_response)
+
+            return chain_result(response_text(llm_response), query, source_docs)
+
+        except Exception as e:
+            return self._error_result(query, e)
+
+    def stream(self, inputs):
+        """
+        Retrieval adımından sonra yanıtı token token yield eder.
+        Sonuç sözlüğü generator dönüş değeri olarak verilir.
+        """
+        query = inputs.get("query", "")
+        try:
+            prompt_text, source_docs = self._build_prompt(query)
+
+            with tracer.span("answer") as span:
+                answer = yield from filter_think_stream(stream_text(self.llm.stream(user_messages(prompt_text))))
+                span.record_tokens(prompt_text, answer)
+
+            return chain_result(clean_response(answer), query, source_docs)
+
+        except Exception as e:
+            result = self._error_result(query, e)
+            yield result["result"]
+            return result
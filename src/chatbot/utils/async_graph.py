@@ -0,0 +1,77 @@
+import asyncio
+import os
+import threading
+
+from neo4j import AsyncGraphDatabase, Query, RoutingControl
+
+
+class AsyncNeo4jGraph:
+    """
+    Neo4jGraph.query'nin async karşılığı. Sorgular neo4j'nin async sürücüsüyle
+    çalıştırılır, böylece bekleme süresince event loop bloklanmaz.
+    Async sürücü oluşturulduğu event loop'a bağlı olduğundan her event loop için ayrı
+    bir sürücü açılır; kapanmış loop'ların sürücüleri bir sonraki erişimde bırakılır.
+    """
+
+    def __init__(self, url=None, username=None, password=None, database=None, timeout=None):
+        """
+        Args:
+            url: Neo4j bağlantı adresi (belirtilmezse NEO4J_URI kullanılır)
+            username: Kullanıcı adı (belirtilmezse NEO4J_USERNAME kullanılır)
+            password: Şifre (belirtilmezse NEO4J_PASSWORD kullanılır)
+            database: Veritabanı adı (belirtilmezse NEO4J_DATABASE kullanılır)
+            timeout: Sorgu başına saniye cinsinden zaman aşımı
+        """
+        self._url = url or os.getenv('NEO4J_URI')
+        self._auth = (username or os.getenv('NEO4J_USERNAME'), password or os.getenv('NEO4J_PASSWORD'))
+        self._database = database or os.getenv('NEO4J_DATABASE', 'neo4j')
+        self.timeout = timeout
+        self._drivers = {}
+        self._drivers_lock = threading.Lock()
+
+    @property
+    def _driver(self):
+        """
+        Çalışan event loop'a ait sürücüyü döner, yoksa oluşturur.
+        """
+        loop = asyncio.get_running_loop()
+        with self._drivers_lock:
+            for closed in [other for other in self._drivers if other.is_closed()]:
+                del self._drivers[closed]
+            driver = self._drivers.get(loop)
+            if driver is None:
+                driver = AsyncGraphDatabase.driver(self._url, auth=self._auth)
+                self._drivers[loop] = driver
+            return driver
+
+    async def aquery(self, query, params=None):
+        """
+        Okuma sorgusunu çalıştırır ve sonuçları sözlük listesi olarak döner.
+        """
+        records, _, _ = await self._driver.execute_query(
+            Query(text=query, timeout=self.timeout),
+            parameters_=params or {},
+            routing_=RoutingControl.READ,
+            database_=self._database,
+        )
+        return [record.data() for record in records]
+
+    async def aexplain(self, query):
+        """
+        Sorguyu çalıştırmadan planlar ve sorgu özetini (plan, query_type) döner.
+        """
+        _, summary, _ = await self._driver.execute_query(
+            f"EXPLAIN {query}",
+            routing_=RoutingControl.READ,
+            database_=self._database,
+        )
+        return summary
+
+    async def close(self):
+        """
+        Çalışan event loop'a ait sürücüyü kapatır.
+        """
+        with self._drivers_lock:
+            driver = self._drivers.pop(asyncio.get_running_loop(), None)
+        if driver is not None:
+            await driver.close()
@@ -0,0 +1,526 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.config.settings import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    CYPHER_CACHE_ENABLED,
+    CYPHER_CACHE_TTL,
+    CYPHER_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_ENABLED,
+    QUERY_CACHE_TTL,
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_MAX_ROWS,
+)
+from src.config.logger import logger
+from chatbot.utils.tracing import tracer
+
+
+def normalize_question(question):
+    """
+    Soruyu önbellek anahtarı olarak kullanılabilecek hale getirir.
+    Küçük harfe çevirir, noktalama işaretlerini ve fazla boşlukları kaldırır.
+    """
+    text = question.lower().strip()
+    text = re.sub(r"[^\w\s']", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+ENTITY_TOKEN_PATTERN = re.compile(r"[^\W_][\w.-]*")
+
+
+def entity_tokens(question):
+    """
+    Sorudaki varlık ismi olabilecek kelimeleri (iç harflerinde büyük harf veya rakam bulunan,
+    ya da cümle başında olmayan büyük harfle başlayan) küçük harfe çevrilmiş küme olarak döner.
+    Türkçe ekler kesme işaretinden itibaren atılır (ör. "Tang'ın" -> "tang").
+    """
+    tokens = set()
+    for position, match in enumerate(ENTITY_TOKEN_PATTERN.finditer(re.sub(r"['’]\w*", "", question))):
+        token = match.group(0)
+        inner = token[1:]
+        if any(c.isupper() or c.isdigit() for c in inner) or (position > 0 and token[0].isupper()):
+            tokens.add(token.lower())
+    return frozenset(tokens)
+
+
+class LRUCache:
+    """
+    TTL destekli, thread-safe LRU önbellek.
+    """
+
+    def __init__(self, max_entries=1000, ttl=None):
+        """
+        Args:
+            max_entries: Önbellekte tutulacak maksimum kayıt sayısı
+            ttl: Kayıtların saniye cinsinden geçerlilik süresi (None ise süresiz)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _is_expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry[1], now):
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class SemanticCache:
+    """
+    Standalone soru embedding'leri üzerinden benzerlik araması yapan yanıt önbelleği.
+    Kayıtlar namespace (ör. arama tipi ve model) bazında ayrılır. Yalnızca varlık ismi farklı
+    olan şablon sorular embedding'de çok yakın düştüğünden, benzerlik isabeti ancak iki sorudaki
+    varlık isimleri (bkz. entity_tokens) aynıysa kabul edilir.
+    """
+
+    def __init__(self, embeddings=None, threshold=0.97, ttl=3600, max_entries=1000, embeddings_factory=None):
+        """
+        Args:
+            embeddings: embed_query metodu olan embedding modeli
+            threshold: Önbellek isabeti için gereken minimum kosinüs benzerliği
+            ttl: Kayıtların saniye cinsinden geçerlilik süresi
+            max_entries: Maksimum kayıt sayısı, aşıldığında en eski kullanılan silinir
+            embeddings_factory: embeddings verilmezse modeli ilk ihtiyaçta yükleyen fonksiyon
+        """
+        self.embeddings = embeddings
+        self.embeddings_factory = embeddings_factory
+        self.disabled = False
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._vectors = LRUCache(max_entries=256)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _model(self):
+        if self.embeddings is None and not self.disabled:
+            with self._lock:
+                if self.embeddings is None and not self.disabled:
+                    try:
+                        self.embeddings = self.embeddings_factory()
+                    except Exception as e:
+                        logger.warning(f"Semantik önbellek devre dışı, embedding modeli yüklenemedi: {str(e)}")
+                        self.disabled = True
+        return self.embeddings
+
+    def _embed(self, question):
+        key = normalize_question(question)
+        vector = self._vectors.get(key)
+        if vector is None:
+            model = self._model()
+            if model is None:
+                return None
+            vector = np.asarray(model.embed_query(question), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector = vector / norm
+            self._vectors.put(key, vector)
+        return vector
+
+    def _purge_expired(self, now):
+        expired = [key for key, entry in self._entries.items() if now - entry["created_at"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+
+    def get(self, question, namespace):
+        """
+        Benzer bir soru daha önce yanıtlandıysa önbellekteki yanıtı döner.
+
+        Args:
+            question (str): Standalone soru
+            namespace (tuple): Kayıtların ayrıldığı anahtar (ör. arama tipi, model)
+
+        Returns:
+            dict | None: Önbellekteki yanıt veya None
+        """
+        key = (namespace, normalize_question(question))
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            exact = key in self._entries
+
+        vector = None if exact else self._embed(question)
+
+        entities = entity_tokens(question)
+        with self._lock:
+            best_key, best_score = None, -1.0
+            if key in self._entries:
+                best_key, best_score = key, 1.0
+            elif vector is not None:
+                for entry_key, entry in self._entries.items():
+                    if entry_key[0] != namespace or entry["entities"] != entities:
+                        continue
+                    score = float(np.dot(vector, entry["vector"]))
+                    if score > best_score:
+                        best_key, best_score = entry_key, score
+
+            if best_key is None or best_score < self.threshold:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            entry = self._entries[best_key]
+
+        logger.info(f"Semantik önbellek isabeti (benzerlik: {best_score:.3f}): {entry['question']}")
+        return entry["value"]
+
+    def put(self, question, namespace, value):
+        """
+        Yanıtı önbelleğe ekler.
+
+        Args:
+            question (str): Standalone soru
+            namespace (tuple): Kayıtların ayrıldığı anahtar
+            value (dict): Saklanacak yanıt
+        """
+        key = (namespace, normalize_question(question))
+        vector = self._embed(question)
+        if vector is None:
+            return
+
+        with self._lock:
+            self._entries[key] = {
+                "question": question,
+                "vector": vector,
+                "entities": entity_tokens(question),
+                "value": value,
+                "created_at": time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def schema_fingerprint(schema):
+    """
+    Graph şemasının kısa bir özetini (hash) döner.
+    """
+    return hashlib.sha1((schema or "").encode("utf-8")).hexdigest()[:16]
+
+
+class CypherCache:
+    """
+    Normalize edilmiş soru, şema özeti ve model adından doğrulanmış Cypher sorgusuna önbellek.
+    Şema değiştiğinde tüm kayıtlar geçersiz sayılır.
+    """
+
+    def __init__(self, max_entries=2000, ttl=86400):
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._schema_fingerprint = None
+        self._lock = threading.Lock()
+
+    def _key(self, question, schema, model_name):
+        fingerprint = schema_fingerprint(schema)
+        with self._lock:
+            if fingerprint != self._schema_fingerprint:
+                if self._schema_fingerprint is not None:
+                    logger.info("Graph şeması değişti, Cypher önbelleği temizleniyor.")
+                self._cache.clear()
+                self._schema_fingerprint = fingerprint
+        return (normalize_question(question), fingerprint, model_name)
+
+    def get(self, question, schema, model_name):
+        """
+        Soru için daha önce doğrulanmış Cypher sorgusunu döner, yoksa None.
+        """
+        cypher = self._cache.get(self._key(question, schema, model_name))
+        if cypher is not None:
+            logger.info(f"Cypher önbellek isabeti: {question}")
+        return cypher
+
+    def put(self, question, schema, model_name, cypher):
+        """
+        Başarıyla çalıştırılmış Cypher sorgusunu önbelleğe ekler.
+        """
+        if cypher:
+            self._cache.put(self._key(question, schema, model_name), cypher)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class QueryResultCache:
+    """
+    (Cypher metni, parametreler) anahtarıyla Neo4j sorgu sonuçlarını saklar.
+    Yükleyicinin yazdığı veri sürümü değiştiğinde tüm kayıtlar geçersiz olur; sürüm değişmeden
+    önce başlamış bir sorgunun sonucu önbelleğe yazılmaz.
+    """
+
+    def __init__(self, version_tracker, max_entries=5000, ttl=3600, max_rows=500):
+        """
+        Args:
+            version_tracker: Graph veri sürümünü döndüren DataVersionTracker
+            max_entries: Önbellekte tutulacak maksimum sorgu sonucu sayısı
+            ttl: Kayıtların saniye cinsinden geçerlilik süresi
+            max_rows: Bu sayıdan fazla satır dönen sonuçlar önbelleğe alınmaz
+        """
+        self.version_tracker = version_tracker
+        self.max_rows = max_rows
+        self._cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._version = None
+        self._version_lock = threading.Lock()
+        self._query_stats = OrderedDict()
+        self._stats_lock = threading.Lock()
+        self._max_tracked_queries = max_entries
+
+    def _record(self, cypher_query, hit):
+        fingerprint = hashlib.sha1(cypher_query.encode("utf-8")).hexdigest()[:12]
+        with self._stats_lock:
+            stats = self._query_stats.get(fingerprint)
+            if stats is None:
+                stats = {"query": " ".join(cypher_query.split())[:200], "hits": 0, "misses": 0}
+                self._query_stats[fingerprint] = stats
+            self._query_stats.move_to_end(fingerprint)
+            stats["hits" if hit else "misses"] += 1
+            while len(self._query_stats) > self._max_tracked_queries:
+                self._query_stats.popitem(last=False)
+
+    def _lookup(self, version, cypher_query, params):
+        key = (cypher_query.strip(), json.dumps(params, sort_keys=True, default=str))
+        with self._version_lock:
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            rows = self._cache.get(key)
+        self._record(cypher_query, hit=rows is not None)
+        return key, rows
+
+    def _store(self, version, key, rows):
+        if len(rows) > self.max_rows:
+            return
+        with self._version_lock:
+            # Sorgu çalışırken veri sürümü değiştiyse sonuç eski veriye aittir
+            if version == self._version:
+                self._cache.put(key, rows)
+
+    def query(self, graph, cypher_query, params=None):
+        """
+        Sorgu sonucunu önbellekten döner, yoksa graph üzerinde çalıştırıp önbelleğe ekler.
+
+        Args:
+            graph: Neo4jGraph bağlantısı
+            cypher_query (str): Çalıştırılacak Cypher sorgusu
+            params (dict): Sorgu parametreleri
+
+        Returns:
+            list: Sorgu sonuç satırları
+        """
+        params = params or {}
+        version = self.version_tracker.current(graph)
+        key, rows = self._lookup(version, cypher_query, params)
+        if rows is None:
+            rows = graph.query(cypher_query, params)
+            self._store(version, key, rows)
+        return list(rows)
+
+    async def aquery(self, async_graph, cypher_query, params=None):
+        """
+        query metodunun async versiyonu.
+
+        Args:
+            async_graph: AsyncNeo4jGraph bağlantısı
+            cypher_query (str): Çalıştırılacak Cypher sorgusu
+            params (dict): Sorgu parametreleri
+        """
+        params = params or {}
+        version = await self.version_tracker.acurrent(async_graph)
+        key, rows = self._lookup(version, cypher_query, params)
+        if rows is None:
+            rows = await async_graph.aquery(cypher_query, params)
+            self._store(version, key, rows)
+        return list(rows)
+
+    def clear(self):
+        with self._version_lock:
+            self._cache.clear()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats["data_version"] = self._version
+        return stats
+
+    def query_stats(self):
+        """
+        Sorgu bazında isabet/ıskalama sayılarını döner.
+        """
+        with self._stats_lock:
+            return {fingerprint: dict(stats) for fingerprint, stats in self._query_stats.items()}
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    """
+    Süreç genelinde paylaşılan semantik yanıt önbelleğini döner.
+    Önbellek devre dışı ise None döner. Embedding modeli ilk kullanımda yüklenir.
+    """
+    global _answer_cache
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            from chatbot.utils.embeddings import get_embeddings_model
+
+            _answer_cache = SemanticCache(
+                threshold=SEMANTIC_CACHE_THRESHOLD,
+                ttl=SEMANTIC_CACHE_TTL,
+                max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+                embeddings_factory=get_embeddings_model,
+            )
+        return _answer_cache
+
+
+_cypher_cache = None
+_cypher_cache_lock = threading.Lock()
+
+
+def get_cypher_cache():
+    """
+    Süreç genelinde paylaşılan Cypher üretim önbelleğini döner.
+    Önbellek devre dışı ise None döner.
+    """
+    global _cypher_cache
+    if not CYPHER_CACHE_ENABLED:
+        return None
+
+    with _cypher_cache_lock:
+        if _cypher_cache is None:
+            _cypher_cache = CypherCache(
+                max_entries=CYPHER_CACHE_MAX_ENTRIES,
+                ttl=CYPHER_CACHE_TTL,
+            )
+        return _cypher_cache
+
+
+_query_cache = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_cache():
+    """
+    Süreç genelinde paylaşılan Neo4j sorgu sonucu önbelleğini döner.
+    Önbellek devre dışı ise None döner.
+    """
+    global _query_cache
+    if not QUERY_CACHE_ENABLED:
+        return None
+
+    with _query_cache_lock:
+        if _query_cache is None:
+            from chatbot.utils.data_version import data_version_tracker
+
+            _query_cache = QueryResultCache(
+                version_tracker=data_version_tracker,
+                max_entries=QUERY_CACHE_MAX_ENTRIES,
+                ttl=QUERY_CACHE_TTL,
+                max_rows=QUERY_CACHE_MAX_ROWS,
+            )
+        return _query_cache
+
+
+def cached_query(graph, cypher_query, params=None):
+    """
+    Sorgu önbelleği etkinse önbellek üzerinden, değilse doğrudan graph üzerinde çalıştırır.
+    """
+    query_cache = get_query_cache()
+    with tracer.span("graph_query") as span:
+        if query_cache is None:
+            rows = graph.query(cypher_query, params or {})
+        else:
+            rows = query_cache.query(graph, cypher_query, params)
+        span.set(rows=len(rows))
+    return rows
+
+
+async def cached_aquery(async_graph, cypher_query, params=None):
+    """
+    cached_query fonksiyonunun async versiyonu.
+    """
+    query_cache = get_query_cache()
+    with tracer.span("graph_query") as span:
+        if query_cache is None:
+            rows = await async_graph.aquery(cypher_query, params or {})
+        else:
+            rows = await query_cache.aquery(async_graph, cypher_query, params)
+        span.set(rows=len(rows))
+    return rows
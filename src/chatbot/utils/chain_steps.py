@@ -0,0 +1,43 @@
+# Zincirlerin senkron, async ve stream yollarında ortak kullanılan saf yardımcılar.
+# Bu fonksiyonlar I/O yapmaz; LLM ve graph çağrıları çağıran tarafta kalır.
+
+
+def user_messages(prompt_text):
+    """
+    Prompt metnini LLM'e gönderilecek tek kullanıcı mesajlı listeye çevirir.
+    """
+    return [{"role": "user", "content": prompt_text}]
+
+
+def response_text(response):
+    """
+    LLM yanıt nesnesinin metnini döner.
+    """
+    return getattr(response, "content", str(response))
+
+
+def stream_text(chunks):
+    """
+    LLM stream parçalarından metin parçalarını üretir.
+    """
+    return (chunk.content for chunk in chunks)
+
+
+def chain_result(answer, query, context, **extra):
+    """
+    Zincirlerin döndürdüğü ortak sonuç sözlüğünü oluşturur.
+
+    Args:
+        answer: Kullanıcıya gösterilecek yanıt
+        query: Çalıştırılan Cypher sorgusu (vektör aramada soru metni)
+        context: Yanıtın dayandığı sorgu sonuçları veya kaynak dokümanlar
+        **extra: Sonuca eklenecek diğer alanlar (ör. intent, error)
+    """
+    return {
+        "result": answer,
+        **extra,
+        "intermediate_steps": [
+            {"query": query},
+            {"context": context}
+        ]
+    }
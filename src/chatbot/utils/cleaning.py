@@ -31,4 +31,82 @@ def clean_query(text):
     return clean_text(text, is_cypher=True)
 
 def clean_response(text):
-    return clean_text(text, is_cypher=False)
\ No newline at end of file
+    return clean_text(text, is_cypher=False)
+
+class ThinkFilter:
+    """
+    Akış halinde gelen LLM çıktısından <think> bloklarını parça parça ayıklar.
+    Etiketler parçalar arasında bölünmüş gelse bile doğru çalışır.
+    """
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+
+    @staticmethod
+    def _partial_tag_length(text, tag):
+        for length in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:length]):
+                return length
+        return 0
+
+    def _emit(self, text):
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
+    def feed(self, text):
+        """
+        Yeni gelen parçayı işler ve kullanıcıya gösterilebilecek kısmı döner.
+        """
+        self._buffer += text
+        output = []
+        while True:
+            tag = self.CLOSE_TAG if self._inside else self.OPEN_TAG
+            index = self._buffer.find(tag)
+            if index == -1:
+                keep = self._partial_tag_length(self._buffer, tag)
+                if not self._inside:
+                    output.append(self._buffer[:len(self._buffer) - keep])
+                self._buffer = self._buffer[len(self._buffer) - keep:]
+                break
+            if not self._inside:
+                output.append(self._buffer[:index])
+            self._buffer = self._buffer[index + len(tag):]
+            self._inside = not self._inside
+        return self._emit("".join(output))
+
+    def flush(self):
+        """
+        Akış bittiğinde tamponda kalan gösterilebilir metni döner.
+        """
+        rest = "" if self._inside else self._buffer
+        self._buffer = ""
+        return self._emit(rest)
+
+
+def filter_think_stream(chunks):
+    """
+    Metin parçalarını <think> blokları ayıklanmış şekilde yield eder.
+
+    Args:
+        chunks: LLM'den gelen metin parçaları
+
+    Returns:
+        str: Akışın ayıklanmamış tam metni (generator dönüş değeri olarak)
+    """
+    think_filter = ThinkFilter()
+    raw_parts = []
+    for chunk in chunks:
+        raw_parts.append(chunk)
+        visible = think_filter.feed(chunk)
+        if visible:
+            yield visible
+    rest = think_filter.flush()
+    if rest:
+        yield rest
+    return "".join(raw_parts)
@@ -0,0 +1,180 @@
+import functools
+
+from src.config.settings import CONTEXT_TOKEN_BUDGET, CONTEXT_MAX_VALUE_TOKENS
+from src.config.logger import logger
+from chatbot.utils.profiling import lazy_import
+
+# Sonuç satırlarında makaleyi tanımlayan sütun adları
+PAPER_KEYS = ("paper_name", "paper", "title")
+
+# Vektör aramada makale başlığında bir kez yazılan metadata alanları
+PAPER_METADATA_FIELDS = [
+    ("publication_date", "Tarih"),
+    ("authors", "Yazarlar"),
+    ("arxiv_link", "ArXiv"),
+    ("pwc_link", "PWC"),
+    ("github_links", "GitHub"),
+]
+
+
+class _CharTokenizer:
+    """
+    tiktoken kullanılamadığında yaklaşık token sayımı (4 karakter ≈ 1 token).
+    """
+
+    def encode(self, text):
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(model_name=None):
+    """
+    Modelin tokenizer'ını döner. Model tiktoken'da tanımlı değilse o200k_base,
+    tiktoken hiç yüklenemezse karakter tabanlı yaklaşık sayım kullanılır.
+    """
+    try:
+        tiktoken = lazy_import("tiktoken")
+        try:
+            return tiktoken.encoding_for_model(model_name or "")
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"Tokenizer yüklenemedi, yaklaşık token sayımı kullanılacak: {str(e)}")
+        return _CharTokenizer()
+
+
+def _is_empty(value):
+    return value is None or value == "" or value == [] or value == {}
+
+
+class ContextBuilder:
+    """
+    Graph sorgu sonuçlarını ve vektör arama chunk'larını QA prompt'u için
+    makale bazında gruplanmış, tablo benzeri kompakt bir metne çevirir.
+    Metin token bütçesini aşarsa uzun değerler kısaltılır, sığmayan satırlar çıkarılır.
+    """
+
+    def __init__(self, model_name=None, token_budget=CONTEXT_TOKEN_BUDGET, max_value_tokens=CONTEXT_MAX_VALUE_TOKENS):
+        """
+        Args:
+            model_name: Token sayımı için tokenizer'ı seçilecek model
+            token_budget: Bağlam için ayrılan maksimum token sayısı
+            max_value_tokens: Tek bir değerin (ör. özet, chunk metni) alabileceği maksimum token
+        """
+        self.model_name = model_name
+        self.token_budget = token_budget
+        self.max_value_tokens = max_value_tokens
+
+    @property
+    def tokenizer(self):
+        return get_tokenizer(self.model_name)
+
+    def count_tokens(self, text):
+        return len(self.tokenizer.encode(text))
+
+    def _trim(self, text, max_tokens):
+        tokens = self.tokenizer.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return self.tokenizer.decode(tokens[:max_tokens]).rstrip() + "…"
+
+    def _format_value(self, value, max_tokens=None):
+        if isinstance(value, dict):
+            text = ", ".join(f"{key}: {self._format_value(item)}" for key, item in value.items() if not _is_empty(item))
+        elif isinstance(value, (list, tuple)):
+            text = "; ".join(self._format_value(item) for item in value if not _is_empty(item))
+        elif _is_empty(value):
+            text = "-"
+        else:
+            text = str(value)
+        text = " ".join(text.split()).replace("|", "/")
+        return self._trim(text, max_tokens or self.max_value_tokens)
+
+    def _fit(self, blocks, omitted_label):
+        """
+        Blokları (her biri satır listesi) bütçe dolana kadar ekler.
+        Sığmayan satır sayısı metnin sonuna not olarak eklenir.
+        """
+        lines, used, omitted = [], 0, 0
+        for block in blocks:
+            for line in block:
+                cost = self.count_tokens(line) + 1
+                if omitted or used + cost > self.token_budget:
+                    omitted += 1
+                    continue
+                lines.append(line)
+                used += cost
+        if omitted:
+            lines.append(f"(Token bütçesi nedeniyle {omitted} {omitted_label} daha çıkarıldı)")
+        return "\n".join(lines)
+
+    def _paper_key(self, rows):
+        for key in PAPER_KEYS:
+            if all(isinstance(row, dict) and key in row for row in rows):
+                return key
+        return None
+
+    def _table(self, rows, columns):
+        header = " | ".join(columns)
+        lines = [" | ".join(self._format_value(row.get(column)) for column in columns) for row in rows]
+        return [header] + list(dict.fromkeys(lines))
+
+    def build_rows(self, rows):
+        """
+        Cypher sorgu sonuçlarını (sözlük listesi) bağlam metnine çevirir.
+        Sonuç boşsa QA prompt'unun beklediği gibi "[]" döner.
+        """
+        if not rows:
+            return "[]"
+        if not all(isinstance(row, dict) for row in rows):
+            return self._fit([[self._format_value(row)] for row in rows], "satır")
+
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        paper_key = self._paper_key(rows)
+        groups = {}
+        if paper_key is not None:
+            for row in rows:
+                groups.setdefault(self._format_value(row.get(paper_key)), []).append(row)
+
+        # Aynı makale birden fazla satırda geçmiyorsa gruplamak yerine düz tablo yeterlidir
+        if paper_key is None or len(groups) == len(rows):
+            header, *lines = self._table(rows, columns)
+            return header + "\n" + self._fit([[line] for line in lines], "satır")
+
+        other_columns = [column for column in columns if column != paper_key]
+        blocks = []
+        for paper, paper_rows in groups.items():
+            block = [f"## {paper}"]
+            if other_columns:
+                block += self._table(paper_rows, other_columns)
+            blocks.append(block)
+        return self._fit(blocks, "satır")
+
+    def build_documents(self, documents):
+        """
+        Vektör arama sonuçlarını makale bazında gruplar; makale bilgileri bir kez,
+        ardından o makaleye ait chunk metinleri yazılır.
+        """
+        if not documents:
+            return "[]"
+
+        groups = {}
+        for document in documents:
+            paper = document.metadata.get("paper_name") or "Bilinmeyen"
+            groups.setdefault(paper, []).append(document)
+
+        blocks = []
+        for paper, paper_documents in groups.items():
+            metadata = paper_documents[0].metadata
+            block = [f"## Makale: {paper}"]
+            details = [f"{label}: {self._format_value(metadata.get(field))}" for field, label in PAPER_METADATA_FIELDS if not _is_empty(metadata.get(field))]
+            if details:
+                block.append(" | ".join(details))
+            for document in sorted(paper_documents, key=lambda doc: doc.metadata.get("order") or 0):
+                block.append(f"- {self._format_value(document.page_content, max_tokens=self.max_value_tokens * 2)}")
+            blocks.append(block)
+        return self._fit(blocks, "satır")
+
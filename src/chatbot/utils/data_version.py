@@ -0,0 +1,83 @@
+import threading
+import time
+
+from src.config.settings import DATA_VERSION_CHECK_INTERVAL
+from src.config.logger import logger
+
+DATA_VERSION_QUERY = """
+MATCH (v:DataVersion {id: 'current'})
+RETURN v.version AS version
+"""
+
+
+class DataVersionTracker:
+    """
+    Yükleyicinin (scripts/load_to_neo4j.py) her yüklemenin sonunda graph'a yazdığı
+    veri sürümünü takip eder. Veritabanına en fazla check_interval saniyede bir gidilir.
+    """
+
+    def __init__(self, check_interval=30):
+        self.check_interval = check_interval
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def _cached_version(self, now):
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return True, self._version
+            return False, None
+
+    def _update(self, version, now):
+        with self._lock:
+            if self._checked_at is not None and version != self._version:
+                logger.info(f"Yeni veri sürümü tespit edildi: {version}")
+            self._version = version
+            self._checked_at = now
+            return version
+
+    def current(self, graph):
+        """
+        Graph'taki güncel veri sürümünü döner. Sürüm damgası yoksa None döner.
+
+        Args:
+            graph: Neo4jGraph bağlantısı
+
+        Returns:
+            str | None: Veri sürümü
+        """
+        now = time.monotonic()
+        fresh, version = self._cached_version(now)
+        if fresh:
+            return version
+
+        try:
+            result = graph.query(DATA_VERSION_QUERY)
+            version = result[0].get("version") if result else None
+        except Exception as e:
+            logger.warning(f"Veri sürümü okunamadı: {str(e)}")
+            version = self._version
+        return self._update(version, now)
+
+    async def acurrent(self, async_graph):
+        """
+        current metodunun async versiyonu.
+
+        Args:
+            async_graph: AsyncNeo4jGraph bağlantısı
+        """
+        now = time.monotonic()
+        fresh, version = self._cached_version(now)
+        if fresh:
+            return version
+
+        try:
+            result = await async_graph.aquery(DATA_VERSION_QUERY)
+            version = result[0].get("version") if result else None
+        except Exception as e:
+            logger.warning(f"Veri sürümü okunamadı: {str(e)}")
+            version = self._version
+        return self._update(version, now)
+
+
+data_version_tracker = DataVersionTracker(check_interval=DATA_VERSION_CHECK_INTERVAL)
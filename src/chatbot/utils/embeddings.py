@@ -0,0 +1,135 @@
+import asyncio
+import threading
+
+from langchain_core.embeddings import Embeddings
+
+from src.config.settings import (
+    EMBEDDING_MODEL_NAME, EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_BACKEND,
+    EMBEDDING_ONNX_DIR, EMBEDDING_ONNX_QUANTIZED, EMBEDDING_ONNX_THREADS, EMBEDDING_BATCH_SIZE
+)
+from src.config.logger import logger
+from chatbot.utils.cache import LRUCache
+from chatbot.utils.profiling import lazy_import
+from chatbot.utils.onnx_embeddings import OnnxEmbeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Sorgu embedding'lerini LRU önbellekte tutan embedding sarmalayıcısı.
+    Aynı sorgu tekrar geldiğinde model çalıştırılmadan önbellekteki vektör döner.
+    Doküman embedding'leri önbelleğe alınmadan doğrudan modele iletilir.
+    """
+
+    def __init__(self, model, max_entries=EMBEDDING_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            model: Sarmalanan embedding modeli
+            max_entries: Önbellekte tutulacak maksimum sorgu sayısı
+        """
+        self.model = model
+        self.cache = LRUCache(max_entries=max_entries)
+
+    def embed_query(self, text):
+        key = text.strip()
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.model.embed_query(text)
+            self.cache.put(key, vector)
+        return list(vector)
+
+    async def aembed_query(self, text):
+        key = text.strip()
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = await asyncio.to_thread(self.model.embed_query, text)
+            self.cache.put(key, vector)
+        return list(vector)
+
+    def embed_documents(self, texts):
+        return self.model.embed_documents(texts)
+
+    async def aembed_documents(self, texts):
+        return await asyncio.to_thread(self.model.embed_documents, texts)
+
+    def stats(self):
+        """
+        Sorgu embedding önbelleğinin isabet/ıskalama istatistiklerini döner.
+        """
+        return self.cache.stats()
+
+
+def create_embeddings(model_name=EMBEDDING_MODEL_NAME, backend=EMBEDDING_BACKEND):
+    """
+    Seçilen backend ile embedding modelini oluşturur.
+
+    Args:
+        model_name (str): HuggingFace model adı
+        backend (str): "torch" veya "onnx". onnx backend'i EMBEDDING_ONNX_DIR dizinindeki
+            aktarılmış modeli kullanır ve torch import etmez; dizindeki model model_name için
+            aktarılmamışsa ValueError verilir.
+
+    Returns:
+        Embeddings: Önbelleksiz embedding modeli
+    """
+    if backend == "onnx":
+        logger.info(f"ONNX embedding modeli yükleniyor: {EMBEDDING_ONNX_DIR} (int8: {EMBEDDING_ONNX_QUANTIZED})")
+        return OnnxEmbeddings(
+            EMBEDDING_ONNX_DIR,
+            quantized=EMBEDDING_ONNX_QUANTIZED,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            threads=EMBEDDING_ONNX_THREADS,
+            model_name=model_name
+        )
+    if backend != "torch":
+        raise ValueError(f"Geçersiz embedding backend'i: {backend}")
+
+    torch = lazy_import("torch")
+    HuggingFaceEmbeddings = lazy_import("langchain_community.embeddings").HuggingFaceEmbeddings
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    logger.info(f"Embedding modeli yükleniyor: {model_name} ({device})")
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={'device': device},
+        encode_kwargs={'batch_size': EMBEDDING_BATCH_SIZE}
+    )
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_embeddings_model(model_name=EMBEDDING_MODEL_NAME):
+    """
+    Embedding modelini süreç genelinde bir kez yükler ve paylaşır.
+    Model, sorgu embedding önbelleğiyle sarmalanmış olarak döner.
+    Backend EMBEDDING_BACKEND ayarıyla seçilir (bkz. create_embeddings).
+
+    Args:
+        model_name (str): HuggingFace model adı
+
+    Returns:
+        CachedEmbeddings: Paylaşılan embedding modeli
+    """
+    with _models_lock:
+        if model_name not in _models:
+            _models[model_name] = CachedEmbeddings(create_embeddings(model_name))
+        return _models[model_name]
+
+
+def set_embeddings_model(model, model_name=EMBEDDING_MODEL_NAME):
+    """
+    Verilen embedding modelini, sorgu önbelleğiyle sarmalayarak paylaşılan model olarak kaydeder.
+    Gerçek model yerine yerel bir karşılığın kullanıldığı benchmark gibi ortamlar içindir.
+    """
+    with _models_lock:
+        _models[model_name] = CachedEmbeddings(model)
+        return _models[model_name]
+
+
+def embedding_cache_stats():
+    """
+    Yüklenmiş modellerin sorgu embedding önbelleği istatistiklerini döner.
+    """
+    with _models_lock:
+        return {model_name: model.stats() for model_name, model in _models.items()}
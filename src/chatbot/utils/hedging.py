@@ -0,0 +1,209 @@
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.config.logger import logger
+
+# Senkron çağrılarda birincil ve ikincil model istekleri bu havuzda çalışır
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+
+
+def _submit(fn, *args, **kwargs):
+    # Thread havuzu contextvar'ları kopyalamaz; LLM önceliği ve trace bağlamı çağıranınkiyle aynı kalmalı
+    return _executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Birincil modeli ikincil bir sağlayıcı/modelle yedekleyen chat modeli.
+    Birincil model hedge_after saniye içinde yanıt vermezse aynı istek ikincil modele de
+    gönderilir ve önce gelen yanıt kullanılır. Birincil model hata verirse beklemeden
+    ikincil modele geçilir; iki model de hata verirse birincilin hatası yükseltilir.
+    Stream çağrılarında yarış ilk token'a kadar sürer, sonrasında kazanan modelin akışı izlenir.
+    """
+
+    primary: Any
+    secondary: Any
+    hedge_after: float = 2.0
+    model_name: str = ""
+    stats_lock: Any = None
+    counters: dict = {}
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if not self.model_name:
+            self.model_name = getattr(self.primary, "model_name", "") or ""
+        self.stats_lock = threading.Lock()
+        self.counters = {"requests": 0, "hedged": 0, "failovers": 0, "secondary_wins": 0, "errors": 0}
+
+    @property
+    def _llm_type(self):
+        return "hedged"
+
+    def _count(self, *names):
+        with self.stats_lock:
+            for name in names:
+                self.counters[name] += 1
+
+    def stats(self):
+        """
+        İstek, hedge (ikincil modele de gönderilen), failover, ikincil modelin kazandığı ve
+        iki modelin de hata verdiği istek sayılarını döner.
+        """
+        with self.stats_lock:
+            return dict(self.counters)
+
+    def _winner(self, name):
+        if name == "secondary":
+            self._count("secondary_wins")
+            logger.info(f"Hedge: ikincil modelin yanıtı kullanıldı ({getattr(self.secondary, 'model_name', '')})")
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._count("requests")
+        futures = {_submit(self.primary.invoke, messages, stop=stop, **kwargs): "primary"}
+        done, _ = wait(futures, timeout=self.hedge_after)
+        primary_error = None
+        hedged = False
+
+        if not done:
+            hedged = True
+            self._count("hedged")
+            futures[_submit(self.secondary.invoke, messages, stop=stop, **kwargs)] = "secondary"
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures.pop(future)
+                error = future.exception()
+                if error is None:
+                    for other in futures:
+                        other.cancel()
+                    self._winner(name)
+                    return ChatResult(generations=[ChatGeneration(message=future.result())])
+
+                logger.warning(f"Hedge: {name} model hata verdi: {error}")
+                if name == "primary":
+                    primary_error = error
+                    if not hedged:
+                        hedged = True
+                        self._count("failovers")
+                        futures[_submit(self.secondary.invoke, messages, stop=stop, **kwargs)] = "secondary"
+
+        self._count("errors")
+        raise primary_error
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._count("requests")
+        tasks = {asyncio.ensure_future(self.primary.ainvoke(messages, stop=stop, **kwargs)): "primary"}
+        done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+        primary_error = None
+        hedged = False
+
+        if not done:
+            hedged = True
+            self._count("hedged")
+            tasks[asyncio.ensure_future(self.secondary.ainvoke(messages, stop=stop, **kwargs))] = "secondary"
+
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self._winner(name)
+                        return ChatResult(generations=[ChatGeneration(message=task.result())])
+
+                    logger.warning(f"Hedge: {name} model hata verdi: {error}")
+                    if name == "primary":
+                        primary_error = error
+                        if not hedged:
+                            hedged = True
+                            self._count("failovers")
+                            tasks[asyncio.ensure_future(self.secondary.ainvoke(messages, stop=stop, **kwargs))] = "secondary"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        self._count("errors")
+        raise primary_error
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._count("requests")
+        events = queue.Queue()
+        stopped = {"primary": threading.Event(), "secondary": threading.Event()}
+
+        def pump(name, model):
+            try:
+                for chunk in model.stream(messages, stop=stop, **kwargs):
+                    if stopped[name].is_set():
+                        return
+                    events.put((name, chunk, None))
+                events.put((name, None, None))
+            except Exception as e:
+                events.put((name, None, e))
+
+        def start(name, model):
+            running.add(name)
+            _submit(pump, name, model)
+
+        running = set()
+        winner = None
+        hedged = False
+        primary_error = None
+        start("primary", self.primary)
+
+        try:
+            while running:
+                timeout = self.hedge_after if not hedged and winner is None else None
+                try:
+                    name, chunk, error = events.get(timeout=timeout)
+                except queue.Empty:
+                    hedged = True
+                    self._count("hedged")
+                    start("secondary", self.secondary)
+                    continue
+
+                if winner is not None and name != winner:
+                    continue
+
+                if error is not None:
+                    running.discard(name)
+                    if winner is not None:
+                        raise error
+                    logger.warning(f"Hedge: {name} model hata verdi: {error}")
+                    if name == "primary":
+                        primary_error = error
+                        if not hedged:
+                            hedged = True
+                            self._count("failovers")
+                            start("secondary", self.secondary)
+                    continue
+
+                if chunk is None:
+                    running.discard(name)
+                    if winner is None:
+                        winner = name
+                    if name == winner:
+                        return
+                    continue
+
+                if winner is None:
+                    winner = name
+                    self._winner(name)
+                    for other in stopped:
+                        if other != winner:
+                            stopped[other].set()
+                yield ChatGenerationChunk(message=chunk)
+        finally:
+            for event in stopped.values():
+                event.set()
+
+        self._count("errors")
+        raise primary_error
@@ -0,0 +1,389 @@
+import asyncio
+import heapq
+import itertools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.config.settings import LLM_RATE_LIMITS, LLM_RATE_LIMIT_HEADROOM, LLM_RATE_LIMIT_RETRIES
+from src.config.logger import logger
+from chatbot.utils.context_builder import get_tokenizer
+
+# Küçük değer önce çalışır: kullanıcı istekleri toplu işlerden, toplu işler arka plan işlerinden önce
+PRIORITIES = {"interactive": 0, "batch": 10, "background": 20}
+
+_current_priority = ContextVar("llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(name):
+    """
+    Blok içinde yapılan LLM çağrılarının zamanlayıcı önceliğini belirler.
+
+    Örnek:
+        with llm_priority("batch"):
+            chatbot.get_response(question)
+    """
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Dakika başına kota için token kovası. Kova kapasitesi kadar dolar ve saniyede
+    kota/60 hızla yenilenir.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """
+        amount kadar token için beklenmesi gereken süreyi (sn) döner.
+        Kapasiteden büyük istekler kova dolduğunda geçer.
+        """
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+    def give(self, amount):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self):
+        self.tokens = min(self.tokens, 0.0)
+
+
+class _Lane:
+    """
+    Bir sağlayıcı/model için RPM ve TPM kovaları ile öncelik sırasındaki bekleyenler.
+    """
+
+    def __init__(self, rpm=None, tpm=None):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.waiters = []
+        self.condition = threading.Condition()
+        self.stats = {
+            "requests": 0, "queued": 0, "max_queue_depth": 0,
+            "wait_seconds": 0.0, "rate_limited": 0, "tokens": 0,
+        }
+
+    def wait_time(self, amount, now):
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(amount, now))
+        return wait
+
+    def take(self, amount):
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(amount)
+        self.stats["requests"] += 1
+        self.stats["tokens"] += amount
+
+    def queue_depth(self):
+        depth = {}
+        for _, _, _, priority in self.waiters:
+            depth[priority] = depth.get(priority, 0) + 1
+        return depth
+
+
+class LLMScheduler:
+    """
+    Süreçteki tüm LLM çağrılarının geçtiği, sağlayıcı/model başına RPM ve TPM kotalarını
+    token kovalarıyla uygulayan zamanlayıcı. Kota doluysa istekler önceliğe göre sıraya
+    girer (interactive > batch > background), aynı öncelikte geliş sırası korunur.
+    Tahmini token'lar istek öncesinde düşülür, yanıttaki gerçek kullanım bilindiğinde fark
+    kovaya iade edilir. Sağlayıcı 429 döndürürse kova boşaltılır ve sıradaki istekler yavaşlar.
+    """
+
+    def __init__(self, limits=None, headroom=LLM_RATE_LIMIT_HEADROOM):
+        """
+        Args:
+            limits: {"Sağlayıcı/model" veya "Sağlayıcı": {"rpm": ..., "tpm": ...}}
+            headroom: Kotaların kullanılacak oranı (ör. 0.9 ile kotanın %90'ı)
+        """
+        self.limits = limits or {}
+        self.headroom = headroom
+        self._lanes = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def _lane(self, key):
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                provider, model_name = key
+                limit = self.limits.get(f"{provider}/{model_name}") or self.limits.get(provider) or {}
+                rpm, tpm = limit.get("rpm"), limit.get("tpm")
+                lane = _Lane(
+                    rpm=rpm * self.headroom if rpm else None,
+                    tpm=tpm * self.headroom if tpm else None,
+                )
+                self._lanes[key] = lane
+            return lane
+
+    def _enqueue(self, lane, amount):
+        priority = _current_priority.get()
+        entry = (PRIORITIES.get(priority, PRIORITIES["interactive"]), next(self._sequence), amount, priority)
+        heapq.heappush(lane.waiters, entry)
+        lane.stats["max_queue_depth"] = max(lane.stats["max_queue_depth"], len(lane.waiters))
+        return entry
+
+    def _try_acquire(self, lane, entry):
+        """
+        Bekleyen sıranın başındaysa ve kota uygunsa kotayı düşer.
+
+        Returns:
+            float | None: Başarılıysa None, değilse tekrar denemeden önce beklenecek süre
+        """
+        if lane.waiters[0] is not entry:
+            return 0.05
+        wait = lane.wait_time(entry[2], time.monotonic())
+        if wait > 0:
+            return wait
+        heapq.heappop(lane.waiters)
+        lane.take(entry[2])
+        return None
+
+    def _abandon(self, lane, entry):
+        """
+        İptal edilen veya hata alan bekleyeni sıradan çıkarır; aksi halde sıranın başında
+        kalan kayıt sonraki tüm istekleri sonsuza kadar bekletir. lane.condition tutulurken çağrılır.
+        """
+        if entry in lane.waiters:
+            lane.waiters.remove(entry)
+            heapq.heapify(lane.waiters)
+        lane.condition.notify_all()
+
+    def acquire(self, key, amount):
+        """
+        key = (sağlayıcı, model) kotasından amount token ve bir istek hakkı alır, gerekirse bekler.
+        """
+        lane = self._lane(key)
+        started = time.monotonic()
+        with lane.condition:
+            entry = self._enqueue(lane, amount)
+            try:
+                while True:
+                    wait = self._try_acquire(lane, entry)
+                    if wait is None:
+                        break
+                    lane.condition.wait(timeout=wait)
+            except BaseException:
+                self._abandon(lane, entry)
+                raise
+            lane.condition.notify_all()
+        self._record_wait(lane, started)
+
+    async def aacquire(self, key, amount):
+        """
+        acquire metodunun async versiyonu. Bekleme event loop'u bloklamaz.
+        """
+        lane = self._lane(key)
+        started = time.monotonic()
+        with lane.condition:
+            entry = self._enqueue(lane, amount)
+        try:
+            while True:
+                with lane.condition:
+                    wait = self._try_acquire(lane, entry)
+                    if wait is None:
+                        lane.condition.notify_all()
+                        break
+                await asyncio.sleep(min(wait, 0.25))
+        except BaseException:
+            with lane.condition:
+                self._abandon(lane, entry)
+            raise
+        self._record_wait(lane, started)
+
+    def _record_wait(self, lane, started):
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            with lane.condition:
+                lane.stats["queued"] += 1
+                lane.stats["wait_seconds"] += waited
+
+    def limits_tokens(self, key):
+        """
+        key = (sağlayıcı, model) için TPM kotası tanımlı olup olmadığını döner.
+        """
+        return self._lane(key).tokens is not None
+
+    def settle(self, key, estimated, actual):
+        """
+        Tahmini token sayısı ile gerçek kullanım arasındaki farkı kovaya iade eder veya düşer.
+        """
+        if actual is None:
+            return
+        lane = self._lane(key)
+        with lane.condition:
+            if lane.tokens is not None:
+                lane.tokens.give(estimated - actual)
+            lane.stats["tokens"] += actual - estimated
+            lane.condition.notify_all()
+
+    def rate_limited(self, key):
+        """
+        Sağlayıcının 429 yanıtından sonra kovaları boşaltır, böylece sıradaki istekler
+        yeni kota birikene kadar bekler.
+        """
+        lane = self._lane(key)
+        with lane.condition:
+            for bucket in (lane.requests, lane.tokens):
+                if bucket is not None:
+                    bucket.drain()
+            lane.stats["rate_limited"] += 1
+
+    def stats(self):
+        """
+        Sağlayıcı/model başına istek, token, sıraya giren istek, toplam bekleme,
+        anlık ve en yüksek sıra derinliği ile 429 sayılarını döner.
+        """
+        with self._lock:
+            lanes = dict(self._lanes)
+        result = {}
+        for (provider, model_name), lane in lanes.items():
+            with lane.condition:
+                result[f"{provider}/{model_name}"] = {
+                    **lane.stats,
+                    "wait_seconds": round(lane.stats["wait_seconds"], 3),
+                    "queue_depth": len(lane.waiters),
+                    "queue_depth_by_priority": lane.queue_depth(),
+                }
+        return result
+
+
+def is_rate_limit_error(error):
+    return getattr(error, "status_code", None) == 429 or "RateLimit" in type(error).__name__
+
+
+def _usage_tokens(message):
+    usage = getattr(message, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens") or (usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+    return None
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    Chat modeli çağrılarını paylaşılan LLMScheduler üzerinden geçiren sarmalayıcı.
+    İstek başına token tahmini, prompt token'ları ile modelin max_tokens değerinin toplamıdır.
+    Sağlayıcı 429 döndürürse kova boşaltılır ve istek sıraya yeniden girerek tekrar denenir.
+    """
+
+    llm: Any
+    provider: str
+    model_name: str = ""
+    scheduler: Any = None
+    max_retries: int = LLM_RATE_LIMIT_RETRIES
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if not self.model_name:
+            self.model_name = getattr(self.llm, "model_name", "") or ""
+        if self.scheduler is None:
+            self.scheduler = llm_scheduler
+
+    @property
+    def _llm_type(self):
+        return "scheduled"
+
+    @property
+    def _key(self):
+        return (self.provider, self.model_name)
+
+    def _estimate(self, messages):
+        # TPM kotası yoksa tahmin kullanılmaz; prompt'u tokenize etmeye gerek yok
+        if not self.scheduler.limits_tokens(self._key):
+            return 0
+        tokenizer = get_tokenizer(self.model_name)
+        prompt_tokens = sum(len(tokenizer.encode(str(message.content))) for message in messages)
+        return prompt_tokens + (getattr(self.llm, "max_tokens", None) or 0)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        estimated = self._estimate(messages)
+        for attempt in range(self.max_retries + 1):
+            self.scheduler.acquire(self._key, estimated)
+            try:
+                message = self.llm.invoke(messages, stop=stop, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                logger.warning(f"LLM kota sınırına takıldı, istek yeniden sıraya alınıyor: {self.provider}/{self.model_name}")
+                self.scheduler.rate_limited(self._key)
+                continue
+            self.scheduler.settle(self._key, estimated, _usage_tokens(message))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        estimated = self._estimate(messages)
+        for attempt in range(self.max_retries + 1):
+            await self.scheduler.aacquire(self._key, estimated)
+            try:
+                message = await self.llm.ainvoke(messages, stop=stop, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                logger.warning(f"LLM kota sınırına takıldı, istek yeniden sıraya alınıyor: {self.provider}/{self.model_name}")
+                self.scheduler.rate_limited(self._key)
+                continue
+            self.scheduler.settle(self._key, estimated, _usage_tokens(message))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        estimated = self._estimate(messages)
+        for attempt in range(self.max_retries + 1):
+            self.scheduler.acquire(self._key, estimated)
+            started = False
+            used = None
+            try:
+                for chunk in self.llm.stream(messages, stop=stop, **kwargs):
+                    started = True
+                    tokens = _usage_tokens(chunk)
+                    if tokens is not None:
+                        used = (used or 0) + tokens
+                    yield ChatGenerationChunk(message=chunk)
+                self.scheduler.settle(self._key, estimated, used)
+                return
+            except Exception as e:
+                if started or not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                logger.warning(f"LLM kota sınırına takıldı, istek yeniden sıraya alınıyor: {self.provider}/{self.model_name}")
+                self.scheduler.rate_limited(self._key)
+
+
+def _parse_limits(value):
+    try:
+        return json.loads(value) if value else {}
+    except json.JSONDecodeError as e:
+        logger.warning(f"LLM_RATE_LIMITS okunamadı, kota uygulanmayacak: {e}")
+        return {}
+
+
+llm_scheduler = LLMScheduler(limits=_parse_limits(LLM_RATE_LIMITS))
@@ -0,0 +1,137 @@
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.config.settings import MEMORY_MAX_TURNS, MEMORY_MAX_TOKENS
+from src.config.prompts import summary_prompt
+from src.config.logger import logger
+from chatbot.utils.cleaning import clean_response
+from chatbot.utils.context_builder import get_tokenizer
+from chatbot.utils.llm_scheduler import llm_priority
+
+_summary_executor = None
+_summary_executor_lock = threading.Lock()
+
+
+def _get_summary_executor():
+    global _summary_executor
+    with _summary_executor_lock:
+        if _summary_executor is None:
+            _summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+        return _summary_executor
+
+
+class SummarizingMemory:
+    """
+    Son N turu olduğu gibi tutan, daha eski turları arka planda güncellenen bir özete
+    katlayan, token sınırlı sohbet belleği. ConversationBufferMemory ile aynı
+    load_memory_variables / save_context arayüzünü sunar.
+    """
+
+    def __init__(self, llm=None, max_turns=MEMORY_MAX_TURNS, max_tokens=MEMORY_MAX_TOKENS, model_name=None):
+        """
+        Args:
+            llm: Özet üretiminde kullanılacak LLM (None ise eski turlar özetlenmeden atılır)
+            max_turns: Olduğu gibi tutulacak son tur sayısı
+            max_tokens: Özet ve son turlar için toplam token sınırı
+            model_name: Token sayımı için tokenizer'ı seçilecek model
+        """
+        self.llm = llm
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.model_name = model_name
+        self.summary = ""
+        self._turns = deque()
+        self._pending = []
+        self._summarizing = False
+        # clear() ile artar; özet üretimi sürerken temizlenen belleğe eski özet yazılmaz
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _count_tokens(self, text):
+        return len(get_tokenizer(self.model_name).encode(text))
+
+    def _trim(self, text, max_tokens):
+        tokenizer = get_tokenizer(self.model_name)
+        tokens = tokenizer.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return tokenizer.decode(tokens[:max_tokens]).rstrip() + "…"
+
+    def save_context(self, inputs, outputs):
+        """
+        Turu belleğe ekler. Sınırı aşan en eski turlar özetlenmek üzere kuyruğa alınır.
+        """
+        with self._lock:
+            self._turns.append((inputs["question"], outputs["answer"]))
+            while len(self._turns) > self.max_turns:
+                self._pending.append(self._turns.popleft())
+            schedule = bool(self._pending) and not self._summarizing and self.llm is not None
+            if self._pending and self.llm is None:
+                self._pending.clear()
+            if schedule:
+                self._summarizing = True
+
+        if schedule:
+            _get_summary_executor().submit(self._summarize)
+
+    def _summarize(self):
+        while True:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                summary = self.summary
+                generation = self._generation
+                if not pending:
+                    self._summarizing = False
+                    return
+
+            new_lines = "\n".join(
+                f"user: {question}\nassistant: {self._trim(answer, self.max_tokens // 4)}"
+                for question, answer in pending
+            )
+            try:
+                prompt_text = summary_prompt.format(summary=summary or "-", new_lines=new_lines)
+                # Özet güncellemesi kullanıcıyı bekletmez, LLM kotasında en arkada sıraya girer
+                with llm_priority("background"):
+                    response = self.llm.invoke([{"role": "user", "content": prompt_text}])
+                summary = clean_response(getattr(response, "content", str(response))).strip()
+            except Exception as e:
+                logger.warning(f"Sohbet özeti güncellenemedi: {str(e)}")
+
+            with self._lock:
+                if generation != self._generation:
+                    logger.debug("Bellek temizlendiği için eski sohbet özeti atıldı")
+                    continue
+                self.summary = self._trim(summary, self.max_tokens // 3)
+
+    def load_memory_variables(self, inputs):
+        """
+        Özeti ve token sınırına sığan en yeni turları döner.
+
+        Returns:
+            dict: {"chat_history": mesaj listesi, "summary": özet metni}
+        """
+        with self._lock:
+            summary = self.summary
+            turns = list(self._turns)
+
+        budget = self.max_tokens - (self._count_tokens(summary) if summary else 0)
+        messages = []
+        for question, answer in reversed(turns):
+            answer = self._trim(answer, max(self.max_tokens // 4, 1))
+            cost = self._count_tokens(question) + self._count_tokens(answer)
+            if messages and cost > budget:
+                break
+            messages[:0] = [HumanMessage(content=question), AIMessage(content=answer)]
+            budget -= cost
+
+        return {"chat_history": messages, "summary": summary}
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self.summary = ""
+            self._turns.clear()
+            self._pending.clear()
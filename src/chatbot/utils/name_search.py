@@ -0,0 +1,58 @@
+import re
+
+# Küçük harfli, TEXT index'li isim alanı (scripts/load_to_neo4j.py tarafından yazılır)
+NAME_LOWER_PROPERTY = "name_lower"
+
+STRING_RHS = r"(?P<rhs>'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|toLower\([^()]*\)|\$\w+|\w+(?:\.\w+)?\b(?!\s*[(.]))"
+OPERATORS = r"(?P<op>CONTAINS|STARTS\s+WITH|ENDS\s+WITH|=)"
+
+TO_LOWER_NAME_PATTERN = re.compile(
+    rf"toLower\(\s*(?P<var>\w+)\.name\s*\)\s*{OPERATORS}\s*{STRING_RHS}",
+    re.IGNORECASE
+)
+NAME_LOWER_PATTERN = re.compile(
+    rf"(?P<var>\w+)\.{NAME_LOWER_PROPERTY}\s*{OPERATORS}\s*{STRING_RHS}",
+    re.IGNORECASE
+)
+
+
+def _lower_rhs(rhs):
+    if rhs[0] in "'\"":
+        return rhs.lower()
+    if rhs.lower().startswith("tolower("):
+        return rhs
+    return f"toLower({rhs})"
+
+
+def name_index_available(schema):
+    """
+    Graph şemasında indekslenen küçük harfli isim alanı var mı kontrol eder.
+    """
+    return NAME_LOWER_PROPERTY in (schema or "")
+
+
+def rewrite_name_predicates(cypher_query, schema):
+    """
+    İsim aramalarını graph'taki isim alanına uygun hale getirir.
+    name_lower alanı varsa indeks kullanamayan `toLower(x.name) CONTAINS ...` ifadeleri
+    `x.name_lower CONTAINS ...` olarak yazılır; alan yoksa (eski yükleme) tersine çevrilir.
+
+    Args:
+        cypher_query (str): Cypher sorgusu
+        schema (str): Graph şeması
+
+    Returns:
+        str: Yeniden yazılmış sorgu
+    """
+    if not cypher_query:
+        return cypher_query
+
+    if name_index_available(schema):
+        return TO_LOWER_NAME_PATTERN.sub(
+            lambda m: f"{m.group('var')}.{NAME_LOWER_PROPERTY} {m.group('op').upper()} {_lower_rhs(m.group('rhs'))}",
+            cypher_query
+        )
+    return NAME_LOWER_PATTERN.sub(
+        lambda m: f"toLower({m.group('var')}.name) {m.group('op').upper()} {_lower_rhs(m.group('rhs'))}",
+        cypher_query
+    )
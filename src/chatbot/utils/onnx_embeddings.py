@@ -0,0 +1,128 @@
+import json
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.config.logger import logger
+from chatbot.utils.profiling import lazy_import
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model_quantized.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+METADATA_FILE = "metadata.json"
+
+
+def onnx_model_path(model_dir, quantized=False):
+    return Path(model_dir) / (ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE)
+
+
+def write_model_metadata(model_dir, model_name):
+    """
+    Aktarılan modelin adını model dizinine yazar; OnnxEmbeddings yüklerken bununla karşılaştırır.
+    """
+    with open(Path(model_dir) / METADATA_FILE, "w", encoding="utf-8") as f:
+        json.dump({"model_name": model_name}, f, ensure_ascii=False, indent=2)
+
+
+def read_model_name(model_dir):
+    """
+    Model dizinine aktarım sırasında kaydedilen model adını döner, kayıt yoksa None.
+    """
+    path = Path(model_dir) / METADATA_FILE
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("model_name")
+
+
+def check_model_name(model_dir, model_name):
+    """
+    Dizindeki aktarılmış modelin istenen modelle aynı olduğunu doğrular. Farklı bir modelin
+    vektörleri mevcut indeksle karşılaştırılamayacağı için uyuşmazlıkta hata verilir.
+    """
+    recorded = read_model_name(model_dir)
+    if recorded is None:
+        logger.warning(f"ONNX model dizininde {METADATA_FILE} yok, model adı doğrulanamadı: {model_dir}")
+    elif recorded != model_name:
+        raise ValueError(
+            f"{model_dir} dizinindeki ONNX modeli {recorded} için aktarılmış, istenen model {model_name}. "
+            "scripts/export_onnx_embedder.py ile modeli yeniden aktarın veya EMBEDDING_ONNX_DIR'i değiştirin."
+        )
+
+
+def mean_pool(token_embeddings, attention_mask):
+    """
+    Token embedding'lerini attention mask ile ortalayıp L2 normalize eder (sentence-transformers ile aynı).
+    """
+    mask = attention_mask[:, :, None].astype(np.float32)
+    pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    sentence-transformers modelinin ONNX'e aktarılmış halini ONNX Runtime ile CPU'da çalıştıran
+    embedding modeli. Tokenizasyon `tokenizers` kütüphanesiyle yapılır, torch import edilmez.
+    Çıktılar sentence-transformers ile aynıdır: attention mask ile ortalama pooling ve L2 normalizasyon.
+    Model dizini scripts/export_onnx_embedder.py ile oluşturulur.
+    """
+
+    def __init__(self, model_dir, quantized=False, batch_size=32, max_length=256, threads=0, model_name=None):
+        """
+        Args:
+            model_dir: model.onnx (veya model_quantized.onnx) ve tokenizer.json dosyalarının bulunduğu dizin
+            quantized: int8 quantize edilmiş modelin kullanılıp kullanılmayacağı
+            batch_size: Tek çalıştırmada işlenecek metin sayısı
+            max_length: Token cinsinden en uzun girdi (all-MiniLM-L6-v2 için 256)
+            threads: ONNX Runtime intra-op thread sayısı (0: çekirdek sayısı kadar)
+            model_name: Beklenen HuggingFace model adı; verilirse aktarımda kaydedilen adla karşılaştırılır
+        """
+        if model_name is not None:
+            check_model_name(model_dir, model_name)
+
+        ort = lazy_import("onnxruntime")
+        Tokenizer = lazy_import("tokenizers").Tokenizer
+
+        model_path = onnx_model_path(model_dir, quantized)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"ONNX modeli bulunamadı: {model_path}. scripts/export_onnx_embedder.py ile oluşturulabilir."
+            )
+
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(str(Path(model_dir) / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _embed_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.asarray([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.asarray([encoding.type_ids for encoding in encodings], dtype=np.int64)
+
+        return mean_pool(self.session.run(None, feeds)[0], attention_mask)
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        # Benzer uzunluktaki metinler aynı batch'e düşsün diye sıralanır, padding azalır
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text):
+        return self._embed_batch([text])[0].tolist()
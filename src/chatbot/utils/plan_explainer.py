@@ -0,0 +1,51 @@
+# Cypher sorgularının EXPLAIN planını alan senkron sürücü sarmalayıcısı.
+# Neo4jGraph.query yalnızca satırları döndürür; plan ve sorgu tipi ResultSummary'de olduğundan
+# EXPLAIN, Neo4jGraph'ın özel sürücüsü yerine burada açılan sürücüyle çalıştırılır.
+import os
+import threading
+
+from chatbot.utils.profiling import lazy_import
+
+
+class PlanExplainer:
+    """
+    EXPLAIN sorgularını çalıştırıp sorgu özetini (plan, query_type) döner.
+    Sürücü ilk kullanımda açılır ve süreç genelinde paylaşılır (bkz. resources.get_plan_explainer).
+    """
+
+    def __init__(self, url=None, username=None, password=None, database=None):
+        """
+        Args:
+            url: Neo4j bağlantı adresi (belirtilmezse NEO4J_URI kullanılır)
+            username: Kullanıcı adı (belirtilmezse NEO4J_USERNAME kullanılır)
+            password: Şifre (belirtilmezse NEO4J_PASSWORD kullanılır)
+            database: Veritabanı adı (belirtilmezse NEO4J_DATABASE kullanılır)
+        """
+        self._url = url or os.getenv('NEO4J_URI')
+        self._auth = (username or os.getenv('NEO4J_USERNAME'), password or os.getenv('NEO4J_PASSWORD'))
+        self._database = database or os.getenv('NEO4J_DATABASE', 'neo4j')
+        self._driver = None
+        self._driver_lock = threading.Lock()
+
+    def _get_driver(self):
+        with self._driver_lock:
+            if self._driver is None:
+                self._driver = lazy_import("neo4j").GraphDatabase.driver(self._url, auth=self._auth)
+            return self._driver
+
+    def explain(self, cypher_query):
+        """
+        Sorguyu çalıştırmadan planlar ve sorgu özetini döner.
+        """
+        _, summary, _ = self._get_driver().execute_query(
+            f"EXPLAIN {cypher_query}",
+            database_=self._database,
+            routing_=lazy_import("neo4j").RoutingControl.READ,
+        )
+        return summary
+
+    def close(self):
+        with self._driver_lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            driver.close()
@@ -0,0 +1,92 @@
+import importlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from src.config.logger import logger
+
+
+class ColdStartProfile:
+    """
+    Soğuk başlangıç maliyetini ölçer: ağır bağımlılıkların import süreleri ile
+    her aşamanın (bağlantı kurulumu, ilk istek vb.) ilk çalışmasındaki süresi.
+    Yalnızca ilk ölçüm saklanır, sonraki çalışmalar rapora eklenmez.
+    """
+
+    def __init__(self):
+        self.imports = OrderedDict()
+        self.stages = OrderedDict()
+        self._lock = threading.Lock()
+        self._reported = False
+
+    def record_import(self, module_name, seconds):
+        with self._lock:
+            self.imports.setdefault(module_name, seconds)
+
+    def lazy_import(self, module_name):
+        """
+        Modülü ilk ihtiyaç anında import eder ve import süresini kaydeder.
+
+        Args:
+            module_name (str): Import edilecek modülün tam adı
+
+        Returns:
+            module: Import edilen modül
+        """
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        self.record_import(module_name, time.perf_counter() - started)
+        return module
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Bloğun süresini, aşama daha önce ölçülmediyse kaydeder.
+        "first_request" ile başlayan bir aşama ilk kez tamamlandığında rapor loglanır.
+        """
+        if name in self.stages:
+            yield
+            return
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stages.setdefault(name, time.perf_counter() - started)
+            if name.startswith("first_request"):
+                self.log_report()
+
+    def report(self):
+        """
+        Import ve ilk çalışma sürelerini saniye cinsinden döner.
+        """
+        with self._lock:
+            return {
+                "imports": dict(self.imports),
+                "stages": dict(self.stages),
+            }
+
+    def log_report(self):
+        """
+        Soğuk başlangıç raporunu bir kez loglar.
+        """
+        with self._lock:
+            if self._reported:
+                return
+            self._reported = True
+
+        report = self.report()
+        lines = [f"  import {name}: {seconds * 1000:.0f} ms" for name, seconds in report["imports"].items()]
+        lines += [f"  {name}: {seconds * 1000:.0f} ms" for name, seconds in report["stages"].items()]
+        logger.info("Soğuk başlangıç profili:\n" + "\n".join(lines))
+
+
+cold_start = ColdStartProfile()
+lazy_import = cold_start.lazy_import
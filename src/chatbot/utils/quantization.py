@@ -0,0 +1,154 @@
+import numpy as np
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(values):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT[values]
+
+
+class QuantizedMatrix:
+    """
+    Normalize edilmiş float32 embedding matrisinin aday aramasında kullanılan sıkıştırılmış kopyası.
+
+    int8: Her boyut, matristeki en büyük mutlak değerine göre [-127, 127] aralığına ölçeklenir
+          (chunk başına 4 kat daha az bellek). Skor, ölçekle çarpılmış sorgu ile iç çarpımdır.
+    binary: Her boyutun, matrisin boyut ortalamasına göre işareti bit olarak saklanır
+            (32 kat daha az bellek). Skor, sorgunun işaret bitleriyle Hamming uzaklığından
+            türetilir; daha kaba olduğu için int8'e göre daha yüksek oversample gerektirir.
+
+    Skorlar yalnızca adayları sıralamak içindir; kesin sıralama için adaylar float
+    vektörlerle yeniden puanlanmalıdır (bkz. rescore).
+    """
+
+    def __init__(self, matrix, mode="int8", block_size=4096):
+        """
+        Args:
+            matrix: (n, d) normalize float32 matris (memmap olabilir, bloklar halinde okunur)
+            mode: "int8" veya "binary"
+            block_size: Matris okunurken ve puanlanırken blok başına satır sayısı
+        """
+        if mode not in ("int8", "binary"):
+            raise ValueError(f"Geçersiz quantization modu: {mode}")
+        self.mode = mode
+        self.block_size = block_size
+        self.count, self.dimension = matrix.shape
+
+        if mode == "int8":
+            scale = np.zeros(self.dimension, dtype=np.float32)
+            for start in range(0, self.count, block_size):
+                block = np.asarray(matrix[start:start + block_size])
+                scale = np.maximum(scale, np.abs(block).max(axis=0))
+            scale[scale == 0] = 1.0
+            self.scale = scale / 127.0
+            self.codes = np.empty((self.count, self.dimension), dtype=np.int8)
+            for start in range(0, self.count, block_size):
+                block = np.asarray(matrix[start:start + block_size]) / self.scale
+                self.codes[start:start + block_size] = np.clip(np.rint(block), -127, 127)
+        else:
+            self.scale = None
+            # Embedding boyutları sıfır merkezli olmadığından işaret, boyut ortalamasına göre alınır
+            total = np.zeros(self.dimension, dtype=np.float64)
+            for start in range(0, self.count, block_size):
+                total += np.asarray(matrix[start:start + block_size]).sum(axis=0)
+            self.center = (total / max(self.count, 1)).astype(np.float32)
+            self.codes = np.empty((self.count, (self.dimension + 7) // 8), dtype=np.uint8)
+            for start in range(0, self.count, block_size):
+                block = np.asarray(matrix[start:start + block_size]) > self.center
+                self.codes[start:start + block_size] = np.packbits(block, axis=1)
+
+    @property
+    def nbytes(self):
+        extra = self.scale if self.mode == "int8" else self.center
+        return self.codes.nbytes + extra.nbytes
+
+    def scores(self, query):
+        """
+        Tüm satırlar için yaklaşık benzerlik skorlarını döner (büyük olan daha yakın).
+        """
+        if self.mode == "int8":
+            weighted = (query * self.scale).astype(np.float32)
+            result = np.empty(self.count, dtype=np.float32)
+            for start in range(0, self.count, self.block_size):
+                result[start:start + self.block_size] = self.codes[start:start + self.block_size] @ weighted
+            return result
+
+        bits = np.packbits(query > self.center)
+        result = np.empty(self.count, dtype=np.int32)
+        for start in range(0, self.count, self.block_size):
+            distances = _popcount(np.bitwise_xor(self.codes[start:start + self.block_size], bits))
+            result[start:start + self.block_size] = distances.sum(axis=1, dtype=np.int32)
+        return -result
+
+    def candidates(self, query, count):
+        """
+        Yaklaşık skoru en yüksek count satırın indekslerini artan sırada döner.
+        """
+        count = min(count, self.count)
+        scores = self.scores(query)
+        return np.sort(np.argpartition(-scores, count - 1)[:count])
+
+
+def rescore(matrix, rows, query, k):
+    """
+    Aday satırları float vektörlerle kesin olarak puanlar ve en yakın k tanesini döner.
+
+    Returns:
+        list: (satır indeksi, skor) çiftleri, skora göre azalan sırada
+    """
+    scores = np.asarray(matrix[rows]) @ query
+    k = min(k, len(rows))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return [(int(rows[i]), float(scores[i])) for i in top]
+
+
+def exact_top_k(matrix, query, k):
+    """
+    Float matris üzerinde kesin top-k satır indekslerini döner.
+    """
+    scores = np.asarray(matrix) @ query
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def recall_report(matrix, queries, k=5, oversample_factors=(1, 2, 4, 8, 16, 32), modes=("int8", "binary")):
+    """
+    Quantization modları ve oversample oranları için float aramaya göre recall@k ile
+    chunk başına bellek kullanımını karşılaştırır.
+
+    Args:
+        matrix: (n, d) normalize float32 embedding matrisi
+        queries: (m, d) normalize sorgu vektörleri
+        k: Döndürülen sonuç sayısı
+        oversample_factors: Float yeniden puanlamaya gönderilen aday sayısının k'ya oranları
+        modes: Karşılaştırılacak quantization modları
+
+    Returns:
+        list: mode, oversample, recall, bytes_per_chunk ve compression alanlı satırlar
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    float_bytes = matrix.shape[1] * 4
+    truth = [set(exact_top_k(matrix, query, k).tolist()) for query in queries]
+    rows = [{"mode": "none", "oversample": 1, "recall": 1.0, "bytes_per_chunk": float_bytes, "compression": 1.0}]
+
+    for mode in modes:
+        quantized = QuantizedMatrix(matrix, mode=mode)
+        bytes_per_chunk = quantized.codes.nbytes / max(quantized.count, 1)
+        for factor in oversample_factors:
+            hits = 0
+            for query, expected in zip(queries, truth):
+                candidates = quantized.candidates(query, k * factor)
+                found = {row for row, _ in rescore(matrix, candidates, query, k)}
+                hits += len(found & expected)
+            rows.append({
+                "mode": mode,
+                "oversample": factor,
+                "recall": hits / (len(queries) * k) if len(queries) else 0.0,
+                "bytes_per_chunk": bytes_per_chunk,
+                "compression": float_bytes / bytes_per_chunk,
+            })
+    return rows
@@ -0,0 +1,379 @@
+import asyncio
+import functools
+import hashlib
+import re
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_neo4j import Neo4jGraph
+
+from src.config.prompts import cypher_prompt, cypher_repair_prompt, condense_prompt, summary_prompt
+from src.config.sample_questions import SAMPLE_QUESTIONS
+from chatbot.utils.data_version import DATA_VERSION_QUERY
+from chatbot.utils.resources import set_resource, graph_key, async_graph_key, plan_explainer_key, llm_key
+from chatbot.utils.embeddings import set_embeddings_model
+from chatbot.utils.tracing import tracer
+
+ANSWER_WORDS = (
+    "makale", "yöntem", "model", "veri", "seti", "sonuç", "yazar", "graph", "ajan", "performans",
+    "deney", "görev", "bağlam", "çalışma", "öneriyor", "gösteriyor", "ile", "ve", "için", "bu",
+)
+
+REPLAY_CYPHER = (
+    "MATCH (a:Author)-[:AUTHORED]->(p:Paper) "
+    "WHERE p.name_lower CONTAINS 'agent' "
+    "RETURN p.name AS paper_name, p.abstract AS abstract, p.publication_date AS publication_date, "
+    "collect(a.name) AS authors LIMIT 10"
+)
+
+REPLAY_STRUCTURED_SCHEMA = {
+    "node_props": {
+        "Paper": [
+            {"property": "name", "type": "STRING"},
+            {"property": "name_lower", "type": "STRING"},
+            {"property": "abstract", "type": "STRING"},
+            {"property": "publication_date", "type": "STRING"},
+            {"property": "arxiv_link", "type": "STRING"},
+        ],
+        "Author": [
+            {"property": "name", "type": "STRING"},
+            {"property": "name_lower", "type": "STRING"},
+        ],
+        "Chunk": [
+            {"property": "id", "type": "STRING"},
+            {"property": "text", "type": "STRING"},
+            {"property": "order", "type": "INTEGER"},
+        ],
+    },
+    "rel_props": {},
+    "relationships": [
+        {"start": "Author", "type": "AUTHORED", "end": "Paper"},
+        {"start": "Paper", "type": "HAS_CHUNK", "end": "Chunk"},
+    ],
+    "metadata": {"constraint": [], "index": []},
+}
+
+
+def _template_pattern(prompt):
+    # Prompt şablonunun sabit kısımları aynen, değişkenleri grup olarak eşleşir
+    parts = re.split(r"\{(\w+)\}", prompt.template)
+    pattern = "".join(
+        re.escape(part) if i % 2 == 0 else f"(?P<{part}>.*?)"
+        for i, part in enumerate(parts)
+    )
+    return re.compile(pattern, re.DOTALL)
+
+
+@functools.lru_cache(maxsize=1)
+def _prompt_patterns():
+    return [
+        ("condense", _template_pattern(condense_prompt)),
+        ("cypher", _template_pattern(cypher_prompt)),
+        ("cypher_repair", _template_pattern(cypher_repair_prompt)),
+        ("summary", _template_pattern(summary_prompt)),
+    ]
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:4], "big")
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Canlı sağlayıcı yerine kullanılan deterministik chat modeli.
+    Prompt'un hangi şablondan üretildiğine göre Cypher, standalone soru, özet veya yanıt döner.
+    Gecikme, ilk token gecikmesi ve token başına gecikme ile modellenir; stream modunda
+    token'lar bu aralıklarla üretilir.
+    """
+
+    first_token_delay: float = 0.0
+    token_delay: float = 0.0
+    answer_tokens: int = 60
+    model_name: str = "replay"
+
+    @property
+    def _llm_type(self):
+        return "replay"
+
+    def _respond(self, messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        for kind, pattern in _prompt_patterns():
+            match = pattern.fullmatch(prompt)
+            if match is None:
+                continue
+            if kind == "condense":
+                return match.group("question").strip()
+            if kind in ("cypher", "cypher_repair"):
+                return REPLAY_CYPHER
+            if kind == "summary":
+                return self._words(prompt, 30)
+        return self._words(prompt, self.answer_tokens)
+
+    @staticmethod
+    def _words(prompt, count):
+        offset = _seed(prompt)
+        return " ".join(ANSWER_WORDS[(offset + i) % len(ANSWER_WORDS)] for i in range(count))
+
+    def _tokens(self, text):
+        return re.findall(r"\S+\s*", text)
+
+    def _usage(self, messages, text):
+        input_tokens = sum(len(str(message.content).split()) for message in messages)
+        output_tokens = len(self._tokens(text))
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        text = self._respond(messages)
+        time.sleep(self.first_token_delay + self.token_delay * len(self._tokens(text)))
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        text = self._respond(messages)
+        await asyncio.sleep(self.first_token_delay + self.token_delay * len(self._tokens(text)))
+        message = AIMessage(content=text, usage_metadata=self._usage(messages, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        text = self._respond(messages)
+        time.sleep(self.first_token_delay)
+        for token in self._tokens(text):
+            time.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        text = self._respond(messages)
+        await asyncio.sleep(self.first_token_delay)
+        for token in self._tokens(text):
+            await asyncio.sleep(self.token_delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class ReplayEmbeddings(Embeddings):
+    """
+    Metnin özetinden türetilen deterministik birim vektörler döner.
+    """
+
+    def __init__(self, dimension=384, delay=0.0):
+        self.dimension = dimension
+        self.delay = delay
+
+    def _vector(self, text):
+        rng = np.random.default_rng(_seed(text.strip()))
+        vector = rng.standard_normal(self.dimension).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_query(self, text):
+        time.sleep(self.delay)
+        return self._vector(text)
+
+    def embed_documents(self, texts):
+        time.sleep(self.delay * len(texts))
+        return [self._vector(text) for text in texts]
+
+
+class ReplayData:
+    """
+    Yerel graph karşılığının döndürdüğü sentetik makale, chunk ve embedding verileri.
+    """
+
+    def __init__(self, papers=200, chunks=2000, dimension=384, rows=10, version="replay"):
+        self.papers = papers
+        self.chunks = chunks
+        self.dimension = dimension
+        self.rows = rows
+        self.version = f"{version}-{papers}-{chunks}-{dimension}"
+        self._embeddings = None
+
+    def paper(self, i):
+        return {
+            "paper_name": f"Replay Paper {i}",
+            "abstract": f"Replay Paper {i} " + " ".join(ANSWER_WORDS),
+            "publication_date": f"2025-{i % 12 + 1:02d}-01",
+            "arxiv_link": f"https://arxiv.org/abs/2501.{i:05d}",
+            "authors": [f"Author {i}", f"Author {i + 1}"],
+        }
+
+    def embeddings(self):
+        if self._embeddings is None:
+            rng = np.random.default_rng(0)
+            matrix = rng.standard_normal((self.chunks, self.dimension)).astype(np.float32)
+            self._embeddings = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+        return self._embeddings
+
+    def chunk_id(self, i):
+        return f"chunk-{i:07d}"
+
+    def chunk_row(self, chunk_id):
+        i = int(chunk_id.rsplit("-", 1)[1])
+        paper = self.paper(i % self.papers)
+        return {
+            "id": chunk_id,
+            "text": f"{paper['paper_name']} bölüm {i}: " + " ".join(ANSWER_WORDS),
+            "metadata": {"id": chunk_id, "order": i, **paper, "github_links": []},
+        }
+
+    def query(self, query, params):
+        if query == DATA_VERSION_QUERY:
+            return [{"version": self.version}]
+        if "c.embedding AS embedding" in query:
+            matrix = self.embeddings()
+            skip, limit = params["skip"], params["limit"]
+            return [
+                {"id": self.chunk_id(i), "embedding": matrix[i].tolist(), "paper_id": f"paper-{i % self.papers}"}
+                for i in range(skip, min(skip + limit, self.chunks))
+            ]
+        if "$chunk_ids" in query:
+            return [self.chunk_row(chunk_id) for chunk_id in params["chunk_ids"]]
+        return [self.paper(i) for i in range(self.rows)]
+
+
+def _explain_summary():
+    return SimpleNamespace(query_type="r", plan={"args": {"EstimatedRows": 10.0}, "children": []})
+
+
+class _ReplayDriver:
+    def __init__(self, delay):
+        self.delay = delay
+
+    def execute_query(self, query, *args, **kwargs):
+        time.sleep(self.delay)
+        return [], _explain_summary(), []
+
+
+class ReplayGraph(Neo4jGraph):
+    """
+    Neo4jGraph'ın yerel karşılığı. Sorgular sabit gecikmeyle sentetik verilerden yanıtlanır.
+    """
+
+    def __init__(self, data, query_delay=0.0):
+        self.data = data
+        self.query_delay = query_delay
+        self.schema = ""
+        self.structured_schema = {}
+        self.timeout = None
+        self._enhanced_schema = False
+        # Neo4jVector.from_existing_graph, graph'ın sürücüsünü ve veritabanı adını kullanır
+        self._database = "neo4j"
+        self._driver = _ReplayDriver(query_delay)
+
+    def refresh_schema(self):
+        self.structured_schema = {key: dict(value) if isinstance(value, dict) else list(value)
+                                  for key, value in REPLAY_STRUCTURED_SCHEMA.items()}
+
+    def query(self, query, params=None):
+        time.sleep(self.query_delay)
+        return self.data.query(query, params or {})
+
+
+class AsyncReplayGraph:
+    """
+    AsyncNeo4jGraph'ın yerel karşılığı.
+    """
+
+    def __init__(self, data, query_delay=0.0):
+        self.data = data
+        self.timeout = None
+        self.query_delay = query_delay
+
+    async def aquery(self, query, params=None):
+        await asyncio.sleep(self.query_delay)
+        return self.data.query(query, params or {})
+
+    async def aexplain(self, query):
+        await asyncio.sleep(self.query_delay)
+        return _explain_summary()
+
+
+class ReplayPlanExplainer:
+    """
+    PlanExplainer'ın yerel karşılığı. Her sorgu için küçük, salt okunur bir plan döner.
+    """
+
+    def __init__(self, query_delay=0.0):
+        self.query_delay = query_delay
+
+    def explain(self, query):
+        time.sleep(self.query_delay)
+        return _explain_summary()
+
+
+def install_replay_resources(llm_provider, model_name, temperature, data=None, query_delay=0.0,
+                             first_token_delay=0.0, token_delay=0.0, answer_tokens=60, embedding_delay=0.0):
+    """
+    Paylaşılan kaynak kaydına canlı servisler yerine yerel karşılıkları yerleştirir.
+    Sonrasında oluşturulan AIMLChatbot'lar bu graph, LLM ve embedding modelini kullanır.
+
+    Returns:
+        ReplayData: Kullanılan sentetik veri
+    """
+    data = data or ReplayData()
+    set_resource(graph_key(), ReplayGraph(data, query_delay=query_delay))
+    set_resource(async_graph_key(), AsyncReplayGraph(data, query_delay=query_delay))
+    set_resource(plan_explainer_key(), ReplayPlanExplainer(query_delay=query_delay))
+    set_resource(llm_key(llm_provider, model_name, temperature), ReplayChatModel(
+        model_name=model_name,
+        first_token_delay=first_token_delay,
+        token_delay=token_delay,
+        answer_tokens=answer_tokens,
+    ))
+    set_embeddings_model(ReplayEmbeddings(dimension=data.dimension, delay=embedding_delay))
+    return data
+
+
+def _ask(chatbot, question, api):
+    if api == "async":
+        return asyncio.run(chatbot.aget_response(question))
+    if api == "stream":
+        response = None
+        for event in chatbot.stream_response(question):
+            if event["type"] == "response":
+                response = event["response"]
+        return response
+    return chatbot.get_response(question)
+
+
+def replay(search_types, llm_provider, model_name, temperature=0.1, questions=None, repeats=1, warmup=1, api="sync"):
+    """
+    Soru setini her arama tipi için sırayla AIMLChatbot üzerinden tekrar oynatır ve
+    aşama bazında gecikme yüzdeliklerini döner. Her soru temiz bir sohbet belleğiyle sorulur.
+
+    Args:
+        search_types: Ölçülecek arama tipleri
+        questions: Arama tipine göre soru listesi (belirtilmezse SAMPLE_QUESTIONS)
+        repeats: Soru setinin kaç kez tekrarlanacağı
+        warmup: Ölçüme dahil edilmeyen ısınma sorusu sayısı
+        api: "sync" (get_response), "async" (aget_response) veya "stream" (stream_response)
+
+    Returns:
+        dict: {arama tipi: {aşama: {count, p50_ms, p95_ms, p99_ms, max_ms}}}
+    """
+    from chatbot.core.chatbot import AIMLChatbot
+
+    questions = questions or SAMPLE_QUESTIONS
+    report = {}
+    for search_type in search_types:
+        chatbot = AIMLChatbot(llm_provider=llm_provider, model_name=model_name,
+                              temperature=temperature, search_type=search_type)
+        mode_questions = questions.get(search_type) or [q for qs in questions.values() for q in qs]
+
+        for question in mode_questions[:warmup]:
+            chatbot.memory.clear()
+            _ask(chatbot, question, api)
+
+        tracer.clear()
+        failures = 0
+        for _ in range(repeats):
+            for question in mode_questions:
+                chatbot.memory.clear()
+                response = _ask(chatbot, question, api)
+                if not response or not response.get("success"):
+                    failures += 1
+        report[search_type] = tracer.stats()
+        report[search_type].setdefault("request", {})["failures"] = failures
+    return report
@@ -0,0 +1,207 @@
+import os
+import threading
+
+from src.config.settings import CYPHER_QUERY_TIMEOUT, LLM_HEDGE_PROVIDER, LLM_HEDGE_MODEL, LLM_HEDGE_AFTER
+from chatbot.utils.profiling import lazy_import
+from chatbot.utils.hedging import HedgedChatModel
+from chatbot.utils.llm_scheduler import ScheduledChatModel
+from chatbot.utils.schema_snapshot import ensure_schema
+from src.config.logger import logger
+
+_resources = {}
+_resources_lock = threading.RLock()
+
+
+def get_resource(key, factory):
+    """
+    Anahtara karşılık gelen paylaşılan kaynağı döner, yoksa factory ile bir kez oluşturur.
+    Streamlit oturumları aynı süreçte çalıştığı için kaynaklar tüm oturumlarca paylaşılır.
+    Oluşturma sırasında hata alınırsa kaynak kaydedilmez, sonraki çağrıda tekrar denenir.
+
+    Args:
+        key: Kaynağı tanımlayan hashable anahtar
+        factory: Kaynağı oluşturan parametresiz fonksiyon
+
+    Returns:
+        Paylaşılan kaynak
+    """
+    with _resources_lock:
+        if key not in _resources:
+            logger.info(f"Paylaşılan kaynak oluşturuluyor: {key}")
+            _resources[key] = factory()
+        return _resources[key]
+
+
+def get_versioned_resource(key, version, factory):
+    """
+    Veri veya şema sürümüne bağlı paylaşılan kaynağı döner. Kaynak (key, version) anahtarıyla
+    saklanır; yeni bir sürüm için kaynak oluşturulduğunda aynı key'in eski sürümleri kayıttan
+    silinir, böylece her yüklemede biriken eski zincirler bellekte kalmaz.
+
+    Args:
+        key: Kaynağı sürümden bağımsız olarak tanımlayan tuple anahtar
+        version: Kaynağın bağlı olduğu sürüm
+        factory: Kaynağı oluşturan parametresiz fonksiyon
+
+    Returns:
+        Paylaşılan kaynak
+    """
+    with _resources_lock:
+        versioned_key = key + (version,)
+        if versioned_key not in _resources:
+            resource = get_resource(versioned_key, factory)
+            stale = [other for other in _resources
+                     if isinstance(other, tuple) and other[:-1] == key and other != versioned_key]
+            for other in stale:
+                logger.info(f"Eski sürüme ait paylaşılan kaynak bırakılıyor: {other}")
+                del _resources[other]
+            return resource
+        return _resources[versioned_key]
+
+
+def set_resource(key, resource):
+    """
+    Anahtara karşılık gelen paylaşılan kaynağı verilen nesneyle değiştirir.
+    Canlı servisler yerine yerel karşılıkların kullanıldığı benchmark gibi ortamlar içindir.
+    """
+    with _resources_lock:
+        _resources[key] = resource
+
+
+def _neo4j_config():
+    return (
+        os.getenv('NEO4J_URI'),
+        os.getenv('NEO4J_USERNAME'),
+        os.getenv('NEO4J_PASSWORD'),
+        os.getenv('NEO4J_DATABASE', 'neo4j'),
+    )
+
+
+def graph_key():
+    url, username, _, database = _neo4j_config()
+    return ("neo4j_graph", url, username, database)
+
+
+def async_graph_key():
+    url, username, _, database = _neo4j_config()
+    return ("async_neo4j_graph", url, username, database)
+
+
+def plan_explainer_key():
+    url, username, _, database = _neo4j_config()
+    return ("plan_explainer", url, username, database)
+
+
+def llm_key(llm_provider, model_name, temperature):
+    return ("llm", llm_provider, model_name, temperature)
+
+
+def get_graph():
+    """
+    Süreç genelinde paylaşılan Neo4jGraph bağlantısını döner.
+    Tüm oturumlar aynı sürücüyü ve bağlantı havuzunu kullanır.
+    Şema introspection yapılmaz, şema veri sürümüne bağlı snapshot'tan yüklenir.
+    """
+    url, username, password, database = _neo4j_config()
+
+    def create():
+        Neo4jGraph = lazy_import("langchain_neo4j").Neo4jGraph
+        graph = Neo4jGraph(url=url, username=username, password=password, database=database,
+                           timeout=CYPHER_QUERY_TIMEOUT, refresh_schema=False)
+        ensure_schema(graph)
+        return graph
+
+    return get_resource(graph_key(), create)
+
+
+def get_async_graph():
+    """
+    Süreç genelinde paylaşılan AsyncNeo4jGraph bağlantısını döner.
+    Nesne paylaşılır, async sürücü ise her event loop için ayrı açılır (bkz. AsyncNeo4jGraph).
+    """
+    url, username, password, database = _neo4j_config()
+
+    def create():
+        AsyncNeo4jGraph = lazy_import("chatbot.utils.async_graph").AsyncNeo4jGraph
+        return AsyncNeo4jGraph(url=url, username=username, password=password, database=database,
+                               timeout=CYPHER_QUERY_TIMEOUT)
+
+    return get_resource(async_graph_key(), create)
+
+
+def get_plan_explainer():
+    """
+    Süreç genelinde paylaşılan PlanExplainer'ı döner. CypherGuard senkron EXPLAIN'leri bununla çalıştırır.
+    """
+    url, username, password, database = _neo4j_config()
+
+    def create():
+        PlanExplainer = lazy_import("chatbot.utils.plan_explainer").PlanExplainer
+        return PlanExplainer(url=url, username=username, password=password, database=database)
+
+    return get_resource(plan_explainer_key(), create)
+
+
+def _create_client(llm_provider, model_name, temperature):
+    # 429 sonrası yeniden denemeyi ScheduledChatModel kotayı boşaltarak yapar; istemcilerin
+    # kendi yeniden denemeleri kapatılır, aksi halde zamanlayıcı 429'ları hiç görmez
+    if llm_provider == "Groq" and os.getenv('GROQ_API_KEY'):
+        ChatGroq = lazy_import("langchain_groq").ChatGroq
+        return ChatGroq(
+            api_key=os.getenv('GROQ_API_KEY'),
+            model=model_name,
+            temperature=temperature,
+            max_tokens=4000,
+            max_retries=0
+        )
+    elif llm_provider == "OpenAI" and os.getenv('OPENAI_API_KEY'):
+        ChatOpenAI = lazy_import("langchain_openai").ChatOpenAI
+        return ChatOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            model=model_name,
+            temperature=temperature,
+            max_tokens=3000,
+            max_retries=0
+        )
+    raise ValueError("Geçerli API anahtarı bulunamadı.")
+
+
+def _create_llm(llm_provider, model_name, temperature):
+    # Tüm çağrılar sağlayıcı/model kotalarını uygulayan paylaşılan zamanlayıcıdan geçer
+    client = _create_client(llm_provider, model_name, temperature)
+    return ScheduledChatModel(llm=client, provider=llm_provider, model_name=model_name)
+
+
+def _create_hedged_llm(llm_provider, model_name, temperature):
+    primary = _create_llm(llm_provider, model_name, temperature)
+    hedge_provider = LLM_HEDGE_PROVIDER or llm_provider
+    if not LLM_HEDGE_MODEL or (hedge_provider, LLM_HEDGE_MODEL) == (llm_provider, model_name):
+        return primary
+
+    try:
+        secondary = _create_llm(hedge_provider, LLM_HEDGE_MODEL, temperature)
+    except ValueError as e:
+        logger.warning(f"Hedge modeli oluşturulamadı, yalnızca birincil model kullanılacak: {e}")
+        return primary
+    return HedgedChatModel(primary=primary, secondary=secondary, hedge_after=LLM_HEDGE_AFTER)
+
+
+def get_llm(llm_provider, model_name, temperature):
+    """
+    Sağlayıcı, model ve temperature kombinasyonu başına tek bir LLM istemcisi döner.
+    LLM_HEDGE_MODEL tanımlıysa istemci, yavaş veya hatalı yanıtlarda ikincil modele
+    başvuran HedgedChatModel ile sarmalanır. Birincil ve ikincil modellerin çağrıları
+    kendi kotaları üzerinden llm_scheduler ile sıraya alınır.
+    """
+    return get_resource(
+        llm_key(llm_provider, model_name, temperature),
+        lambda: _create_hedged_llm(llm_provider, model_name, temperature)
+    )
+
+
+def resource_keys():
+    """
+    Oluşturulmuş paylaşılan kaynakların anahtarlarını döner.
+    """
+    with _resources_lock:
+        return list(_resources)
@@ -0,0 +1,89 @@
+import json
+import threading
+
+from src.config.settings import SCHEMA_CACHE_DIR
+from src.config.logger import logger
+from chatbot.utils.data_version import data_version_tracker
+from chatbot.utils.profiling import lazy_import
+
+# Uygulamanın iç kullanımındaki düğümler, LLM'e gösterilen şemaya dahil edilmez
+EXCLUDED_LABELS = ["DataVersion"]
+
+
+class SchemaSnapshot:
+    """
+    Graph şemasını, yükleyicinin yazdığı veri sürümüne göre bellekte ve diskte saklar.
+    Sürüm değişmediği sürece şema introspection sorguları tekrar çalıştırılmaz.
+    """
+
+    def __init__(self, cache_dir=SCHEMA_CACHE_DIR):
+        """
+        Args:
+            cache_dir: Şema snapshot dosyalarının saklanacağı dizin
+        """
+        self.cache_dir = cache_dir
+        self.version = None
+        self.snapshot = None
+        self._lock = threading.Lock()
+
+    def _path(self, version):
+        return self.cache_dir / f"schema_{version}.json"
+
+    def _introspect(self, graph):
+        format_schema = lazy_import("langchain_neo4j.graphs.neo4j_graph").format_schema
+        # Şema sorguları, sohbet sorgularına uygulanan zaman aşımından muaf tutulur
+        timeout, graph.timeout = graph.timeout, None
+        try:
+            graph.refresh_schema()
+        finally:
+            graph.timeout = timeout
+        structured_schema = graph.structured_schema
+        for label in EXCLUDED_LABELS:
+            structured_schema.get("node_props", {}).pop(label, None)
+        return {
+            "schema": format_schema(structured_schema, graph._enhanced_schema),
+            "structured_schema": structured_schema,
+        }
+
+    def _load(self, graph, version):
+        path = self._path(version)
+        if version is not None and path.exists():
+            logger.info(f"Graph şeması diskten yükleniyor: {path}")
+            return json.loads(path.read_text(encoding="utf-8"))
+
+        logger.info(f"Graph şeması oluşturuluyor (veri sürümü: {version})")
+        snapshot = self._introspect(graph)
+        if version is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(snapshot, ensure_ascii=False, default=str), encoding="utf-8")
+        return snapshot
+
+    def apply(self, graph):
+        """
+        Güncel veri sürümüne ait şemayı graph nesnesine uygular.
+        Snapshot yalnızca sürüm değiştiğinde yeniden okunur veya oluşturulur.
+
+        Args:
+            graph: Neo4jGraph bağlantısı
+
+        Returns:
+            str | None: Şemanın ait olduğu veri sürümü
+        """
+        version = data_version_tracker.current(graph)
+        with self._lock:
+            if self.snapshot is None or version != self.version:
+                self.snapshot = self._load(graph, version)
+                self.version = version
+            graph.schema = self.snapshot["schema"]
+            graph.structured_schema = self.snapshot["structured_schema"]
+            return self.version
+
+
+schema_snapshot = SchemaSnapshot()
+
+
+def ensure_schema(graph):
+    """
+    Paylaşılan şema snapshot'ını graph'a uygular ve veri sürümünü döner.
+    """
+    return schema_snapshot.apply(graph)
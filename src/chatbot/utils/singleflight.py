@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from src.config.settings import SINGLE_FLIGHT_ENABLED
+
+
+class SingleFlight:
+    """
+    Aynı anahtarla eşzamanlı gelen işleri birleştirir: anahtar için çalışan bir iş varsa
+    yeni çağrılar onu bekler ve aynı sonucu paylaşır, iş yalnızca bir kez çalıştırılır.
+    Bekleyen sonuçlar thread'ler ve event loop'lar arasında paylaşılabilsin diye
+    concurrent.futures.Future kullanılır; sync, async ve stream çağrıları aynı işi bekleyebilir.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def begin(self, key):
+        """
+        Anahtar için işi başlatır veya çalışan işe katılır.
+
+        Returns:
+            tuple: (Future, lider mi). Lider işi çalıştırıp finish ile sonucu bildirmelidir.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.executions += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        """
+        Liderin sonucunu (veya hatasını) bekleyenlere iletir ve anahtarı serbest bırakır.
+        """
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            if not isinstance(error, Exception):
+                # Liderin iptali (CancelledError, GeneratorExit) bekleyenlere sıradan bir hata olarak iletilir
+                error = RuntimeError(f"Birleştirilen istek tamamlanamadı: {type(error).__name__}")
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """
+        fn'i anahtar başına bir kez çalıştırır; eşzamanlı çağrılar aynı sonucu alır.
+
+        Returns:
+            tuple: (sonuç, birleştirildi mi)
+        """
+        if not self.enabled:
+            return fn(), False
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result, False
+
+    async def ado(self, key, coroutine_fn):
+        """
+        do metodunun async versiyonu. Bekleyen çağrılar event loop'u bloklamaz.
+        """
+        if not self.enabled:
+            return await coroutine_fn(), False
+        future, leader = self.begin(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            result = await coroutine_fn()
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result, False
+
+    def stats(self):
+        """
+        Çalıştırılan ve birleştirilen iş sayılarını döner.
+        """
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+# Aynı standalone soru için oturumlar arasında eşzamanlı zincir çalıştırmalarını birleştirir
+request_coalescer = SingleFlight(enabled=SINGLE_FLIGHT_ENABLED)
@@ -0,0 +1,242 @@
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from src.config.settings import TRACE_ENABLED, TRACE_EXPORT_PATH, TRACE_RECENT_MAX_SPANS, LOG_PAYLOAD_SAMPLE_RATE
+from src.config.logger import logger, payload_logging
+
+_current_trace = ContextVar("current_trace", default=None)
+
+
+class Span:
+    """
+    Bir istek aşamasının süresi ve özellikleri (token sayısı, satır sayısı vb.).
+    """
+
+    __slots__ = ("name", "attributes", "started_at", "duration_ms")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.started_at = time.time()
+        self.duration_ms = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_tokens(self, prompt=None, response=None):
+        """
+        LLM çağrısının token sayılarını kaydeder. Yanıtta sağlayıcının kullanım bilgisi
+        (usage_metadata) varsa o, yoksa tokenizer ile yapılan tahmin kullanılır.
+
+        Args:
+            prompt: LLM'e gönderilen metin
+            response: LLM yanıtı (mesaj nesnesi veya metin)
+        """
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            self.set(input_tokens=usage.get("input_tokens"), output_tokens=usage.get("output_tokens"))
+            return
+
+        from chatbot.utils.context_builder import get_tokenizer
+        tokenizer = get_tokenizer()
+        if prompt is not None:
+            self.set(input_tokens=len(tokenizer.encode(str(prompt))))
+        if response is not None:
+            text = getattr(response, "content", response)
+            self.set(output_tokens=len(tokenizer.encode(str(text))))
+
+    def to_dict(self, trace_id=None):
+        return {
+            "trace_id": trace_id,
+            "name": self.name,
+            "timestamp": self.started_at,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            **self.attributes,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attributes):
+        pass
+
+    def record_tokens(self, prompt=None, response=None):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _reset(var, token):
+    # Yarıda bırakılan stream generator'ları farklı bir context'te kapatılabilir
+    try:
+        var.reset(token)
+    except ValueError:
+        pass
+
+
+class Trace:
+    """
+    Tek bir isteğe ait span'ler. İstek içinde açılan span'ler context üzerinden bu izlere eklenir.
+    """
+
+    def __init__(self, name, attributes):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.root = Span(name, attributes)
+        self.spans = []
+
+
+class Tracer:
+    """
+    İstek aşamalarının (soru yeniden yazma, Cypher üretimi, graph sorgusu, retrieval,
+    zenginleştirme, yanıt) sürelerini span olarak ölçer. Son span'ler bellekte tutulur
+    ve aşama bazında yüzdelik istatistik verir; dışa aktarma yolu tanımlıysa her istek
+    tamamlandığında span'leri JSON lines olarak dosyaya ekler.
+    Prompt ve yanıt içerikleri yalnızca payload_sample_rate oranında örneklenen
+    isteklerde loglanır.
+    """
+
+    def __init__(self, enabled=TRACE_ENABLED, export_path=TRACE_EXPORT_PATH,
+                 max_recent=TRACE_RECENT_MAX_SPANS, payload_sample_rate=LOG_PAYLOAD_SAMPLE_RATE):
+        """
+        Args:
+            enabled: Span ölçümü açık mı
+            export_path: Span'lerin JSON lines olarak yazılacağı dosya (boşsa yazılmaz)
+            max_recent: İstatistik için bellekte tutulacak en fazla span sayısı
+            payload_sample_rate: İçerik loglaması yapılacak isteklerin oranı (0-1)
+        """
+        self.enabled = enabled
+        self.export_path = Path(export_path) if export_path else None
+        self.payload_sample_rate = payload_sample_rate
+        self._recent = deque(maxlen=max_recent)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, name, **attributes):
+        """
+        Bir isteği kapsayan kök span'i açar. İçerik loglaması kararı istek başında bir kez verilir.
+        """
+        sampled = self.payload_sample_rate > 0 and random.random() < self.payload_sample_rate
+        if not self.enabled:
+            payload_token = payload_logging.set(sampled)
+            try:
+                yield _NOOP_SPAN
+            finally:
+                _reset(payload_logging, payload_token)
+            return
+
+        trace = Trace(name, attributes)
+        trace_token = _current_trace.set(trace)
+        payload_token = payload_logging.set(sampled)
+        started = time.perf_counter()
+        try:
+            yield trace.root
+        except BaseException as e:
+            trace.root.set(error=type(e).__name__)
+            raise
+        finally:
+            trace.root.duration_ms = (time.perf_counter() - started) * 1000
+            _reset(payload_logging, payload_token)
+            _reset(_current_trace, trace_token)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Bir aşamanın süresini ölçer. Açık bir istek varsa span o isteğe, yoksa tek başına kaydedilir.
+
+        Örnek:
+            with tracer.span("graph_query") as span:
+                rows = graph.query(cypher)
+                span.set(rows=len(rows))
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        span = Span(name, attributes)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - started) * 1000
+            trace = _current_trace.get()
+            if trace is not None:
+                trace.spans.append(span)
+            else:
+                self._record([span.to_dict()])
+
+    def _finish(self, trace):
+        records = [trace.root.to_dict(trace.trace_id)]
+        records.extend(span.to_dict(trace.trace_id) for span in trace.spans)
+        self._record(records)
+
+        stages = ", ".join(f"{span.name}={span.duration_ms:.0f}ms" for span in trace.spans)
+        logger.info(f"{trace.root.name} {trace.root.duration_ms:.0f}ms [{stages}]")
+
+    def _record(self, records):
+        with self._lock:
+            self._recent.extend(records)
+            if self.export_path is None:
+                return
+            try:
+                self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.export_path, "a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in records)
+            except OSError as e:
+                logger.warning(f"Span'ler dışa aktarılamadı: {e}")
+
+    def recent(self):
+        """
+        Bellekte tutulan son span kayıtlarını döner.
+        """
+        with self._lock:
+            return list(self._recent)
+
+    def stats(self):
+        """
+        Son span'lerden aşama adı başına sayı ve p50/p95/p99 süreleri (ms) döner.
+        """
+        durations = {}
+        for record in self.recent():
+            if record["duration_ms"] is not None:
+                durations.setdefault(record["name"], []).append(record["duration_ms"])
+        return {name: summarize_durations(values) for name, values in durations.items()}
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+
+
+def percentile(sorted_values, q):
+    """
+    Sıralı listede en yakın sıra yöntemiyle q yüzdeliğini döner.
+    """
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize_durations(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50),
+        "p95_ms": percentile(values, 95),
+        "p99_ms": percentile(values, 99),
+        "max_ms": values[-1] if values else None,
+    }
+
+
+tracer = Tracer()
@@ -1,15 +1,31 @@
 import logging
-from langchain.callbacks.base import BaseCallbackHandler
+from contextvars import ContextVar
+from langchain_core.callbacks import BaseCallbackHandler
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# İstek bazında örneklenen içerik (prompt, sonuç) loglama kararı; tracing tarafından ayarlanır
+payload_logging = ContextVar("payload_logging", default=False)
+
+
+def log_payload(message):
+    """
+    Prompt, Cypher ve yanıt gibi büyük içerikleri yalnızca içerik loglaması
+    örneklenmiş isteklerde INFO seviyesinde loglar.
+    """
+    if payload_logging.get():
+        logger.info(message)
+
+
 class ChainLoggerCallbacks(BaseCallbackHandler):
     def on_chain_start(self, serialized, inputs, **kwargs):
-        logger.info(f"CHAIN BAŞLADI: {serialized}")
-        logger.info(f"CHAIN GİRDİLERİ: {inputs}")
+        if payload_logging.get():
+            logger.info(f"CHAIN BAŞLADI: {serialized}")
+            logger.info(f"CHAIN GİRDİLERİ: {inputs}")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"CHAIN BAŞLADI: {kwargs.get('name') or (serialized or {}).get('name')}")
 
     def on_chain_end(self, outputs, **kwargs):
-        logger.info(f"CHAIN BİTTİ: {outputs}")
-
-
+        if payload_logging.get():
+            logger.info(f"CHAIN BİTTİ: {outputs}")
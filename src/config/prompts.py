@@ -1,4 +1,4 @@
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 
 cypher_prompt = PromptTemplate(
     input_variables=["schema", "question"],
@@ -16,8 +16,10 @@ cypher_prompt = PromptTemplate(
                    - Node'lar için: (n:NodeType)
                    - İlişkiler için: (n1:NodeType1)-[:RELATIONSHIP_TYPE]->(n2:NodeType2)
                    - Örnek: MATCH (a:Author)-[:AUTHORED]->(p:Paper)
-                3. WHERE clause'larında case-insensitive arama için toLower() kullan
-                4. Name alanlarında arama yaparken mutlaka CONTAINS kullan (örn: WHERE toLower(node.name) CONTAINS 'aranan')
+                3. İsim aramalarında indeksli küçük harfli name_lower alanını ve küçük harfli değer kullan, toLower(node.name) yazma
+                4. Name alanlarında arama yaparken mutlaka CONTAINS kullan (örn: WHERE node.name_lower CONTAINS 'aranan')
+                   - Birden fazla kelimeyle serbest isim araması için full-text index kullanabilirsin:
+                     CALL db.index.fulltext.queryNodes('entity_names', 'aranan kelimeler') YIELD node, score
                 5. Tarih karşılaştırmaları için date() fonksiyonu kullan
                 6. Sayısal değerler için toInteger() veya toFloat() kullan
                 7. LIMIT clause ekleyerek sonuçları sınırla
@@ -29,26 +31,26 @@ cypher_prompt = PromptTemplate(
                 
                 Soru: "Transformer yöntemi kullanan makaleler neler?"
                 Cypher: MATCH (p:Paper)-[:USES_METHOD]->(m:Method)
-                        WHERE toLower(m.name) CONTAINS 'transformer'
+                        WHERE m.name_lower CONTAINS 'transformer'
                         RETURN p.name, p.publication_date, p.arxiv_link, p.pwc_link
                         ORDER BY p.star DESC LIMIT 10
                 
                 Soru: "John Smith'in yazdığı makaleler hangileri?"
                 Cypher: MATCH (a:Author)-[:AUTHORED]->(p:Paper)
-                        WHERE toLower(a.name) CONTAINS 'john smith'
+                        WHERE a.name_lower CONTAINS 'john smith'
                         RETURN p.name, p.publication_date, p.arxiv_link, p.abstract
                         ORDER BY p.publication_date DESC LIMIT 10
                 
                 Soru: "MNIST veri setini kullanan makaleler?"
                 Cypher: MATCH (p:Paper)-[:USES_DATASET]->(d:Dataset)
-                        WHERE toLower(d.name) CONTAINS 'mnist'
+                        WHERE d.name_lower CONTAINS 'mnist'
                         RETURN p.name, p.publication_date, p.arxiv_link,
                         d.name as dataset_name, d.link as dataset_link
                         ORDER BY p.star DESC LIMIT 5
                 
                 Soru: "Image Classification görevi üzerinde çalışan makaleler?"
                 Cypher: MATCH (p:Paper)-[:ADDRESSES_TASK]->(t:Task)
-                        WHERE toLower(t.name) CONTAINS 'image classification'
+                        WHERE t.name_lower CONTAINS 'image classification'
                         RETURN p.name, p.publication_date, p.arxiv_link,
                         t.name as task_name, t.link as task_link
                         ORDER BY p.star DESC LIMIT 5
@@ -134,3 +136,50 @@ condense_prompt = PromptTemplate(
                 Soru:
                 """,
 )
+
+summary_prompt = PromptTemplate(
+    input_variables=["summary", "new_lines"],
+    template="""
+                Bir araştırma asistanı ile kullanıcı arasındaki sohbetin özetini güncelliyorsun.
+                Mevcut özete yeni konuşma satırlarını ekleyerek kısa ve yoğun yeni bir özet yaz.
+
+                Kurallar:
+                1. Bahsi geçen makale, yazar, yöntem, veri seti ve görev adlarını mutlaka koru.
+                2. Yanıtlardaki tablo ve link detaylarını özetleme, sadece hangi konuların konuşulduğunu yaz.
+                3. Özet en fazla birkaç cümle olsun. Açıklama yapma, sadece özeti yaz.
+
+                Mevcut Özet:
+                {summary}
+
+                Yeni Konuşma Satırları:
+                {new_lines}
+
+                Yeni Özet:
+                """,
+)
+
+cypher_repair_prompt = PromptTemplate(
+    input_variables=["schema", "query", "reason"],
+    template="""
+                Sen bir Neo4j Cypher uzmanısın. Aşağıdaki sorgu güvenlik/maliyet kontrolünden geçemedi.
+                Sorguyu aynı bilgiyi döndürecek şekilde yeniden yaz.
+
+                Kurallar:
+                1. Sadece okuma yapan sorgu yaz (CREATE, MERGE, SET, DELETE, REMOVE, DROP kullanma).
+                2. Birbirine bağlı olmayan MATCH kalıpları kullanma (kartezyen çarpım oluşturma).
+                3. Değişken uzunluklu ilişkilerde mutlaka üst sınır ver (ör. *1..3).
+                4. Sorgunun sonunda mutlaka LIMIT kullan.
+                5. Sadece şemadaki node, ilişki ve property'leri kullan.
+
+                Şema:
+                {schema}
+
+                Sorgu:
+                {query}
+
+                Reddedilme Nedeni:
+                {reason}
+
+                Sadece düzeltilmiş Cypher query'sini döndür, başka açıklama yapma:
+                """,
+)
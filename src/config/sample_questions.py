@@ -0,0 +1,23 @@
+# Arayüzde gösterilen ve benchmark'ta tekrar oynatılan arama tipine göre örnek sorular
+SAMPLE_QUESTIONS = {
+    "Normal": [
+        "AutoAgent makalesinin yazarları kimlerdir?",
+        "DocETL makalesiyle ilişkili kod depoları hangileridir?",
+        "Jiabin Tang'ın yazdığı tüm makaleleri listeler misin?",
+        "MoonCast makalesinde hangi veri setleri kullanılmış?",
+        "WebDancer makalesinin özetini verir misin?",
+        "SoloSpeech makalesinin yayın tarihi nedir?",
+        "Reservoir-enhanced Segment Anything Model makalesinin arXiv ve Papers With Code linkleri nedir?",
+    ],
+    "Reasoning": [
+        "LLM ajanlarının zorluklarıyla ilgili makale bölümlerini bulur musun?",
+        "ChartGalaxy makalesinde hangi yöntemler (methods) kullanılmış?",
+        "ADOPT yöntemini kullanan makaleler hangileri?",
+        "Large Language Model görevini ele alan makaleler hangileri?",
+    ],
+    "Vector Search": [
+        "Podcast üretimiyle ilgili en alakalı makale paragraflarını getir.",
+        "AutoAgent hakkında semantik olarak en yakın içeriği bul.",
+        "Genel konuşma sistemleriyle ilgili benzer çalışmaları getir.",
+    ]
+}
@@ -15,4 +15,98 @@ PROCESSED_PAPERS_JSON = Path(os.getenv("PROCESSED_PAPERS_JSON", BASE_DIR / "data
 PDF_DIR.mkdir(parents=True, exist_ok=True)
 RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
-PAPERS_JSON.parent.mkdir(parents=True, exist_ok=True) 
\ No newline at end of file
+PAPERS_JSON.parent.mkdir(parents=True, exist_ok=True) 
+# Embedding modeli
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "2048"))
+
+# Embedding backend'i: "torch" (HuggingFaceEmbeddings) veya "onnx" (ONNX Runtime CPU, torch import edilmez).
+# ONNX modeli scripts/export_onnx_embedder.py ile EMBEDDING_ONNX_DIR dizinine aktarılır.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_DIR = Path(os.getenv("EMBEDDING_ONNX_DIR", BASE_DIR / "data" / "models" / "all-MiniLM-L6-v2-onnx"))
+EMBEDDING_ONNX_QUANTIZED = os.getenv("EMBEDDING_ONNX_QUANTIZED", "false").lower() == "true"
+EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+
+# Semantik yanıt önbelleği (varsayılan kapalı: ilk Normal istekte embedding modelini yükler ve
+# yalnızca varlık ismi farklı olan sorular için yanlış isabet riski taşır)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+
+# Cypher üretim önbelleği
+CYPHER_CACHE_ENABLED = os.getenv("CYPHER_CACHE_ENABLED", "true").lower() == "true"
+CYPHER_CACHE_TTL = int(os.getenv("CYPHER_CACHE_TTL", "86400"))
+CYPHER_CACHE_MAX_ENTRIES = int(os.getenv("CYPHER_CACHE_MAX_ENTRIES", "2000"))
+
+# Neo4j sorgu sonucu önbelleği
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", "3600"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "5000"))
+QUERY_CACHE_MAX_ROWS = int(os.getenv("QUERY_CACHE_MAX_ROWS", "500"))
+DATA_VERSION_CHECK_INTERVAL = float(os.getenv("DATA_VERSION_CHECK_INTERVAL", "30"))
+
+# Şablon tabanlı hızlı yol
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+
+# Vektör arama backend'i: "neo4j" (Neo4j vector index) veya "local" (bellek içi indeks)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "neo4j")
+LOCAL_INDEX_DIR = Path(os.getenv("LOCAL_INDEX_DIR", BASE_DIR / "data" / "index"))
+LOCAL_INDEX_USE_HNSW = os.getenv("LOCAL_INDEX_USE_HNSW", "auto")
+
+# İki aşamalı arama: önce makale vektörleriyle en yakın VECTOR_TOP_PAPERS makale,
+# sonra yalnızca bu makalelerin chunk'ları arasından en yakın VECTOR_TOP_CHUNKS chunk.
+# Neo4j backend'inde yükleyicinin oluşturduğu paper_embedding indeksini gerektirir.
+VECTOR_TWO_STAGE = os.getenv("VECTOR_TWO_STAGE", "false").lower() == "true"
+VECTOR_TOP_PAPERS = int(os.getenv("VECTOR_TOP_PAPERS", "10"))
+VECTOR_TOP_CHUNKS = int(os.getenv("VECTOR_TOP_CHUNKS", "5"))
+
+# Chunk vektörlerinin aday aramasında sıkıştırılması: "none", "int8" (4x) veya "binary" (32x, yalnızca yerel indeks).
+# Adaylar VECTOR_RESCORE_OVERSAMPLE * k kadar seçilir ve float embedding'lerle yeniden puanlanır.
+# Bellek kazancı yalnızca yerel indekste (VECTOR_BACKEND=local) elde edilir. Neo4j vektör indeksi (5.23+)
+# zaten varsayılan olarak quantize edilir ve Chunk düğümleri float embedding'leri saklamaya devam eder;
+# Neo4j backend'inde bu ayar yalnızca oversample edilmiş adayların float yeniden puanlamasını açar.
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none").lower()
+VECTOR_RESCORE_OVERSAMPLE = int(os.getenv("VECTOR_RESCORE_OVERSAMPLE", "4"))
+
+# Graph şema snapshot'larının saklandığı dizin
+SCHEMA_CACHE_DIR = Path(os.getenv("SCHEMA_CACHE_DIR", BASE_DIR / "data" / "schema"))
+
+# QA prompt'una eklenen bağlamın token bütçesi
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_MAX_VALUE_TOKENS = int(os.getenv("CONTEXT_MAX_VALUE_TOKENS", "200"))
+
+# Sohbet belleği: "summary" (son N tur + özet, token sınırlı) veya "buffer" (tüm geçmiş)
+MEMORY_MODE = os.getenv("MEMORY_MODE", "summary")
+MEMORY_MAX_TURNS = int(os.getenv("MEMORY_MAX_TURNS", "4"))
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "1500"))
+
+# Üretilen Cypher sorguları için maliyet koruması
+CYPHER_GUARD_ENABLED = os.getenv("CYPHER_GUARD_ENABLED", "true").lower() == "true"
+CYPHER_QUERY_TIMEOUT = float(os.getenv("CYPHER_QUERY_TIMEOUT", "10"))
+CYPHER_GUARD_MAX_ESTIMATED_ROWS = int(os.getenv("CYPHER_GUARD_MAX_ESTIMATED_ROWS", "1000000"))
+CYPHER_GUARD_DEFAULT_LIMIT = int(os.getenv("CYPHER_GUARD_DEFAULT_LIMIT", "50"))
+CYPHER_GUARD_MAX_REPAIRS = int(os.getenv("CYPHER_GUARD_MAX_REPAIRS", "1"))
+
+# İstek aşamaları için gecikme izleme (span) ve örneklenmiş içerik loglama
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "true").lower() == "true"
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+TRACE_RECENT_MAX_SPANS = int(os.getenv("TRACE_RECENT_MAX_SPANS", "5000"))
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0"))
+
+# Aynı anda gelen aynı soruların tek bir zincir çalıştırmasında birleştirilmesi
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# LLM hedge/failover: birincil model LLM_HEDGE_AFTER saniyede yanıt vermezse veya hata verirse
+# istek ikincil sağlayıcı/modele de gönderilir (LLM_HEDGE_MODEL boşsa kapalı)
+LLM_HEDGE_PROVIDER = os.getenv("LLM_HEDGE_PROVIDER", "")
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "")
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "2.0"))
+
+# Paylaşılan LLM zamanlayıcısı: sağlayıcı/model başına dakikalık istek (rpm) ve token (tpm) kotaları.
+# JSON, ör. {"OpenAI/gpt-4.1-nano-2025-04-14": {"rpm": 500, "tpm": 200000}, "Groq": {"rpm": 30, "tpm": 6000}}
+# Boşsa kota uygulanmaz. Kotaların yalnızca LLM_RATE_LIMIT_HEADROOM oranı kullanılır.
+LLM_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS", "")
+LLM_RATE_LIMIT_HEADROOM = float(os.getenv("LLM_RATE_LIMIT_HEADROOM", "0.9"))
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "2"))
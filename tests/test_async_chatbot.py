@@ -0,0 +1,66 @@
+import asyncio
+import functools
+import time
+
+import pytest
+
+from chatbot.core import chatbot as chatbot_module
+from chatbot.core import local_index as local_index_module
+from chatbot.core.chatbot import AIMLChatbot
+from chatbot.core.vector_chain import VectorSearchChain
+from chatbot.utils.replay import ReplayData, install_replay_resources
+from chatbot.utils.schema_snapshot import schema_snapshot
+from src.config.sample_questions import SAMPLE_QUESTIONS
+
+PROVIDER, MODEL = "OpenAI", "replay-async-test"
+
+
+@pytest.fixture
+def make_chatbot(monkeypatch, tmp_path):
+    # Şema snapshot'ı ve yerel vektör indeksi geçici dizine yazılır
+    monkeypatch.setenv("OPENAI_API_KEY", "replay")
+    monkeypatch.setattr(schema_snapshot, "cache_dir", tmp_path / "schema")
+    monkeypatch.setattr(local_index_module, "_local_index", None)
+    monkeypatch.setattr(local_index_module, "LocalVectorIndex",
+                        functools.partial(local_index_module.LocalVectorIndex, index_dir=tmp_path / "index"))
+    monkeypatch.setattr(chatbot_module, "VectorSearchChain", functools.partial(VectorSearchChain, backend="local"))
+    return _create_chatbot
+
+
+def _create_chatbot(search_type, **delays):
+    install_replay_resources(PROVIDER, MODEL, 0.1, data=ReplayData(papers=20, chunks=200), **delays)
+    chatbot = AIMLChatbot(llm_provider=PROVIDER, model_name=MODEL, temperature=0.1, search_type=search_type)
+    # Önbellekten dönen yanıt async yolu atlatmasın
+    chatbot.answer_cache = None
+    return chatbot
+
+
+@pytest.mark.parametrize("search_type", ["Normal", "Reasoning", "Vector Search"])
+def test_async_response_matches_sync(make_chatbot, search_type):
+    chatbot = make_chatbot(search_type)
+    question = SAMPLE_QUESTIONS[search_type][0]
+
+    expected = chatbot.get_response(question)
+    chatbot.memory.clear()
+    actual = asyncio.run(chatbot.aget_response(question))
+
+    assert expected["success"] and actual["success"]
+    assert actual["answer"] == expected["answer"]
+
+
+def test_concurrent_async_requests_overlap(make_chatbot):
+    delay = 0.2
+    chatbot = make_chatbot("Normal", first_token_delay=delay, query_delay=delay)
+    questions = SAMPLE_QUESTIONS["Normal"][:4]
+
+    async def ask_all():
+        return await asyncio.gather(*(chatbot.aget_response(question) for question in questions))
+
+    started = time.perf_counter()
+    responses = asyncio.run(ask_all())
+    elapsed = time.perf_counter() - started
+
+    assert all(response["success"] for response in responses)
+    # Her istek en az üç gecikmeli adım içerir (Cypher üretimi, sorgu, yanıt); sıralı çalışsalardı
+    # toplam süre istek sayısıyla katlanırdı
+    assert elapsed < len(questions) * 3 * delay / 2
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+
+from chatbot.core.batch import BatchAnswerer, completed_ids, question_id
+from chatbot.core.chatbot import AIMLChatbot
+
+
+class _Memory:
+    def clear(self):
+        pass
+
+
+class _FakeChatbot:
+    def __init__(self, failing):
+        self.memory = _Memory()
+        self.failing = failing
+
+    async def aget_response(self, question):
+        if question in self.failing:
+            return {"answer": "hata", "success": False}
+        return {"answer": f"yanıt: {question}", "success": True}
+
+
+class _FakeAnswerer(BatchAnswerer):
+    def __init__(self, failing=()):
+        super().__init__(concurrency=2, max_retries=0, retry_delay=0)
+        self.failing = set(failing)
+
+    def _create_chatbot(self, search_type):
+        return _FakeChatbot(self.failing)
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+ROWS = [{"question": "a"}, {"question": "b"}, {"question": "c"}]
+
+
+def test_rerun_retries_failed_and_keeps_last_record_per_id(tmp_path):
+    output = tmp_path / "out.jsonl"
+    first = _FakeAnswerer(failing={"b"}).run(ROWS, output)
+    assert first["failed"] == 1
+    assert completed_ids(output) == {question_id({"question": "a"}), question_id({"question": "c"})}
+
+    second = _FakeAnswerer().run(ROWS, output)
+    assert (second["total"], second["skipped"], second["failed"]) == (1, 2, 0)
+
+    records = _lines(output)
+    assert len(records) == 3
+    assert len({record["id"] for record in records}) == 3
+    assert all(record["success"] for record in records)
+
+
+def test_skip_failed_keeps_failed_questions(tmp_path):
+    output = tmp_path / "out.jsonl"
+    _FakeAnswerer(failing={"b"}).run(ROWS, output)
+    progress = _FakeAnswerer().run(ROWS, output, retry_failed=False)
+    assert progress["total"] == 0
+
+
+def test_resume_after_truncated_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    done = {"id": question_id({"question": "a"}), "question": "a", "success": True}
+    output.write_text(json.dumps(done) + "\n" + '{"id": "yarım', encoding="utf-8")
+
+    progress = _FakeAnswerer().run(ROWS, output)
+
+    assert (progress["total"], progress["skipped"]) == (2, 1)
+    assert sorted(record["question"] for record in _lines(output)) == ["a", "b", "c"]
+
+
+class _Rewriter:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, inputs):
+        self.calls += 1
+        return AIMessage(content="yeniden yazılmış soru")
+
+    async def ainvoke(self, inputs):
+        return self.invoke(inputs)
+
+
+def test_condense_is_skipped_without_history():
+    # Toplu yanıtlamada bellek her soruda temizlendiği için condense çağrısı yapılmamalı
+    bot = object.__new__(AIMLChatbot)
+    bot.question_rewriter_chain = _Rewriter()
+    empty = {"summary": "", "chat_history": []}
+
+    assert bot._preprocess_query("Soru?", empty) == "Soru?"
+    assert asyncio.run(bot._apreprocess_query("Soru?", empty)) == "Soru?"
+    assert bot.question_rewriter_chain.calls == 0
+
+    history = {"summary": "", "chat_history": [{"role": "user", "content": "Önceki soru"}]}
+    assert bot._preprocess_query("Peki ya bu?", history) == "yeniden yazılmış soru"
+    assert bot.question_rewriter_chain.calls == 1
@@ -0,0 +1,64 @@
+import pytest
+from langchain_core.documents import Document
+
+from chatbot.utils import context_builder as context_builder_module
+from chatbot.utils.context_builder import ContextBuilder, _CharTokenizer
+
+
+@pytest.fixture(autouse=True)
+def char_tokenizer(monkeypatch):
+    # tiktoken kurulu olsun ya da olmasın token sayımı deterministik olsun
+    monkeypatch.setattr(context_builder_module, "get_tokenizer", lambda model_name=None: _CharTokenizer())
+
+
+def _rows(count):
+    return [{"paper_name": f"Makale {i}", "publication_date": "2025-01-01"} for i in range(count)]
+
+
+def test_rows_within_budget_are_kept():
+    text = ContextBuilder(token_budget=1000).build_rows(_rows(3))
+    assert text.splitlines()[0] == "paper_name | publication_date"
+    assert "Makale 2 | 2025-01-01" in text
+    assert "Token bütçesi" not in text
+
+
+def test_rows_over_budget_are_trimmed_with_note():
+    builder = ContextBuilder(token_budget=40)
+    text = builder.build_rows(_rows(20))
+    lines = text.splitlines()
+
+    kept = lines[1:-1]
+    assert lines[-1].startswith("(Token bütçesi nedeniyle")
+    omitted = int(lines[-1].split()[3])
+    assert len(kept) + omitted == 20
+    assert sum(builder.count_tokens(line) + 1 for line in kept) <= 40
+
+
+def test_long_values_are_truncated():
+    builder = ContextBuilder(token_budget=1000, max_value_tokens=5)
+    text = builder.build_rows([{"paper_name": "X", "abstract": "a" * 200}])
+    assert "a" * 20 + "…" in text
+    assert "a" * 21 not in text
+
+
+def test_rows_of_same_paper_are_grouped():
+    rows = [{"paper_name": "AutoAgent", "author": "A"}, {"paper_name": "AutoAgent", "author": "B"}]
+    text = ContextBuilder(token_budget=1000).build_rows(rows)
+    assert text.count("AutoAgent") == 1
+    assert text.splitlines() == ["## AutoAgent", "author", "A", "B"]
+
+
+def test_documents_are_grouped_and_trimmed_by_budget():
+    documents = [
+        Document(page_content=f"chunk {i} " + "x" * 40, metadata={"paper_name": f"Makale {i % 2}", "order": i})
+        for i in range(10)
+    ]
+    text = ContextBuilder(token_budget=60).build_documents(documents)
+    assert text.startswith("## Makale: Makale 0")
+    assert "(Token bütçesi nedeniyle" in text
+
+
+def test_empty_results():
+    builder = ContextBuilder()
+    assert builder.build_rows([]) == "[]"
+    assert builder.build_documents([]) == "[]"
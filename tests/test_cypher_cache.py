@@ -0,0 +1,78 @@
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+
+from chatbot.core.reasoning_chain import ReasoningCypherChain
+from chatbot.utils import cache as cache_module
+from chatbot.utils.cache import CypherCache
+
+SCHEMA = "Node properties: Paper {name: STRING}"
+CYPHER = "MATCH (p:Paper) RETURN p.name AS name LIMIT 5"
+
+
+def test_normalized_question_hits_per_model():
+    cache = CypherCache()
+    cache.put("Kaç makale var?", SCHEMA, "model-a", CYPHER)
+
+    assert cache.get("  kaç MAKALE var ", SCHEMA, "model-a") == CYPHER
+    assert cache.get("Kaç makale var?", SCHEMA, "model-b") is None
+
+
+def test_schema_change_invalidates_entries():
+    cache = CypherCache()
+    cache.put("Kaç makale var?", SCHEMA, "model-a", CYPHER)
+    assert cache.get("Kaç yazar var?", SCHEMA + ", Author {name: STRING}", "model-a") is None
+    assert cache.get("Kaç makale var?", SCHEMA, "model-a") is None
+
+
+class _LLM:
+    model_name = "model-a"
+
+    def __init__(self):
+        self.cypher_calls = 0
+
+    def invoke(self, messages):
+        if messages[0]["content"].startswith("CYPHER"):
+            self.cypher_calls += 1
+            return AIMessage(content=CYPHER)
+        return AIMessage(content="Yanıt")
+
+
+class _Graph:
+    schema = SCHEMA
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query(self, cypher_query, params=None):
+        return self.rows
+
+
+def _chain(rows):
+    return ReasoningCypherChain(
+        llm=_LLM(),
+        graph=_Graph(rows),
+        cypher_prompt=PromptTemplate.from_template("CYPHER {schema} {question}"),
+        qa_prompt=PromptTemplate.from_template("QA {question} {context}"),
+        verbose=False,
+        cypher_cache=CypherCache(),
+    )
+
+
+def test_reasoning_chain_reuses_cached_cypher(monkeypatch):
+    monkeypatch.setattr(cache_module, "QUERY_CACHE_ENABLED", False)
+    chain = _chain([{"name": "Attention Is All You Need"}])
+
+    first = chain.invoke({"query": "Kaç makale var?"})
+    second = chain.invoke({"query": "kaç makale var"})
+
+    assert chain.llm.cypher_calls == 1
+    assert first["intermediate_steps"][0]["query"] == second["intermediate_steps"][0]["query"] == CYPHER
+
+
+def test_query_without_results_is_not_cached(monkeypatch):
+    monkeypatch.setattr(cache_module, "QUERY_CACHE_ENABLED", False)
+    chain = _chain([])
+
+    chain.invoke({"query": "Kaç makale var?"})
+    chain.invoke({"query": "Kaç makale var?"})
+    assert chain.llm.cypher_calls == 2
@@ -0,0 +1,132 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage
+from neo4j.exceptions import CypherSyntaxError, ServiceUnavailable
+
+from chatbot.core.cypher_guard import CypherGuard
+
+
+def _summary(rows):
+    return SimpleNamespace(query_type="r", plan={"args": {"EstimatedRows": rows}, "children": []})
+
+
+class _Explainer:
+    """PlanExplainer ve AsyncNeo4jGraph.aexplain yerine geçen sahte planlayıcı."""
+
+    def __init__(self, error=None, rows=None):
+        self.error = error
+        self.rows = rows or {}
+        self.calls = 0
+
+    def explain(self, query):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        # Sorguda geçen etikete göre tahmini satır sayısı; bilinmeyenler için küçük bir plan
+        return _summary(next((rows for label, rows in self.rows.items() if label in query), 10.0))
+
+    async def aexplain(self, query):
+        return self.explain(query)
+
+
+class _RepairLLM:
+    def __init__(self, repaired):
+        self.repaired = repaired
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content=self.repaired)
+
+    async def ainvoke(self, messages):
+        return self.invoke(messages)
+
+
+def _guard(error=None, rows=None, llm=None, use_async=False):
+    explainer = _Explainer(error, rows)
+    guard = CypherGuard(SimpleNamespace(schema=""), llm=llm, async_graph=explainer if use_async else None,
+                        plan_explainer=explainer, verbose=False)
+    return guard, explainer
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (a)-[*]-(b) RETURN b",
+    "MATCH (a)-[:CITES*]->(b) RETURN b",
+    "MATCH (a)<-[r:CITES*2..]-(b) RETURN b",
+    "MATCH (a)-[* ..]-(b) RETURN b",
+])
+def test_unbounded_expansion_rejected(query):
+    guard, _ = _guard()
+    assert "genişlemesi" in guard._static_check(query)
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (a)-[:CITES*2]->(b) RETURN b",
+    "MATCH (a)-[:CITES*1..3]->(b) RETURN b",
+    "MATCH (a)-[*..3]-(b) RETURN b",
+    "MATCH (p:Paper) RETURN [x IN p.scores | x * 2] AS doubled",
+    "MATCH (p:Paper) WHERE p.name = '-[*]-' RETURN p",
+])
+def test_bounded_patterns_allowed(query):
+    guard, _ = _guard()
+    assert guard._static_check(query) is None
+
+
+def test_write_clause_rejected():
+    guard, _ = _guard()
+    assert "MERGE" in guard._static_check("MATCH (p) MERGE (p)-[:X]->(q) RETURN p")
+
+
+def test_limit_added_once():
+    guard, _ = _guard()
+    assert guard.with_limit("MATCH (p) RETURN p;").endswith(f"LIMIT {guard.default_limit}")
+    assert guard.with_limit("MATCH (p) RETURN p LIMIT 5") == "MATCH (p) RETURN p LIMIT 5"
+
+
+def test_syntax_error_is_cached():
+    guard, explainer = _guard(CypherSyntaxError("bad"))
+    assert guard.check("MATCH (p RETURN p")[1].startswith("Sorgu planlanamadı")
+    guard.check("MATCH (p RETURN p")
+    assert explainer.calls == 1
+
+
+def test_transient_error_fails_open_without_caching():
+    guard, explainer = _guard(ServiceUnavailable("down"))
+    assert guard.check("MATCH (p) RETURN p")[1] is None
+    explainer.error = None
+    assert guard.check("MATCH (p) RETURN p")[1] is None
+    assert explainer.calls == 2
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_rejected_query_is_repaired(use_async):
+    llm = _RepairLLM("MATCH (p:Paper) RETURN p.name LIMIT 5")
+    guard, explainer = _guard(rows={"Author": 1e9}, llm=llm, use_async=use_async)
+    query = "MATCH (a:Author), (p:Paper) RETURN a, p"
+
+    if use_async:
+        repaired = asyncio.run(guard.aguard(query))
+    else:
+        repaired = guard.guard(query)
+
+    assert repaired == "MATCH (p:Paper) RETURN p.name LIMIT 5"
+    assert (llm.calls, explainer.calls) == (1, 2)
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_unrepairable_query_is_blocked(use_async):
+    llm = _RepairLLM("MATCH (a:Author) RETURN a")
+    guard, _ = _guard(rows={"Author": 1e9}, llm=llm, use_async=use_async)
+    query = "MATCH (a:Author) RETURN a"
+
+    blocked = asyncio.run(guard.aguard(query)) if use_async else guard.guard(query)
+    assert blocked == ""
+    assert llm.calls == guard.max_repairs
+
+
+def test_sync_check_without_explainer_skips_plan():
+    guard = CypherGuard(SimpleNamespace(schema=""), verbose=False)
+    assert guard.check("MATCH (p) RETURN p")[1] is None
+    assert guard.check("MATCH (p) DELETE p")[1] is not None
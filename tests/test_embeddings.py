@@ -0,0 +1,52 @@
+import asyncio
+
+from chatbot.utils import embeddings as embeddings_module
+from chatbot.utils.embeddings import CachedEmbeddings, get_embeddings_model
+
+
+class _Model:
+    def __init__(self):
+        self.queries = []
+        self.documents = 0
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [float(len(text)), 1.0]
+
+    def embed_documents(self, texts):
+        self.documents += 1
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def test_repeated_queries_hit_cache():
+    model = _Model()
+    cached = CachedEmbeddings(model, max_entries=10)
+
+    first = cached.embed_query("Transformer nedir?")
+    first.append(99.0)
+    assert cached.embed_query("  Transformer nedir?  ") == [18.0, 1.0]
+    assert asyncio.run(cached.aembed_query("Transformer nedir?")) == [18.0, 1.0]
+    assert model.queries == ["Transformer nedir?"]
+    assert cached.stats()["hits"] == 2
+
+
+def test_cache_is_bounded_and_skips_documents():
+    model = _Model()
+    cached = CachedEmbeddings(model, max_entries=2)
+    for text in ["a", "b", "c", "a"]:
+        cached.embed_query(text)
+    assert model.queries == ["a", "b", "c", "a"]
+
+    cached.embed_documents(["a", "b"])
+    cached.embed_documents(["a", "b"])
+    assert model.documents == 2
+
+
+def test_model_is_loaded_once_per_name(monkeypatch):
+    created = []
+    monkeypatch.setattr(embeddings_module, "_models", {})
+    monkeypatch.setattr(embeddings_module, "create_embeddings", lambda model_name: created.append(model_name) or _Model())
+
+    assert get_embeddings_model("model-a") is get_embeddings_model("model-a")
+    assert get_embeddings_model("model-b") is not get_embeddings_model("model-a")
+    assert created == ["model-a", "model-b"]
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from typing import Any
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from chatbot.utils.hedging import HedgedChatModel
+from chatbot.utils.llm_scheduler import _current_priority, llm_priority
+
+
+class _PriorityRecorder(BaseChatModel):
+    seen: Any = None
+
+    @property
+    def _llm_type(self):
+        return "recorder"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.seen.append(_current_priority.get())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.seen.append(_current_priority.get())
+        yield ChatGenerationChunk(message=AIMessageChunk(content="ok"))
+
+
+def test_hedge_threads_keep_caller_priority():
+    seen = []
+    model = HedgedChatModel(primary=_PriorityRecorder(seen=seen), secondary=_PriorityRecorder(seen=seen), hedge_after=5.0)
+    with llm_priority("batch"):
+        model.invoke("soru")
+        list(model.stream("soru"))
+    assert seen == ["batch", "batch"]
+
+
+class _Model(BaseChatModel):
+    """Sabit gecikmeyle yanıt veren veya hata yükselten sahte model."""
+
+    answer: str = "ok"
+    delay: float = 0.0
+    error: Any = None
+
+    @property
+    def _llm_type(self):
+        return "fake"
+
+    def _reply(self):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return AIMessage(content=self.answer)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=self._reply())])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        yield ChatGenerationChunk(message=AIMessageChunk(content=self._reply().content))
+
+
+def _ask(model, api):
+    if api == "async":
+        return asyncio.run(model.ainvoke("soru")).content
+    if api == "stream":
+        return "".join(chunk.content for chunk in model.stream("soru"))
+    return model.invoke("soru").content
+
+
+API = ["sync", "async", "stream"]
+
+
+@pytest.mark.parametrize("api", API)
+def test_slow_primary_is_hedged(api):
+    model = HedgedChatModel(primary=_Model(answer="birincil", delay=1.0), secondary=_Model(answer="ikincil"), hedge_after=0.05)
+    assert _ask(model, api) == "ikincil"
+    stats = model.stats()
+    assert (stats["hedged"], stats["secondary_wins"], stats["failovers"]) == (1, 1, 0)
+
+
+@pytest.mark.parametrize("api", API)
+def test_fast_primary_is_not_hedged(api):
+    model = HedgedChatModel(primary=_Model(answer="birincil"), secondary=_Model(answer="ikincil"), hedge_after=5.0)
+    assert _ask(model, api) == "birincil"
+    assert model.stats()["hedged"] == 0
+
+
+@pytest.mark.parametrize("api", API)
+def test_failing_primary_fails_over_without_waiting(api):
+    model = HedgedChatModel(primary=_Model(error=RuntimeError("503")), secondary=_Model(answer="ikincil"), hedge_after=5.0)
+    started = time.perf_counter()
+    assert _ask(model, api) == "ikincil"
+    assert time.perf_counter() - started < 1.0
+    assert model.stats()["failovers"] == 1
+
+
+@pytest.mark.parametrize("api", API)
+def test_primary_error_raised_when_both_fail(api):
+    model = HedgedChatModel(primary=_Model(error=RuntimeError("birincil")), secondary=_Model(error=ValueError("ikincil")),
+                            hedge_after=5.0)
+    with pytest.raises(RuntimeError, match="birincil"):
+        _ask(model, api)
+    assert model.stats()["errors"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from chatbot.core.intent_router import IntentRouter
+from src.config.sample_questions import SAMPLE_QUESTIONS
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(llm=None, graph=None, qa_prompt=None, verbose=False)
+
+
+@pytest.mark.parametrize("question, expected", [
+    ("AutoAgent makalesinin yazarları kimlerdir?", ("paper_authors", {"paper": "AutoAgent"})),
+    ("DocETL makalesiyle ilişkili kod depoları hangileridir?", ("paper_code", {"paper": "DocETL"})),
+    ("Jiabin Tang'ın yazdığı tüm makaleleri listeler misin?", ("author_papers", {"author": "Jiabin Tang"})),
+    ("MoonCast makalesinde hangi veri setleri kullanılmış?", ("paper_datasets", {"paper": "MoonCast"})),
+    ("WebDancer makalesinin özetini verir misin?", ("paper_details", {"paper": "WebDancer"})),
+    ("SoloSpeech makalesinin yayın tarihi nedir?", ("paper_details", {"paper": "SoloSpeech"})),
+    ("Reservoir-enhanced Segment Anything Model makalesinin arXiv ve Papers With Code linkleri nedir?",
+     ("paper_details", {"paper": "Reservoir-enhanced Segment Anything Model"})),
+    ("ChartGalaxy makalesinde hangi yöntemler (methods) kullanılmış?", ("paper_methods", {"paper": "ChartGalaxy"})),
+    ("ADOPT yöntemini kullanan makaleler hangileri?", ("method_papers", {"method": "ADOPT"})),
+    ("Large Language Model görevini ele alan makaleler hangileri?", ("task_papers", {"task": "Large Language Model"})),
+    ("Who wrote AutoAgent?", ("paper_authors", {"paper": "AutoAgent"})),
+    ("Papers by Jiabin Tang", ("author_papers", {"author": "Jiabin Tang"})),
+])
+def test_matches_single_entity_questions(router, question, expected):
+    assert router.match(question) == expected
+
+
+@pytest.mark.parametrize("question", [
+    "AutoAgent makalesinin yazarları ve kod depoları nelerdir?",
+    "AutoAgent makalesinin yazarlarının diğer makaleleri nelerdir?",
+    "AutoAgent makalesinin yayın tarihinden sonra yayınlanan makaleler hangileri?",
+    "Who wrote it?",
+    "authors of papers by Jiabin Tang",
+    "AutoAgent ve DocETL makalesinin yazarları kimlerdir?",
+    "Bu makalenin yazarları kimlerdir?",
+])
+def test_compound_or_contextual_questions_fall_back(router, question):
+    assert router.match(question) is None
+
+
+def test_vector_search_samples_do_not_match(router):
+    for question in SAMPLE_QUESTIONS["Vector Search"]:
+        assert router.match(question) is None
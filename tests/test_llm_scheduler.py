@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from chatbot.utils import llm_scheduler as scheduler_module
+from chatbot.utils.llm_scheduler import LLMScheduler, TokenBucket, llm_priority
+from chatbot.utils.resources import _create_client
+
+KEY = ("Fake", "model")
+
+
+def _exhausted_scheduler(rpm=600):
+    scheduler = LLMScheduler(limits={"Fake": {"rpm": rpm}}, headroom=1.0)
+    scheduler._lane(KEY).requests.tokens = 0
+    return scheduler
+
+
+def test_token_bucket_refill_and_clip():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+    # Kapasiteden büyük istekler kova dolduğunda geçer
+    assert bucket.wait_time(1000, now + 60.0) == 0.0
+
+
+def test_priority_order():
+    scheduler = _exhausted_scheduler(rpm=60)
+    order = []
+
+    def call(tag, priority):
+        with llm_priority(priority):
+            scheduler.acquire(KEY, 1)
+        order.append(tag)
+
+    threads = []
+    for tag, priority in [("batch", "batch"), ("background", "background"), ("interactive", "interactive")]:
+        thread = threading.Thread(target=call, args=(tag, priority))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join(timeout=10)
+    assert order == ["interactive", "batch", "background"]
+    assert scheduler.stats()["Fake/model"]["max_queue_depth"] == 3
+
+
+def test_cancelled_async_waiter_does_not_block_lane():
+    scheduler = _exhausted_scheduler()
+
+    async def main():
+        waiter = asyncio.ensure_future(scheduler.aacquire(KEY, 1))
+        await asyncio.sleep(0.02)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.wait_for(scheduler.aacquire(KEY, 1), timeout=3)
+
+    asyncio.run(main())
+    assert scheduler.stats()["Fake/model"]["queue_depth"] == 0
+
+
+def test_failed_sync_waiter_leaves_queue(monkeypatch):
+    scheduler = _exhausted_scheduler()
+    lane = scheduler._lane(KEY)
+    original = lane.condition.wait
+
+    def interrupted(timeout=None):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(lane.condition, "wait", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.acquire(KEY, 1)
+    monkeypatch.setattr(lane.condition, "wait", original)
+    assert lane.waiters == []
+    scheduler.acquire(KEY, 1)
+
+
+def test_settle_refunds_unused_tokens():
+    scheduler = LLMScheduler(limits={"Fake": {"tpm": 6000}}, headroom=1.0)
+    scheduler.acquire(KEY, 5000)
+    scheduler.settle(KEY, 5000, 1000)
+    assert scheduler._lane(KEY).tokens.tokens == pytest.approx(5000, abs=5)
+
+
+class _FakeClient:
+    # Tokenizer'a ihtiyaç duymadan çağrı yapılabilen sahte istemci
+    model_name = "model"
+    max_tokens = 100
+
+    def invoke(self, messages, stop=None, **kwargs):
+        return AIMessage(content="ok")
+
+
+def test_estimate_skips_tokenizer_without_token_bucket(monkeypatch):
+    def fail(model_name):
+        raise AssertionError("TPM kotası yokken tokenizer yüklenmemeli")
+
+    monkeypatch.setattr(scheduler_module, "get_tokenizer", fail)
+    scheduler = LLMScheduler(limits={"Fake": {"rpm": 600}}, headroom=1.0)
+    llm = scheduler_module.ScheduledChatModel(llm=_FakeClient(), provider="Fake", scheduler=scheduler)
+
+    assert llm.invoke([HumanMessage(content="merhaba")]).content == "ok"
+    assert scheduler.stats()["Fake/model"]["requests"] == 1
+
+
+def test_clients_disable_builtin_retries(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("GROQ_API_KEY", "gsk-test")
+    assert _create_client("OpenAI", "gpt-4o-mini", 0).max_retries == 0
+    assert _create_client("Groq", "llama-3.1-8b-instant", 0).max_retries == 0
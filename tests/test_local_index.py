@@ -0,0 +1,62 @@
+import numpy as np
+
+from chatbot.core.local_index import EMBEDDINGS_PAGE_QUERY, ENRICHMENT_QUERY, LocalVectorIndex
+
+
+class _FakeGraph:
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.enrichment_calls = []
+
+    def query(self, cypher_query, params=None):
+        if cypher_query == EMBEDDINGS_PAGE_QUERY:
+            rows = [{"id": f"c{i}", "embedding": vector.tolist(), "paper_id": f"p{i // 2}"}
+                    for i, vector in enumerate(self.vectors)]
+            return rows[params["skip"]:params["skip"] + params["limit"]]
+        if cypher_query == ENRICHMENT_QUERY:
+            self.enrichment_calls.append(list(params["chunk_ids"]))
+            return [{"id": chunk_id, "text": f"text {chunk_id}", "metadata": {"id": chunk_id, "paper_name": None}}
+                    for chunk_id in params["chunk_ids"]]
+        raise AssertionError(cypher_query)
+
+
+def _index(tmp_path, vectors, **kwargs):
+    return LocalVectorIndex(_FakeGraph(vectors), index_dir=tmp_path, use_hnsw="false", quantization="none", **kwargs)
+
+
+def _files(tmp_path):
+    return sorted(path.name for path in tmp_path.iterdir())
+
+
+def test_unversioned_build_uses_content_version(tmp_path):
+    vectors = np.random.default_rng(0).standard_normal((6, 8)).astype(np.float32)
+    index = _index(tmp_path, vectors)
+    index._ensure_version(None)
+
+    files = _files(tmp_path)
+    assert files and not any("None" in name for name in files)
+    assert all(name.startswith("chunks_content-") for name in files)
+    assert index._search(vectors[3], k=1)[0][0] == "c3"
+
+
+def test_stale_versions_are_removed(tmp_path):
+    vectors = np.random.default_rng(0).standard_normal((6, 8)).astype(np.float32)
+    index = _index(tmp_path, vectors)
+    index._ensure_version(None)
+    index._ensure_version("v1")
+    index._ensure_version("v2")
+
+    assert _files(tmp_path) == ["chunks_v2.f32", "chunks_v2.ids.json", "chunks_v2.papers.json"]
+
+
+def test_documents_survive_metadata_eviction(tmp_path):
+    vectors = np.random.default_rng(0).standard_normal((6, 8)).astype(np.float32)
+    index = _index(tmp_path, vectors, metadata_cache_size=2)
+    index._ensure_version("v1")
+    hits = [(f"c{i}", 1.0) for i in range(5)]
+
+    documents = index.documents(hits)
+
+    assert [document.page_content for document in documents] == [f"text c{i}" for i in range(5)]
+    assert documents[0].metadata == {"id": "c0"}
+    assert index.graph.enrichment_calls == [[f"c{i}" for i in range(5)]]
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from chatbot.utils.memory import SummarizingMemory
+
+
+class _BlockingLLM:
+    """İlk çağrıda serbest bırakılana kadar bekleyen sahte özet modeli."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return f"özet {self.calls}"
+
+
+def _wait_idle(memory):
+    deadline = time.monotonic() + 5
+    while memory._summarizing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _save(memory, index):
+    memory.save_context({"question": f"soru {index}"}, {"answer": f"yanıt {index}"})
+
+
+def test_summary_is_written_after_turns_overflow():
+    llm = _BlockingLLM()
+    llm.release.set()
+    memory = SummarizingMemory(llm=llm, max_turns=1, max_tokens=1000)
+    _save(memory, 1)
+    _save(memory, 2)
+    _wait_idle(memory)
+    assert memory.load_memory_variables({})["summary"] == "özet 1"
+
+
+def test_clear_discards_in_flight_summary():
+    llm = _BlockingLLM()
+    memory = SummarizingMemory(llm=llm, max_turns=1, max_tokens=1000)
+    _save(memory, 1)
+    _save(memory, 2)
+    assert llm.started.wait(5)
+
+    memory.clear()
+    llm.release.set()
+    _wait_idle(memory)
+
+    variables = memory.load_memory_variables({})
+    assert variables["summary"] == ""
+    assert variables["chat_history"] == []
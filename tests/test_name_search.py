@@ -0,0 +1,33 @@
+import pytest
+
+from chatbot.utils.name_search import rewrite_name_predicates
+
+SCHEMA_WITH_INDEX = "Node properties:\nPaper {name: STRING, name_lower: STRING}"
+SCHEMA_WITHOUT_INDEX = "Node properties:\nPaper {name: STRING}"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("MATCH (p:Paper) WHERE toLower(p.name) CONTAINS 'AutoAgent' RETURN p",
+     "MATCH (p:Paper) WHERE p.name_lower CONTAINS 'autoagent' RETURN p"),
+    ("MATCH (a:Author) WHERE toLower(a.name) = toLower($author) RETURN a",
+     "MATCH (a:Author) WHERE a.name_lower = toLower($author) RETURN a"),
+    ("MATCH (p:Paper) WHERE toLower(p.name) starts with $paper RETURN p",
+     "MATCH (p:Paper) WHERE p.name_lower STARTS WITH toLower($paper) RETURN p"),
+    ("MATCH (p:Paper), (q:Paper) WHERE toLower(p.name) CONTAINS toLower(q.name) RETURN p",
+     "MATCH (p:Paper), (q:Paper) WHERE p.name_lower CONTAINS toLower(q.name) RETURN p"),
+])
+def test_to_lower_name_is_rewritten_to_indexed_property(query, expected):
+    assert rewrite_name_predicates(query, SCHEMA_WITH_INDEX) == expected
+
+
+def test_name_lower_falls_back_without_index():
+    query = "MATCH (p:Paper) WHERE p.name_lower CONTAINS $paper RETURN p"
+    assert rewrite_name_predicates(query, SCHEMA_WITHOUT_INDEX) == (
+        "MATCH (p:Paper) WHERE toLower(p.name) CONTAINS toLower($paper) RETURN p"
+    )
+
+
+def test_other_predicates_are_untouched():
+    query = "MATCH (p:Paper) WHERE p.name = 'AutoAgent' AND toLower(p.abstract) CONTAINS 'agent' RETURN p"
+    assert rewrite_name_predicates(query, SCHEMA_WITH_INDEX) == query
+    assert rewrite_name_predicates("", SCHEMA_WITH_INDEX) == ""
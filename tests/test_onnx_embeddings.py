@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from chatbot.utils.onnx_embeddings import OnnxEmbeddings, check_model_name, write_model_metadata
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+PADDING_VECTOR = [100.0, -100.0]
+
+
+class _Tokenizer:
+    """Her kelimeyi uzunluğu kadar id'ye çeviren, batch'i en uzun metne göre dolduran sahte tokenizer."""
+
+    def encode_batch(self, texts):
+        words = [text.split() for text in texts]
+        length = max(len(items) for items in words)
+        return [
+            SimpleNamespace(
+                ids=[len(word) for word in items] + [0] * (length - len(items)),
+                attention_mask=[1] * len(items) + [0] * (length - len(items)),
+                type_ids=[0] * length,
+            )
+            for items in words
+        ]
+
+
+class _Session:
+    """Token id'sinden [id, 1] vektörü üreten sahte ONNX oturumu; padding token'ları uç değer alır."""
+
+    def __init__(self):
+        self.batches = []
+
+    def run(self, outputs, feeds):
+        self.batches.append(len(feeds["input_ids"]))
+        ids = feeds["input_ids"].astype(np.float32)
+        embeddings = np.stack([ids, np.ones_like(ids)], axis=-1)
+        embeddings[feeds["attention_mask"] == 0] = PADDING_VECTOR
+        return [embeddings]
+
+
+def _model(batch_size=32):
+    model = object.__new__(OnnxEmbeddings)
+    model.tokenizer = _Tokenizer()
+    model.session = _Session()
+    model.input_names = {"input_ids", "attention_mask"}
+    model.batch_size = batch_size
+    return model
+
+
+def _expected(text):
+    vectors = np.asarray([[len(word), 1.0] for word in text.split()])
+    pooled = vectors.mean(axis=0)
+    return pooled / np.linalg.norm(pooled)
+
+
+def test_mean_pooling_ignores_padding_and_normalizes():
+    texts = ["transformer", "graph neural network model"]
+    vectors = np.asarray(_model().embed_documents(texts))
+
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+    for text, vector in zip(texts, vectors):
+        np.testing.assert_allclose(vector, _expected(text), rtol=1e-6)
+
+
+def test_documents_keep_input_order_across_sorted_batches():
+    texts = ["a b c d", "a", "a b c", "a b"]
+    model = _model(batch_size=2)
+    vectors = model.embed_documents(texts)
+
+    assert model.session.batches == [2, 2]
+    for text, vector in zip(texts, vectors):
+        np.testing.assert_allclose(vector, _expected(text), rtol=1e-6)
+    np.testing.assert_allclose(model.embed_query("a b c"), vectors[2], rtol=1e-6)
+
+
+def test_model_name_mismatch_is_rejected(tmp_path):
+    write_model_metadata(tmp_path, "intfloat/multilingual-e5-small")
+    # Uyuşmazlık onnxruntime yüklenmeden yakalanır
+    with pytest.raises(ValueError, match="multilingual-e5-small"):
+        OnnxEmbeddings(tmp_path, model_name=MODEL_NAME)
+
+    write_model_metadata(tmp_path, MODEL_NAME)
+    check_model_name(tmp_path, MODEL_NAME)
+
+
+def _tiny_bert(model_dir, transformers, torch):
+    words = ["graph", "neural", "network", "transformer", "attention", "paper", "dataset", "model"]
+    vocab_path = model_dir / "vocab.txt"
+    model_dir.mkdir()
+    vocab_path.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words), encoding="utf-8")
+    transformers.BertTokenizerFast(vocab_file=str(vocab_path)).save_pretrained(model_dir)
+    config = transformers.BertConfig(vocab_size=len(words) + 5, hidden_size=32, num_hidden_layers=2,
+                                     num_attention_heads=2, intermediate_size=64)
+    torch.manual_seed(0)
+    transformers.BertModel(config).save_pretrained(model_dir)
+    return [" ".join(words[i:i + n]) for n in (1, 3, 5) for i in range(len(words) - n + 1)]
+
+
+def test_exported_model_matches_torch(tmp_path):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    for module_name in ("onnx", "onnxruntime", "tokenizers", "sentence_transformers", "langchain_community"):
+        pytest.importorskip(module_name)
+    from scripts.export_onnx_embedder import export, parity
+
+    model_dir, output_dir = tmp_path / "bert", tmp_path / "onnx"
+    texts = _tiny_bert(model_dir, transformers, torch)
+    export(str(model_dir), output_dir, opset=17)
+
+    rows = parity(str(model_dir), output_dir, [False], texts)
+    assert rows[1]["backend"] == "onnx"
+    assert rows[1]["min_cosine"] >= 0.9999
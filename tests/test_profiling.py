@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+from chatbot.utils.profiling import ColdStartProfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Normal aramada gerekmeyen ağır bağımlılıklar chatbot import edilirken yüklenmemeli
+HEAVY_MODULES = ["torch", "hnswlib", "neo4j", "langchain_neo4j", "langchain_community", "chatbot.core.local_index"]
+
+
+def test_importing_chatbot_does_not_load_heavy_dependencies():
+    script = (
+        "import sys, json\n"
+        f"sys.path[:0] = [{ROOT!r}, {ROOT + '/src'!r}]\n"
+        "import chatbot.core.chatbot\n"
+        f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=ROOT, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+def test_stage_is_measured_once():
+    profile = ColdStartProfile()
+    module = profile.lazy_import("json.tool")
+    assert profile.lazy_import("json.tool") is module
+
+    with profile.stage("initialize:Normal"):
+        pass
+    with profile.stage("initialize:Normal"):
+        pass
+
+    # Aşama yalnızca ilk çalışmasında ölçülür
+    assert list(profile.report()["stages"]) == ["initialize:Normal"]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from chatbot.utils.quantization import QuantizedMatrix, exact_top_k, recall_report, rescore
+
+
+def _normalize(matrix):
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def clustered():
+    # Makale merkezleri etrafında kümelenmiş chunk'lar ve gürültülü chunk kopyaları sorgu olarak
+    rng = np.random.default_rng(0)
+    centers = rng.standard_normal((50, 384))
+    matrix = _normalize(centers[np.arange(2000) % 50] + 0.5 * rng.standard_normal((2000, 384)))
+    queries = _normalize(matrix[rng.choice(2000, 50, replace=False)] + 0.3 * rng.standard_normal((50, 384)))
+    return matrix, queries
+
+
+def _recall(rows, mode, oversample):
+    return next(row["recall"] for row in rows if row["mode"] == mode and row["oversample"] == oversample)
+
+
+def test_int8_recall_with_rescoring(clustered):
+    matrix, queries = clustered
+    rows = recall_report(matrix, queries, k=5, oversample_factors=(1, 4), modes=("int8",))
+    assert _recall(rows, "int8", 4) >= 0.98
+    assert _recall(rows, "int8", 4) >= _recall(rows, "int8", 1)
+
+
+def test_binary_recall_improves_with_oversampling(clustered):
+    matrix, queries = clustered
+    rows = recall_report(matrix, queries, k=5, oversample_factors=(1, 32), modes=("binary",))
+    # İşaret bitleri izotropik sentetik veride kaba kalır; binary mod yüksek oversample ile kullanılır
+    assert _recall(rows, "binary", 32) >= 0.75
+    assert _recall(rows, "binary", 32) > _recall(rows, "binary", 1)
+
+
+def test_memory_footprint(clustered):
+    matrix, _ = clustered
+    assert QuantizedMatrix(matrix, mode="int8").codes.nbytes * 4 == matrix.nbytes
+    assert QuantizedMatrix(matrix, mode="binary").codes.nbytes * 32 == matrix.nbytes
+
+
+def test_block_size_does_not_change_scores(clustered):
+    matrix, queries = clustered
+    for mode in ("int8", "binary"):
+        whole = QuantizedMatrix(matrix, mode=mode, block_size=len(matrix)).scores(queries[0])
+        blocked = QuantizedMatrix(matrix, mode=mode, block_size=97).scores(queries[0])
+        np.testing.assert_allclose(whole, blocked, rtol=1e-5)
+
+
+def test_rescore_matches_exact_search(clustered):
+    matrix, queries = clustered
+    query = queries[0]
+    rows = np.arange(len(matrix))
+    assert [row for row, _ in rescore(matrix, rows, query, 5)] == exact_top_k(matrix, query, 5).tolist()
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        QuantizedMatrix(np.zeros((2, 2), dtype=np.float32), mode="int4")
@@ -0,0 +1,106 @@
+import asyncio
+from types import SimpleNamespace
+
+from chatbot.core.chatbot import AIMLChatbot
+from chatbot.utils import cache as cache_module
+from chatbot.utils.cache import QueryResultCache
+
+
+class _Tracker:
+    def __init__(self, version):
+        self.version = version
+
+    def current(self, graph):
+        return self.version
+
+    async def acurrent(self, async_graph):
+        return self.version
+
+
+class _Graph:
+    """Sorgu çalışırken başka bir isteği araya sokabilen sahte graph."""
+
+    def __init__(self, tracker, rows, during=None):
+        self.tracker = tracker
+        self.rows = rows
+        self.during = during
+        self.calls = 0
+
+    def query(self, cypher_query, params=None):
+        self.calls += 1
+        if self.during is not None:
+            self.during()
+        return self.rows
+
+    async def aquery(self, cypher_query, params=None):
+        return self.query(cypher_query, params)
+
+
+class _Generator:
+    def invoke(self, inputs):
+        return "MATCH (p:Paper) RETURN p.title AS title"
+
+    async def ainvoke(self, inputs):
+        return self.invoke(inputs)
+
+
+def _normal_chatbot(graph):
+    # Bağlantı kurmadan yalnızca Normal aramanın Cypher adımlarını çalıştıran chatbot
+    bot = object.__new__(AIMLChatbot)
+    bot.graph = graph
+    bot.async_graph = graph
+    bot.chain = SimpleNamespace(
+        cypher_generation_chain=_Generator(), cypher_query_corrector=None, graph_schema="", top_k=1
+    )
+    return bot
+
+
+def test_results_are_cached_per_version():
+    tracker = _Tracker("v1")
+    cache = QueryResultCache(tracker)
+    graph = _Graph(tracker, [{"n": 1}])
+
+    assert cache.query(graph, "RETURN 1") == [{"n": 1}]
+    assert cache.query(graph, "RETURN 1") == [{"n": 1}]
+    assert graph.calls == 1
+
+    tracker.version = "v2"
+    cache.query(graph, "RETURN 1")
+    assert graph.calls == 2
+
+
+def test_result_of_query_overlapping_version_change_is_not_stored():
+    tracker = _Tracker("v1")
+    cache = QueryResultCache(tracker)
+    fresh = _Graph(tracker, [{"n": "new"}])
+
+    def new_version_request():
+        # Eski sorgu sürerken yükleyici yeni sürüm yazar ve başka bir istek önbelleği temizler
+        tracker.version = "v2"
+        cache.query(_Graph(tracker, []), "RETURN 0")
+
+    stale = _Graph(tracker, [{"n": "old"}], during=new_version_request)
+    assert cache.query(stale, "RETURN n") == [{"n": "old"}]
+    assert cache.query(fresh, "RETURN n") == [{"n": "new"}]
+    assert fresh.calls == 1
+
+
+def test_large_results_are_not_cached():
+    tracker = _Tracker("v1")
+    cache = QueryResultCache(tracker, max_rows=1)
+    graph = _Graph(tracker, [{"n": 1}, {"n": 2}])
+    cache.query(graph, "RETURN n")
+    cache.query(graph, "RETURN n")
+    assert graph.calls == 2
+
+
+def test_normal_search_uses_query_cache(monkeypatch):
+    tracker = _Tracker("v1")
+    monkeypatch.setattr(cache_module, "_query_cache", QueryResultCache(tracker))
+    graph = _Graph(tracker, [{"title": "A"}, {"title": "B"}])
+    bot = _normal_chatbot(graph)
+
+    cypher, context = bot._cypher_qa_query("Hangi makaleler var?")
+    assert context == [{"title": "A"}]
+    asyncio.run(bot._acypher_qa_query("Hangi makaleler var?"))
+    assert graph.calls == 1
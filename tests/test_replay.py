@@ -0,0 +1,65 @@
+import functools
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from chatbot.core import chatbot as chatbot_module
+from chatbot.core import local_index as local_index_module
+from chatbot.core.vector_chain import VectorSearchChain
+from chatbot.utils.replay import REPLAY_CYPHER, ReplayChatModel, ReplayData, install_replay_resources, replay
+from chatbot.utils.schema_snapshot import schema_snapshot
+from scripts.benchmark_replay import SEARCH_TYPES, load_questions
+from src.config.prompts import condense_prompt, cypher_prompt
+
+PROVIDER, MODEL = "OpenAI", "replay-benchmark-test"
+
+
+def test_replay_model_answers_by_prompt_template():
+    model = ReplayChatModel()
+    cypher = cypher_prompt.format(schema="Paper {name: STRING}", question="Yazarlar kim?")
+    condense = condense_prompt.format(chat_history="user: AutoAgent nedir?\n", question="Yazarları kim?")
+
+    assert model.invoke([HumanMessage(content=cypher)]).content == REPLAY_CYPHER
+    assert model.invoke([HumanMessage(content=condense)]).content == "Yazarları kim?"
+
+    answer = model.invoke([HumanMessage(content="Bağlam: ...")])
+    assert answer.content == model.invoke([HumanMessage(content="Bağlam: ...")]).content
+    assert "".join(chunk.content for chunk in model.stream([HumanMessage(content="Bağlam: ...")])) == answer.content
+    assert answer.usage_metadata["output_tokens"] == model.answer_tokens
+
+
+@pytest.mark.parametrize("api", ["sync", "async", "stream"])
+def test_replay_reports_every_search_type_without_failures(monkeypatch, tmp_path, api):
+    monkeypatch.setenv("OPENAI_API_KEY", "replay")
+    monkeypatch.setattr(schema_snapshot, "cache_dir", tmp_path / "schema")
+    monkeypatch.setattr(local_index_module, "_local_index", None)
+    monkeypatch.setattr(local_index_module, "LocalVectorIndex",
+                        functools.partial(local_index_module.LocalVectorIndex, index_dir=tmp_path / "index"))
+    monkeypatch.setattr(chatbot_module, "VectorSearchChain", functools.partial(VectorSearchChain, backend="local"))
+    install_replay_resources(PROVIDER, MODEL, 0.1, data=ReplayData(papers=20, chunks=200))
+
+    questions = {search_type: ["AutoAgent makalesinin yazarları kimlerdir?"] for search_type in SEARCH_TYPES}
+    report = replay(SEARCH_TYPES, PROVIDER, MODEL, questions=questions, repeats=2, warmup=0, api=api)
+
+    assert set(report) == set(SEARCH_TYPES)
+    for search_type, stages in report.items():
+        assert stages["request"]["failures"] == 0
+        assert stages["request"]["count"] == 2
+        assert "answer" in stages
+    assert "graph_query" in report["Normal"]
+    assert "retrieval" in report["Vector Search"]
+
+
+def test_load_questions_from_jsonl_and_text(tmp_path):
+    jsonl = tmp_path / "questions.jsonl"
+    jsonl.write_text(
+        '{"question": "Kaç makale var?", "search_type": "Normal"}\n\n{"question": "Transformer nedir?"}\n',
+        encoding="utf-8",
+    )
+    text = tmp_path / "questions.txt"
+    text.write_text("Kaç makale var?\n", encoding="utf-8")
+
+    questions = load_questions(str(jsonl))
+    assert questions["Normal"] == ["Kaç makale var?", "Transformer nedir?"]
+    assert questions["Vector Search"] == ["Transformer nedir?"]
+    assert load_questions(str(text)) == {search_type: ["Kaç makale var?"] for search_type in SEARCH_TYPES}
@@ -0,0 +1,40 @@
+import asyncio
+
+from chatbot.utils import async_graph as async_graph_module
+from chatbot.utils.async_graph import AsyncNeo4jGraph
+from chatbot.utils.resources import get_versioned_resource, resource_keys
+
+
+class _FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+def test_versioned_resource_drops_older_versions():
+    key = ("test_chain", "Normal")
+    first = get_versioned_resource(key, "v1", lambda: object())
+    assert get_versioned_resource(key, "v1", lambda: object()) is first
+
+    second = get_versioned_resource(key, "v2", lambda: object())
+    assert second is not first
+    assert key + ("v2",) in resource_keys()
+    assert key + ("v1",) not in resource_keys()
+
+
+def test_async_graph_opens_one_driver_per_event_loop(monkeypatch):
+    monkeypatch.setattr(async_graph_module.AsyncGraphDatabase, "driver", lambda *args, **kwargs: _FakeDriver())
+    graph = AsyncNeo4jGraph(url="bolt://localhost", username="u", password="p")
+
+    async def driver():
+        return graph._driver, graph._driver
+
+    first_a, first_b = asyncio.run(driver())
+    second, _ = asyncio.run(driver())
+
+    assert first_a is first_b
+    assert second is not first_a
+    # İlk loop kapandığı için sürücüsü bırakılmış olmalı
+    assert len(graph._drivers) == 1
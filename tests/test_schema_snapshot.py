@@ -0,0 +1,68 @@
+from chatbot.utils import schema_snapshot as schema_snapshot_module
+from chatbot.utils.schema_snapshot import SchemaSnapshot
+
+
+class _Tracker:
+    def __init__(self, version):
+        self.version = version
+
+    def current(self, graph):
+        return self.version
+
+
+class _Graph:
+    """refresh_schema çağrılarını sayan sahte Neo4jGraph."""
+
+    def __init__(self, properties):
+        self.properties = properties
+        self.timeout = 5
+        self._enhanced_schema = False
+        self.refreshes = 0
+        self.schema = ""
+        self.structured_schema = {}
+
+    def refresh_schema(self):
+        assert self.timeout is None
+        self.refreshes += 1
+        self.structured_schema = {
+            "node_props": {
+                "Paper": [{"property": name, "type": "STRING"} for name in self.properties],
+                "DataVersion": [{"property": "version", "type": "STRING"}],
+            },
+            "rel_props": {},
+            "relationships": [],
+        }
+
+
+def test_snapshot_is_reused_until_data_version_changes(monkeypatch, tmp_path):
+    tracker = _Tracker("v1")
+    monkeypatch.setattr(schema_snapshot_module, "data_version_tracker", tracker)
+    graph = _Graph(["name"])
+    snapshot = SchemaSnapshot(cache_dir=tmp_path)
+
+    assert snapshot.apply(graph) == "v1"
+    snapshot.apply(graph)
+    assert graph.refreshes == 1
+    assert graph.timeout == 5
+    assert "name" in graph.schema and "DataVersion" not in graph.schema
+
+    # Yeni süreç aynı sürümün şemasını diskten okur
+    restarted = _Graph(["name"])
+    SchemaSnapshot(cache_dir=tmp_path).apply(restarted)
+    assert restarted.refreshes == 0
+    assert restarted.schema == graph.schema
+
+    tracker.version = "v2"
+    graph.properties = ["name", "name_lower"]
+    assert snapshot.apply(graph) == "v2"
+    assert graph.refreshes == 2
+    assert "name_lower" in graph.schema
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["schema_v1.json", "schema_v2.json"]
+
+
+def test_unversioned_graph_is_not_written_to_disk(monkeypatch, tmp_path):
+    monkeypatch.setattr(schema_snapshot_module, "data_version_tracker", _Tracker(None))
+    graph = _Graph(["name"])
+    SchemaSnapshot(cache_dir=tmp_path).apply(graph)
+    assert graph.refreshes == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,24 @@
+from chatbot.utils.cache import SemanticCache, entity_tokens
+
+
+class _ConstantEmbeddings:
+    """Tüm soruları aynı vektöre eşler; benzerlik her zaman 1.0 olur."""
+
+    def embed_query(self, text):
+        return [1.0, 0.0]
+
+
+def test_entity_tokens_ignore_sentence_start_and_suffixes():
+    assert entity_tokens("AutoAgent makalesinin yazarları kimlerdir?") == {"autoagent"}
+    assert entity_tokens("Jiabin Tang'ın yazdığı tüm makaleleri listeler misin?") == {"tang"}
+    assert entity_tokens("Podcast üretimiyle ilgili makaleleri getir") == frozenset()
+
+
+def test_semantic_hit_requires_same_entities():
+    cache = SemanticCache(embeddings=_ConstantEmbeddings(), threshold=0.9)
+    namespace = ("Normal", "model")
+    cache.put("AutoAgent makalesinin yazarları kimlerdir?", namespace, {"answer": "autoagent"})
+
+    assert cache.get("DocETL makalesinin yazarları kimlerdir?", namespace) is None
+    assert cache.get("AutoAgent makalesinin yazarları kim?", namespace) == {"answer": "autoagent"}
+    assert cache.get("autoagent makalesinin yazarları kimlerdir", namespace) == {"answer": "autoagent"}
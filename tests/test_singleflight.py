@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from chatbot.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "sonuç"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", work)))
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()["coalesced"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("sonuç", False)] + [("sonuç", True)] * 3
+    assert flight.stats() == {"executions": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_leader_error_reaches_waiters_and_key_is_released():
+    flight = SingleFlight()
+    future, leader = flight.begin("k")
+    waiter, is_leader = flight.begin("k")
+    assert leader and not is_leader and waiter is future
+
+    flight.finish("k", future, error=ValueError("hata"))
+    with pytest.raises(ValueError):
+        waiter.result()
+    assert flight.do("k", lambda: 1) == (1, False)
+
+
+def test_cancelled_leader_is_reported_as_runtime_error():
+    flight = SingleFlight()
+    future, _ = flight.begin("k")
+    flight.finish("k", future, error=asyncio.CancelledError())
+    with pytest.raises(RuntimeError):
+        future.result()
+
+
+def test_async_waiters_share_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "sonuç"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("k", work) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert sorted(results) == [("sonuç", False)] + [("sonuç", True)] * 3
+
+
+def test_disabled_runs_every_call():
+    flight = SingleFlight(enabled=False)
+    assert flight.do("k", lambda: 1) == (1, False)
+    assert flight.do("k", lambda: 2) == (2, False)
+    assert flight.stats()["executions"] == 0
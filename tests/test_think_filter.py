@@ -0,0 +1,41 @@
+import pytest
+
+from chatbot.utils.cleaning import ThinkFilter, filter_think_stream
+
+
+def _run(chunks):
+    stream = filter_think_stream(iter(chunks))
+    visible = []
+    while True:
+        try:
+            visible.append(next(stream))
+        except StopIteration as stop:
+            return "".join(visible), stop.value
+
+
+@pytest.mark.parametrize("chunks", [
+    ["<think>plan</think>Yanıt metni"],
+    ["<thi", "nk>plan</th", "ink>Yanıt", " metni"],
+    list("<think>plan</think>Yanıt metni"),
+    ["<think>", "plan", "</think>", "\n\n", "Yanıt metni"],
+])
+def test_think_block_is_hidden_across_chunk_boundaries(chunks):
+    visible, raw = _run(chunks)
+    assert visible == "Yanıt metni"
+    assert raw == "".join(chunks)
+
+
+def test_text_without_think_passes_through():
+    assert _run(["Merhaba", " dünya <", "b>"])[0] == "Merhaba dünya <b>"
+
+
+def test_partial_open_tag_is_held_until_resolved():
+    think_filter = ThinkFilter()
+    assert think_filter.feed("Yanıt <thi") == "Yanıt "
+    assert think_filter.feed("s değil") == "<this değil"
+
+
+def test_unclosed_think_block_is_dropped_on_flush():
+    think_filter = ThinkFilter()
+    assert think_filter.feed("<think>yarım düşünce") == ""
+    assert think_filter.flush() == ""
@@ -0,0 +1,63 @@
+import json
+import logging
+
+import pytest
+
+from chatbot.utils.tracing import Tracer, percentile
+from src.config.logger import log_payload
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_trace_spans_are_exported_as_json_lines(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracer = Tracer(enabled=True, export_path=path, payload_sample_rate=0)
+
+    with tracer.trace("request", search_type="Normal"):
+        with tracer.span("cypher_generation") as span:
+            span.set(cached=True)
+        with tracer.span("graph_query") as span:
+            span.set(rows=3)
+    with pytest.raises(RuntimeError):
+        with tracer.trace("request", search_type="Normal"):
+            raise RuntimeError("hata")
+
+    records = _records(path)
+    assert [record["name"] for record in records] == ["request", "cypher_generation", "graph_query", "request"]
+    assert len({record["trace_id"] for record in records[:3]}) == 1
+    assert records[0]["search_type"] == "Normal"
+    assert records[1]["cached"] is True and records[2]["rows"] == 3
+    assert records[3]["error"] == "RuntimeError"
+    assert all(record["duration_ms"] >= 0 for record in records)
+    assert tracer.stats()["request"]["count"] == 2
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(enabled=False, export_path=path)
+    with tracer.trace("request"):
+        with tracer.span("answer") as span:
+            span.set(rows=1)
+    assert not path.exists()
+    assert tracer.recent() == []
+
+
+@pytest.mark.parametrize("rate, logged", [(0.0, False), (1.0, True)])
+def test_payload_logging_follows_sample_rate(caplog, rate, logged):
+    tracer = Tracer(enabled=True, payload_sample_rate=rate)
+    with caplog.at_level(logging.INFO):
+        with tracer.trace("request"):
+            log_payload("prompt içeriği")
+        log_payload("istek dışı içerik")
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert ("prompt içeriği" in messages) is logged
+    assert "istek dışı içerik" not in messages
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert (percentile(values, 50), percentile(values, 95), percentile(values, 99)) == (50, 95, 99)
+    assert percentile([], 50) is None
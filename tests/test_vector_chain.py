@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+
+from chatbot.core import vector_chain as vector_chain_module
+from chatbot.core.vector_chain import CHUNK_METADATA_PROJECTION, VectorSearchChain
+
+METADATA = {
+    "id": "c1", "order": 0, "paper_name": "Attention Is All You Need", "publication_date": "2017-06-12",
+    "arxiv_link": "https://arxiv.org/abs/1706.03762", "pwc_link": None, "abstract": None,
+    "authors": ["Ashish Vaswani", "Noam Shazeer"], "github_links": [],
+}
+
+
+class _LLM:
+    model_name = "gpt-4o-mini"
+
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[0]["content"])
+        return AIMessage(content="Yanıt")
+
+
+class _Graph:
+    """Vektör araması ve zenginleştirmeyi tek sorguda yanıtlayan sahte graph."""
+
+    def __init__(self):
+        self.queries = []
+
+    def query(self, cypher_query, params=None):
+        self.queries.append(cypher_query)
+        return [{"text": "The Transformer relies on attention.", "metadata": METADATA, "score": 0.9}]
+
+
+class _Embeddings:
+    def embed_query(self, text):
+        return [0.1, 0.2, 0.3]
+
+
+class _Neo4jVector:
+    """Neo4jVector.from_existing_graph ile oluşturulan sahte vektör deposu."""
+
+    def __init__(self, retrieval_query):
+        self.retrieval_query = retrieval_query
+        self.searches = 0
+
+    @classmethod
+    def from_existing_graph(cls, retrieval_query, **kwargs):
+        return cls(retrieval_query)
+
+    def similarity_search(self, query, k):
+        self.searches += 1
+        return [Document(page_content="The Transformer relies on attention.", metadata={"paper_name": METADATA["paper_name"]})]
+
+
+def _chain(monkeypatch, **options):
+    monkeypatch.setattr(vector_chain_module, "lazy_import", lambda name: SimpleNamespace(Neo4jVector=_Neo4jVector))
+    return VectorSearchChain(
+        llm=_LLM(),
+        graph=_Graph(),
+        response_prompt=PromptTemplate.from_template("{query}\n{context}"),
+        embeddings_model=_Embeddings(),
+        verbose=False,
+        backend="neo4j",
+        **options,
+    )
+
+
+def test_cypher_search_enriches_hits_in_one_query(monkeypatch):
+    chain = _chain(monkeypatch, two_stage=True, quantization="none")
+    result = chain.invoke({"query": "Transformer nedir?"})
+
+    assert len(chain.graph.queries) == 1
+    assert CHUNK_METADATA_PROJECTION in chain.graph.queries[0]
+
+    source = result["intermediate_steps"][1]["context"][0]
+    assert source["paper_name"] == METADATA["paper_name"]
+    assert source["authors"] == METADATA["authors"]
+    # Boş metadata alanları dokümana taşınmaz, makale bilgileri bağlama bir kez yazılır
+    prompt = chain.llm.prompts[0]
+    assert "## Makale: Attention Is All You Need" in prompt
+    assert "Ashish Vaswani" in prompt
+    assert "None" not in prompt
+
+
+def test_vector_store_uses_enriching_retrieval_query(monkeypatch):
+    chain = _chain(monkeypatch, two_stage=False, quantization="none")
+    chain.invoke({"query": "Transformer nedir?"})
+
+    assert CHUNK_METADATA_PROJECTION in chain.vector_store.retrieval_query
+    assert chain.vector_store.searches == 1
+    assert chain.graph.queries == []